@@ -1,19 +1,37 @@
+import uuid
 from datetime import datetime, timedelta
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Body, Depends, HTTPException, status
-from sqlalchemy import desc
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from sqlalchemy import Result, desc, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core.booking_reference import normalize_reference
+from app.core.cancellation import cancel_showing_bookings, publish_cancellation
+from app.core.catalog import showings_changed
+from app.core.config import settings as app_settings
+from app.core.http_cache import table_versions
+from app.core.schedule_planner import propose_schedule, summarize
+from app.core.scheduling import ScheduleIndex
 from app.core.security import get_current_manager_user
+from app.core.tmdb import TMDBError, TMDBNotFoundError, tmdb_client
+from app.core.tmdb_import import movie_values, tmdb_importer
 from app.db.session import get_db
 from app.models.booking import Booking
 from app.models.movie import Movie
 from app.models.room import Room
 from app.models.showing import Showing
 from app.models.user import User
+from app.schemas.movie import TMDBBulkImportRequest
+from app.schemas.showing import (
+    BulkShowingCreate,
+    ScheduleCopyRequest,
+    ScheduleProposalRequest,
+    ShowingCreate,
+)
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -60,11 +78,23 @@ async def get_all_bookings(
     current_user: User = Depends(get_current_manager_user),
     skip: int = 0,
     limit: int = 100,
+    reference: Optional[str] = Query(
+        None, max_length=32, description="Booking reference as given by the customer"
+    ),
 ) -> Any:
     """
     Get all bookings with detailed information (admin only)
+
+    With ``reference``, only the booking with that reference is returned. The
+    reference may be typed loosely (any case, without the dash, O/I/L for
+    0/1/1); one failing its check symbol is rejected as a typo.
     """
     query = select(Booking).offset(skip).limit(limit)
+    if reference is not None:
+        booking_number = normalize_reference(reference)
+        if booking_number is None:
+            raise HTTPException(status_code=400, detail="Invalid booking reference")
+        query = query.filter_by(booking_number=booking_number)
     result = await db.execute(query)
     bookings = result.scalars().all()
 
@@ -204,7 +234,13 @@ async def create_showing_admin(
         status="scheduled",
     )
     db.add(new_showing)
-    await db.commit()
+    try:
+        await table_versions.record(db, "showings")
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Time conflict in room")
+    showings_changed()
     await db.refresh(new_showing)
 
     return {
@@ -218,6 +254,171 @@ async def create_showing_admin(
     }
 
 
+async def _create_showings(db: AsyncSession, showings: List[ShowingCreate]) -> List[Dict[str, Any]]:
+    """
+    Validate and insert a batch of showings in one transaction.
+
+    Conflicts are checked in memory against the rooms' schedules, loaded
+    with one query, and the showings are inserted with one multi-row insert.
+    The batch is all-or-nothing.
+    """
+    movie_ids = {s.movie_id for s in showings}
+    found_movies: Result[Any] = await db.execute(
+        select(Movie.id).where(Movie.__table__.c.id.in_(movie_ids))
+    )
+    if len(found_movies.all()) != len(movie_ids):
+        raise HTTPException(status_code=404, detail="Movie not found")
+    room_ids = {s.room_id for s in showings}
+    found_rooms: Result[Any] = await db.execute(
+        select(Room.id).where(Room.__table__.c.id.in_(room_ids))
+    )
+    if len(found_rooms.all()) != len(room_ids):
+        raise HTTPException(status_code=404, detail="Room not found")
+
+    index = await ScheduleIndex.load(
+        db,
+        room_ids,
+        min(s.start_time for s in showings),
+        max(s.end_time for s in showings),
+    )
+    conflicts: List[Dict[str, Any]] = []
+    for position, s in enumerate(showings):
+        conflict = index.reserve(s.room_id, s.start_time, s.end_time, position)
+        if isinstance(conflict, int):
+            conflicts.append({"index": position, "conflicts_with_index": conflict})
+        elif conflict is not None:
+            conflicts.append({"index": position, "conflicts_with": str(conflict)})
+    if conflicts:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "Time conflict in room", "conflicts": conflicts},
+        )
+
+    rows: List[Dict[str, Any]] = [
+        {
+            "id": uuid.uuid4(),
+            "status": "scheduled",
+            **s.model_dump(),
+        }
+        for s in showings
+    ]
+    try:
+        await db.execute(insert(Showing), rows)
+        await table_versions.record(db, "showings")
+        await db.commit()
+    except IntegrityError:
+        # A concurrent change took the slot; the exclusion constraint caught it
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Time conflict in room")
+    showings_changed()
+
+    return [
+        {
+            "id": str(row["id"]),
+            "movie_id": str(row["movie_id"]),
+            "room_id": str(row["room_id"]),
+            "start_time": row["start_time"].isoformat(),
+            "end_time": row["end_time"].isoformat(),
+            "price": row["price"],
+            "status": row["status"],
+        }
+        for row in rows
+    ]
+
+
+@router.post("/showings/bulk", status_code=status.HTTP_201_CREATED, response_model=List[dict])
+async def create_showings_bulk(
+    request: BulkShowingCreate,
+    current_user: User = Depends(get_current_manager_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Create many showings at once (admin only)
+
+    Either all showings are created or, if any of them overlaps a scheduled
+    showing or another showing in the request, none are.
+    """
+    return await _create_showings(db, request.showings)
+
+
+@router.post("/showings/copy", status_code=status.HTTP_201_CREATED, response_model=List[dict])
+async def copy_schedule(
+    request: ScheduleCopyRequest,
+    current_user: User = Depends(get_current_manager_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Copy the scheduled showings of a period to another period (admin only)
+
+    Typically used to copy this week's programme to next week. Times are
+    shifted by the distance between the two start days.
+    """
+    source_start = datetime.combine(request.source_start, datetime.min.time())
+    shift = request.target_start - request.source_start
+    result = await db.execute(
+        select(Showing)
+        .filter(Showing.status == "scheduled")
+        .filter(Showing.start_time >= source_start)
+        .filter(Showing.start_time < source_start + timedelta(days=request.days))
+        .order_by(Showing.start_time)
+    )
+    showings = [
+        ShowingCreate(
+            movie_id=s.movie_id,
+            room_id=s.room_id,
+            start_time=s.start_time + shift,
+            end_time=s.end_time + shift,
+            price=s.price,
+            is_3d=bool(s.is_3d),
+            is_imax=bool(s.is_imax),
+            is_dolby=bool(s.is_dolby),
+        )
+        for s in result.scalars().all()
+    ]
+    if not showings:
+        raise HTTPException(status_code=404, detail="No showings scheduled in the source period")
+    return await _create_showings(db, showings)
+
+
+@router.post("/showings/propose", response_model=dict)
+async def propose_showings(
+    request: ScheduleProposalRequest,
+    current_user: User = Depends(get_current_manager_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Propose a schedule for all rooms (admin only)
+
+    Free time slots are filled around the existing showings, favouring
+    well-rated movies that sold well recently. The returned ``showings``
+    can be posted to ``/showings/bulk`` as they are, or created right away
+    with ``commit``.
+    """
+    proposals = await propose_schedule(db, request.start_date, request.days, request.room_ids)
+    showings = [
+        ShowingCreate(
+            movie_id=p.movie_id,
+            room_id=p.room_id,
+            start_time=p.start_time,
+            end_time=p.end_time,
+            price=request.price,
+        )
+        for p in proposals
+    ]
+    if request.commit and showings:
+        created = await _create_showings(db, showings)
+    else:
+        created = [
+            {**s.model_dump(mode="json"), "score": round(p.score, 4)}
+            for s, p in zip(showings, proposals)
+        ]
+    return {
+        "committed": request.commit and bool(showings),
+        "showings": created,
+        "screen_minutes": {str(room_id): m for room_id, m in summarize(proposals).items()},
+    }
+
+
 @router.get("/dashboard/recent-bookings", response_model=List[dict])
 async def get_recent_bookings(
     db: AsyncSession = Depends(get_db),
@@ -379,6 +580,7 @@ async def delete_movie(
         )
     # Delete the movie
     await db.delete(movie)
+    await table_versions.record(db, "movies")
     await db.commit()
 
     return {"message": "Movie deleted successfully"}
@@ -394,12 +596,6 @@ async def import_movie_from_tmdb(
     Import a movie from TMDB API by its ID
     """
     try:
-        from datetime import datetime
-
-        import requests
-
-        from app.core.config import settings
-
         # Check if movie already exists with this TMDB ID
         query = select(Movie).where(Movie.tmdb_id == tmdb_id)
         result = await db.execute(query)
@@ -411,85 +607,26 @@ async def import_movie_from_tmdb(
                 "movie_id": str(existing_movie.id),
             }
 
-        # TMDB API endpoint for movie details
-        url = f"https://api.themoviedb.org/3/movie/{tmdb_id}"
-
-        # Parameters
-        params = {
-            "api_key": settings.TMDB_API_KEY,
-            "language": "en-US",
-            "append_to_response": "credits,videos",
-        }
-
-        # Make request to TMDB
-        response = requests.get(url, params=params)
-        response.raise_for_status()  # Raise exception for non-200 status codes
-
-        movie_data = response.json()
-
-        # Extract director
-        director = ""
-        if "credits" in movie_data and "crew" in movie_data["credits"]:
-            directors = [
-                crew for crew in movie_data["credits"]["crew"] if crew["job"] == "Director"
-            ]
-            if directors:
-                director = directors[0]["name"]
-
-        # Extract cast
-        cast = []
-        if "credits" in movie_data and "cast" in movie_data["credits"]:
-            cast = [
-                actor["name"] for actor in movie_data["credits"]["cast"][:10]
-            ]  # Get top 10 cast members
-
-        # Extract trailer
-        trailer_url = None
-        if "videos" in movie_data and "results" in movie_data["videos"]:
-            trailers = [
-                video
-                for video in movie_data["videos"]["results"]
-                if video["type"] == "Trailer" and video["site"] == "YouTube"
-            ]
-            if trailers:
-                trailer_url = f"https://www.youtube.com/watch?v={trailers[0]['key']}"
-
-        # Extract genres
-        genres = []
-        if "genres" in movie_data:
-            genres = [genre["name"] for genre in movie_data["genres"]]
-
-        # Parse release date
-        release_date = None
-        if movie_data.get("release_date"):
-            try:
-                release_date = datetime.strptime(movie_data["release_date"], "%Y-%m-%d").date()
-            except Exception:
-                pass
-
-        # Create new movie object
-        new_movie = Movie(
-            tmdb_id=tmdb_id,
-            title=movie_data["title"],
-            overview=movie_data["overview"],
-            poster_path=movie_data.get("poster_path"),
-            backdrop_path=movie_data.get("backdrop_path"),
-            release_date=release_date,
-            runtime=movie_data.get("runtime", 0),
-            status=movie_data.get("status", "Released"),
-            vote_average=movie_data.get("vote_average", 0.0),
-            genres=genres,
-            director=director,
-            cast=cast,
-            trailer_url=trailer_url,
+        # Movie details with credits and videos, in one TMDB request
+        movie_data = await tmdb_client.movie(
+            tmdb_id, append_to_response="credits,videos", language="en-US"
         )
 
+        new_movie = Movie(**movie_values(movie_data))
+
         db.add(new_movie)
+        await table_versions.record(db, "movies")
         await db.commit()
         await db.refresh(new_movie)
 
         return {"message": "Movie imported successfully", "movie_id": str(new_movie.id)}
 
+    except TMDBNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Movie not found on TMDB")
+    except TMDBError as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY, detail=f"TMDB API error: {str(e)}"
+        )
     except Exception as e:
         # Rollback in case of error
         await db.rollback()
@@ -499,6 +636,63 @@ async def import_movie_from_tmdb(
         )
 
 
+@router.post("/tmdb/imports", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+async def bulk_import_movies_from_tmdb(
+    import_in: TMDBBulkImportRequest,
+    current_user: User = Depends(get_current_manager_user),
+) -> Any:
+    """
+    Import many movies from TMDB in the background (admin only).
+
+    Movies are given by TMDB ID and/or as pages of a TMDB movie list. New
+    movies are added and known ones refreshed. Progress is published on
+    ``movies/import/{job_id}`` and can be polled at ``/tmdb/imports/{job_id}``.
+
+    Args:
+        import_in: The movies to import
+        current_user: The authenticated manager
+
+    Returns:
+        dict: The state of the started job
+
+    Raises:
+        HTTPException: If the TMDB list could not be fetched
+    """
+    tmdb_ids = list(import_in.tmdb_ids)
+    if import_in.tmdb_list is not None:
+        try:
+            tmdb_ids += await tmdb_importer.list_ids(import_in.tmdb_list, import_in.pages)
+        except TMDBError as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY, detail=f"TMDB API error: {str(e)}"
+            )
+    return tmdb_importer.start(tmdb_ids).as_dict()
+
+
+@router.get("/tmdb/imports/{job_id}", response_model=dict)
+async def get_tmdb_import(
+    job_id: str,
+    current_user: User = Depends(get_current_manager_user),
+) -> Any:
+    """
+    Get the progress of a bulk TMDB import started on this worker (admin only).
+
+    Args:
+        job_id: ID of the import job
+        current_user: The authenticated manager
+
+    Returns:
+        dict: The state of the job
+
+    Raises:
+        HTTPException: If the job is unknown to this worker
+    """
+    job = tmdb_importer.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+    return job.as_dict()
+
+
 @router.get("/settings", response_model=dict)
 async def get_admin_settings(
     db: AsyncSession = Depends(get_db),
@@ -534,8 +728,8 @@ async def get_admin_settings(
             "maintenance_mode": False,
         },
         "booking": {
-            "max_seats_per_booking": 10,
-            "reservation_timeout_minutes": 15,
+            "max_seats_per_booking": app_settings.MAX_TICKETS_PER_BOOKING,
+            "reservation_timeout_minutes": app_settings.SEAT_HOLD_TIMEOUT_MINUTES,
             "show_sold_out": True,
             "allow_cancel_minutes_before": 120,  # 2 hours
             "booking_fee_percentage": 5.0,
@@ -675,11 +869,15 @@ async def update_showing_admin(
 ) -> Any:
     """
     Update an existing showing (admin only)
+
+    Cancelling a showing cancels all of its bookings in the same transaction,
+    releases their seats and queues a refund email for every booking.
     """
     result = await db.execute(select(Showing).filter(Showing.id == id))
     showing = result.scalars().first()
     if not showing:
         raise HTTPException(status_code=404, detail="Showing not found")
+    cancelling = status == "cancelled" and showing.status != "cancelled"
     if room_id:
         room = (await db.execute(select(Room).filter(Room.id == room_id))).scalars().first()
         if not room:
@@ -713,7 +911,16 @@ async def update_showing_admin(
         conflict = (await db.execute(conflict_query)).scalars().first()
         if conflict:
             raise HTTPException(status_code=400, detail="Time conflict in room")
-    await db.commit()
+    cancellation = await cancel_showing_bookings(db, id) if cancelling else None
+    try:
+        await table_versions.record(db, "showings")
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Time conflict in room")
+    showings_changed()
+    if cancellation is not None:
+        publish_cancellation(cancellation)
     await db.refresh(showing)
     movie = (await db.execute(select(Movie).filter(Movie.id == showing.movie_id))).scalars().first()
     return {
@@ -741,4 +948,6 @@ async def delete_showing_admin(
     if not showing:
         raise HTTPException(status_code=404, detail="Showing not found")
     await db.delete(showing)
+    await table_versions.record(db, "showings")
     await db.commit()
+    showings_changed()
@@ -6,24 +6,23 @@ including creating bookings, retrieving booking information, and handling
 the booking lifecycle.
 """
 
-import json
-import smtplib
-import uuid
+import base64
 from datetime import datetime
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from typing import Any, List
+from typing import Any, Dict, List, Optional, Tuple, cast
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
+from sqlalchemy import Result, func, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
 
-from app.core.config import settings
-from app.core.mqtt_client import get_mqtt_client
+from app.core.booking_service import BookingError, ShowingNotFoundError, booking_service
+from app.core.idempotency import IdempotencyKeyInUse, idempotency, request_fingerprint
+from app.core.mqtt_client import publish_message
+from app.core.seat_holds import InvalidSeatError, SeatConflictError, ShowingClosedError, seat_holds
 from app.core.security import get_current_user
+from app.core.waiting_room import QueueEntry, WaitingRoomFull, waiting_room
 from app.db.session import get_db
 from app.models.booking import Booking
 from app.models.movie import Movie
@@ -31,22 +30,54 @@ from app.models.room import Room
 from app.models.seat_reservation import SeatReservation
 from app.models.showing import Showing
 from app.models.user import User
+from app.schemas.booking import BookingCreate, SeatHoldRequest
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
 
 
+def _encode_cursor(start_time: datetime, booking_id: UUID) -> str:
+    raw = f"{start_time.isoformat()}|{booking_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        start_time, booking_id = raw.split("|")
+        return datetime.fromisoformat(start_time), UUID(booking_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/my-bookings", response_model=List[dict])
 async def get_my_bookings(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    response: Response,
+    filter: Optional[str] = Query(
+        None, pattern="^(upcoming|past|cancelled)$", description="upcoming, past or cancelled"
+    ),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
 ) -> Any:
     """
-    Retrieve all bookings for the currently authenticated user.
+    Retrieve the bookings of the currently authenticated user.
 
-    This endpoint returns a list of the user's bookings with comprehensive information,
+    This endpoint returns a page of the user's bookings with comprehensive information,
     including movie details, showing times, seat information, and booking status.
     This is used for displaying the user's booking history and current tickets.
 
+    Bookings and their seats are loaded in a single query, however long the
+    history is. Pages are keyed on (showing start time, booking id): upcoming
+    and unfiltered bookings are listed soonest first, past and cancelled
+    bookings most recent first. When more bookings follow, the cursor for the
+    next page is returned in the ``X-Next-Cursor`` header.
+
     Args:
+        response: Response used to set the ``X-Next-Cursor`` header
+        filter: Only return upcoming, past or cancelled bookings
+        limit: Maximum number of bookings to return
+        cursor: Cursor of the page to return
         db: Database session dependency
         current_user: The authenticated user (injected by the dependency)
 
@@ -54,41 +85,72 @@ async def get_my_bookings(
         List[dict]: List of booking objects with full movie and showing details
 
     Raises:
-        HTTPException: If authentication fails (handled by dependency)
+        HTTPException: If the cursor is invalid or authentication fails
     """
-    # Query bookings with related info
+    bookings, showings = Booking.__table__.c, Showing.__table__.c
+    movies, rooms, reservations = Movie.__table__.c, Room.__table__.c, SeatReservation.__table__.c
+    seats = (
+        select(
+            func.array_agg(
+                aggregate_order_by(
+                    func.concat(reservations.row, reservations.number),
+                    reservations.row,
+                    reservations.number,
+                )
+            )
+        )
+        .where(reservations.booking_id == bookings.id)
+        .correlate(Booking)
+        .scalar_subquery()
+    )
     query = (
         select(
             Booking,
-            Showing.start_time,
-            Showing.end_time,
-            Movie.title.label("movie_title"),
-            Movie.poster_path,
-            Room.name.label("room_name"),
+            showings.start_time,
+            movies.title.label("movie_title"),
+            movies.poster_path,
+            rooms.name.label("room_name"),
+            seats.label("seats"),
         )
-        .join(Showing, Booking.showing_id == Showing.id)
-        .join(Movie, Showing.movie_id == Movie.id)
-        .join(Room, Showing.room_id == Room.id)
-        .filter(Booking.user_id == current_user.id)
-        .order_by(Showing.start_time)
+        .join(Showing, bookings.showing_id == showings.id)
+        .join(Movie, showings.movie_id == movies.id)
+        .join(Room, showings.room_id == rooms.id)
+        .filter(bookings.user_id == current_user.id)
     )
 
-    result = await db.execute(query)
-    bookings_data = result.all()
+    now = datetime.utcnow()
+    if filter == "cancelled":
+        query = query.filter(bookings.status == "cancelled")
+    elif filter is not None:
+        query = query.filter(bookings.status != "cancelled")
+        if filter == "upcoming":
+            query = query.filter(showings.start_time > now)
+        else:
+            query = query.filter(showings.start_time <= now)
+
+    descending = filter in ("past", "cancelled")
+    key = tuple_(showings.start_time, bookings.id)
+    if cursor:
+        after = tuple_(*_decode_cursor(cursor))
+        query = query.filter(key < after if descending else key > after)
+    if descending:
+        query = query.order_by(showings.start_time.desc(), bookings.id.desc())
+    else:
+        query = query.order_by(showings.start_time, bookings.id)
+
+    result: Result[Booking, datetime, str, Optional[str], str, Optional[List[str]]] = (
+        await db.execute(query.limit(limit + 1))
+    )
+    rows = result.all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(last.start_time, cast(UUID, last[0].id))
 
     bookings_list = []
-    for booking_row in bookings_data:
-        booking = booking_row[0]  # The Booking object
-
-        # Get seat reservations for this booking
-        seats_query = select(SeatReservation).filter(SeatReservation.booking_id == booking.id)
-        seats_result = await db.execute(seats_query)
-        seat_reservations = seats_result.scalars().all()
-        seat_info = [f"{sr.row}{sr.number}" for sr in seat_reservations]
-
+    for booking, start_time, movie_title, poster_path, room_name, seat_info in rows:
         # Determine if this is upcoming or past
-        now = datetime.utcnow()
-        status = "upcoming" if booking_row[1] > now else "past"
+        status = "upcoming" if start_time > now else "past"
         if booking.status == "cancelled":
             status = "cancelled"
 
@@ -96,11 +158,12 @@ async def get_my_bookings(
             {
                 "id": str(booking.id),
                 "booking_number": booking.booking_number,
-                "movie_title": booking_row[3],  # movie_title from the join
-                "poster_path": booking_row[4],  # poster_path from the join
-                "room_name": booking_row[5],  # room_name from the join
-                "showing_time": booking_row[1].isoformat(),  # Format datetime to string
-                "seats": seat_info,
+                "movie_title": movie_title,
+                "poster_path": poster_path,
+                "room_name": room_name,
+                "showing_time": start_time.isoformat(),  # Format datetime to string
+                "ticket_count": booking.ticket_count,
+                "seats": seat_info or [],
                 "total_price": booking.total_price,
                 "booking_date": booking.created_at.isoformat(),
                 "status": status,
@@ -113,198 +176,252 @@ async def get_my_bookings(
 @router.post("/create", response_model=dict)
 async def create_booking(
     screening_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    booking_in: Optional[BookingCreate] = Body(None),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    queue_token: Optional[str] = Header(None, alias="X-Queue-Token", max_length=64),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Create a new booking for a movie showing.
 
-    This endpoint allows authenticated users to create a booking for a specific
-    showing. The booking data must include showing ID, seat information, and
-    payment details if applicable. This endpoint handles the entire booking
-    process including payment processing and confirmation.
+    This endpoint allows authenticated users to book one or more tickets for a
+    specific showing in a single request. All tickets are allocated in one
+    transaction: the capacity claim, the booking, its seat reservations and
+    the confirmation email are committed together, followed by one
+    availability update over MQTT.
+
+    Clients that retry on timeouts should send an ``Idempotency-Key`` header.
+    A retry with the same key returns the original booking (marked with an
+    ``Idempotent-Replayed`` header) instead of booking again.
+
+    A limited number of buyers per showing is let into the booking path at a
+    time. When the showing is busy, the buyer is queued and gets a ``429``
+    with a queue token; once admitted, the buyer retries with the token in
+    the ``X-Queue-Token`` header.
 
     Args:
-        booking_data: Dictionary containing booking details including showing ID and seats
-        db: Database session dependency
+        screening_id: UUID of the showing to book
+        response: Response used to mark replayed requests
+        booking_in: Optional quantity and specific seats to book (defaults to one ticket)
+        idempotency_key: Optional client-chosen key identifying this booking attempt
+        queue_token: Waiting room token of an admitted buyer
         current_user: The authenticated user (injected by the dependency)
 
     Returns:
         dict: Booking confirmation with details including booking ID and reference number
 
     Raises:
-        HTTPException: If the showing is not available, seats are already taken,
-                      or payment processing fails
+        HTTPException: If the showing is not available, not enough tickets are left,
+                      the requested seats are invalid or already taken, the
+                      idempotency key is in use by another request, or the
+                      buyer has to wait in the queue
     """
-    result = await db.execute(
-        select(Showing)
-        .options(joinedload(Showing.room), joinedload(Showing.movie))
-        .filter(Showing.id == screening_id)
-    )
-    screening = result.scalars().first()
+    booking_in = booking_in or BookingCreate()
+    if not idempotency_key:
+        return await _admit_and_book(screening_id, booking_in, queue_token, current_user)
 
-    if not screening:
-        raise HTTPException(status_code=404, detail="Screening not found")
-    if not screening.room:
-        raise HTTPException(status_code=400, detail="Room not linked to screening")
-
-    # Fix: haal het aantal boekingen op via een aparte query
-    bookings_count_result = await db.execute(
-        select(func.count(Booking.id)).where(Booking.showing_id == screening_id)
-    )
-    bookings_count = bookings_count_result.scalar() or 0
-
-    available_tickets = screening.room.capacity - bookings_count
-    if available_tickets <= 0:
-        raise HTTPException(status_code=400, detail="No tickets available for this screening")
-
-    booking_id = uuid.uuid4()
-    # Generate a booking number (e.g., use a short UUID or custom logic)
-    booking_number = str(uuid.uuid4())[:8].upper()  # Example: 8-char unique code
-    booking = Booking(
-        id=booking_id,
-        user_id=current_user.id,
-        showing_id=screening.id,
-        booking_number=booking_number,
-        total_price=screening.price,  # Set the price to the ticket price of the showing
-        status="confirmed",
-    )
-    db.add(booking)
+    key = f"booking:{current_user.id}:{idempotency_key}"
+    fingerprint = request_fingerprint(str(screening_id), booking_in.model_dump(mode="json"))
+    try:
+        replay = await idempotency.begin(key, fingerprint)
+    except IdempotencyKeyInUse as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if replay is not None:
+        response.headers["Idempotent-Replayed"] = "true"
+        return replay
 
-    await db.commit()
+    try:
+        booking = await _admit_and_book(screening_id, booking_in, queue_token, current_user)
+    except BaseException:
+        await idempotency.abandon(key)
+        raise
+    await idempotency.complete(key, fingerprint, booking)
+    return booking
 
-    mqtt_client = get_mqtt_client()
-    remaining = screening.room.capacity - (bookings_count + 1)  # +1 want net geboekt
-    mqtt_client.publish(
-        f"screenings/{screening_id}/update",
-        json.dumps(
-            {
-                "screening_id": str(screening_id),
-                "available_tickets": remaining,
-                "total_capacity": screening.room.capacity,
-            }
-        ),
-    )
 
-    message_html = (
-        """<html>
-        <head>
-            <style>
-                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-                .container { max-width: 600px; margin: 0 auto; padding: 20px; }
-                .header { background-color: #222; color: white; padding: 10px; text-align: center; }
-                .ticket { border: 1px solid #ddd; padding: 15px; margin-top: 20px; }
-                .footer { font-size: 12px; text-align: center; margin-top: 30px; color: #777; }
-            </style>
-        </head>"""
-        + f"""
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>LynrieScoop Cinema</h1>
-                    <h2>Ticket Confirmation</h2>
-                </div>
-
-                <p>Dear {current_user.name},</p>
-
-                <p>Thank you for your booking! Here are your ticket details:</p>
-
-                <div class="ticket">
-                    <p><strong>Booking Number:</strong> {booking.booking_number}</p>
-                    <p>
-                        <strong>Movie:</strong>
-                        {screening.movie.title if screening.movie else "Unknown"}
-                    </p>
-                    <p><strong>Date & Time:</strong> {screening.start_time.isoformat()}</p>
-                    <p><strong>Room:</strong> {screening.room.name}</p>
-                    <p><strong>Total Price:</strong> ${booking.total_price}</p>
-                    <p><strong>Status:</strong> {booking.status}</p>
-                </div>
-
-                <p>Please arrive 15 minutes before the showing. Enjoy your movie!</p>
-
-                <div class="footer">
-                    <p>This is an automated message, please do not reply to this email.</p>
-                    <p>&copy; 2025 LynrieScoop Cinema. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>"""
-    )
+def _queue_status(showing_id: UUID, entry: QueueEntry, position: int) -> Dict[str, Any]:
+    return {
+        "showing_id": str(showing_id),
+        "queue_token": entry.token,
+        "queue_number": entry.number,
+        "position": position,
+        "admitted": position == 0,
+    }
 
-    sender = f"{settings.EMAILS_FROM_NAME} <{settings.EMAILS_FROM_EMAIL}>"
-    receiver = f"{current_user.name} <{current_user.email}>"
 
-    if (
-        not settings.SMTP_HOST
-        or not settings.SMTP_PORT
-        or not settings.SMTP_USER
-        or not settings.SMTP_PASSWORD
-    ):
+async def _admit_and_book(
+    screening_id: UUID,
+    booking_in: BookingCreate,
+    queue_token: Optional[str],
+    current_user: User,
+) -> Dict[str, Any]:
+    try:
+        async with waiting_room.admission(screening_id, cast(UUID, current_user.id), queue_token):
+            return await _create_booking(screening_id, booking_in, current_user)
+    except WaitingRoomFull as e:
         raise HTTPException(
-            status_code=500,
-            detail="Email settings are not configured. Please contact support.",
+            status_code=429,
+            detail=dict(_queue_status(screening_id, e.entry, e.position), message=str(e)),
+            headers={"Retry-After": "5"},
         )
 
-    # Create a proper MIME email
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = f"LynrieScoop - Booking Confirmation - {booking.booking_number}"
-    msg["From"] = sender
-    msg["To"] = receiver
-
-    # Attach HTML part
-    html_part = MIMEText(message_html, "html")
-    msg.attach(html_part)
 
+async def _create_booking(
+    screening_id: UUID, booking_in: BookingCreate, current_user: User
+) -> Dict[str, Any]:
     try:
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.starttls()
-            server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            server.sendmail(sender, receiver, msg.as_string())
-            print(f"Email sent successfully to {receiver}")
-    except Exception as e:
-        print(f"Failed to send email: {str(e)}")
-        # Don't raise exception here so booking can still be completed
-        # But log the error for monitoring
+        booking = await booking_service.book(
+            screening_id,
+            cast(UUID, current_user.id),
+            booking_in.quantity,
+            booking_in.seat_ids or (),
+        )
+    except ShowingNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (BookingError, InvalidSeatError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SeatConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
     return {
-        "booking_id": str(booking_id),
+        "booking_id": str(booking.booking_id),
+        "booking_number": booking.booking_number,
         "screening_id": str(screening_id),
-        "movie_title": screening.movie.title if screening.movie else "Unknown",
-        "start_time": screening.start_time.isoformat(),
-        "room": screening.room.name,
-        "ticket_count": 1,
+        "movie_title": booking.movie_title,
+        "start_time": booking.start_time.isoformat(),
+        "room": booking.room_name,
+        "ticket_count": booking.ticket_count,
+        "seats": booking.seats,
+        "total_price": booking.total_price,
         "status": booking.status,
     }
 
 
 @router.post("/reserve-seats", response_model=dict)
 async def reserve_seats(
-    reservation_data: dict,
+    reservation_data: SeatHoldRequest,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Reserve specific seats for a movie showing.
 
-    This endpoint allows authenticated users to reserve specific seats for a showing.
-    The system verifies seat availability and creates the necessary seat reservation
-    records. MQTT messages are published to notify other users about seat status changes.
+    This endpoint allows authenticated users to hold specific seats for a showing
+    while they complete their booking. Holds expire automatically after
+    ``SEAT_HOLD_TIMEOUT_MINUTES`` and are promoted to booked seats when the user
+    books them through ``/bookings/create``. Conflicting requests are rejected
+    from the in-memory seat state without a database round trip. MQTT messages
+    are published to notify other users about seat status changes.
 
     Args:
-        reservation_data: Dictionary containing showing ID and selected seats
+        reservation_data: Showing ID and the seats to hold
         db: Database session dependency
         current_user: The authenticated user (injected by the dependency)
 
     Returns:
-        dict: Confirmation message with reservation details
+        dict: Confirmation message with the held seats and the hold expiry time
 
     Raises:
-        HTTPException: If seats are unavailable or invalid, or authentication fails
+        HTTPException: If the showing does not exist or is not open for booking,
+                      seats are invalid or already taken, or authentication fails
+    """
+    showing_id = reservation_data.showing_id
+    try:
+        expires_at = await seat_holds.hold(
+            db, showing_id, cast(UUID, current_user.id), reservation_data.seat_ids
+        )
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Showing not found")
+    except (InvalidSeatError, ShowingClosedError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SeatConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    seat_ids = [str(seat_id) for seat_id in reservation_data.seat_ids]
+    publish_message(
+        f"screenings/{showing_id}/seats",
+        {"screening_id": str(showing_id), "seat_ids": seat_ids, "status": "reserved"},
+    )
+    return {
+        "message": "Seats reserved successfully",
+        "showing_id": str(showing_id),
+        "seat_ids": seat_ids,
+        "expires_at": expires_at.isoformat(),
+    }
+
+
+@router.post("/release-seats", response_model=dict)
+async def release_seats(
+    reservation_data: SeatHoldRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Release seats the current user is holding for a showing.
+
+    Args:
+        reservation_data: Showing ID and the seats to release
+        db: Database session dependency
+        current_user: The authenticated user (injected by the dependency)
+
+    Returns:
+        dict: Confirmation message with the released seats
+    """
+    showing_id = reservation_data.showing_id
+    released = await seat_holds.release(
+        db, showing_id, cast(UUID, current_user.id), reservation_data.seat_ids
+    )
+    seat_ids = [str(seat_id) for seat_id in released]
+    if seat_ids:
+        publish_message(
+            f"screenings/{showing_id}/seats",
+            {"screening_id": str(showing_id), "seat_ids": seat_ids, "status": "available"},
+        )
+    return {"message": "Seats released successfully", "seat_ids": seat_ids}
+
+
+@router.post("/queue/{showing_id}", response_model=dict)
+async def join_queue(showing_id: UUID, current_user: User = Depends(get_current_user)) -> Any:
     """
-    # Get MQTT client to publish seat updates
-    # mqtt_client = get_mqtt_client()
+    Join the waiting room of a showing.
 
-    # Placeholder implementation - would need proper implementation
-    # This would typically publish seat status changes via MQTT
-    return {"message": "Seats reserved successfully"}
+    Joining again returns the existing place in line. Progress is published
+    on ``screenings/{showing_id}/queue``; the buyer may book once their
+    ``queue_number`` is at most the published ``admitted_through``.
+
+    Args:
+        showing_id: UUID of the showing
+        current_user: The authenticated user (injected by the dependency)
+
+    Returns:
+        dict: Queue token, queue number, position and whether the buyer is admitted
+    """
+    entry, position = waiting_room.join(showing_id, cast(UUID, current_user.id))
+    return _queue_status(showing_id, entry, position)
+
+
+@router.get("/queue/{showing_id}", response_model=dict)
+async def get_queue_status(
+    showing_id: UUID,
+    token: str = Query(..., max_length=64),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get a buyer's place in the waiting room of a showing.
+
+    Args:
+        showing_id: UUID of the showing
+        token: Queue token returned when joining
+        current_user: The authenticated user (injected by the dependency)
+
+    Returns:
+        dict: Queue token, queue number, position and whether the buyer is admitted
+
+    Raises:
+        HTTPException: If the token is unknown or its admission expired
+    """
+    found = waiting_room.status(showing_id, cast(UUID, current_user.id), token)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Queue token not found or expired")
+    return _queue_status(showing_id, *found)
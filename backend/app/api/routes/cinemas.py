@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core.http_cache import CacheValidator, conditional
 from app.db.session import get_db
 from app.models.room import Room
 
@@ -38,7 +39,10 @@ async def get_cinema_info(db: AsyncSession = Depends(get_db)) -> Any:
 
 
 @router.get("/rooms", response_model=List[dict])
-async def get_rooms(db: AsyncSession = Depends(get_db)) -> Any:
+async def get_rooms(
+    validator: CacheValidator = Depends(conditional("rooms", max_age=300)),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
     """
     Retrieve a list of all rooms in the cinema.
 
@@ -47,11 +51,15 @@ async def get_rooms(db: AsyncSession = Depends(get_db)) -> Any:
     for displaying room options when browsing showings or creating screenings.
 
     Args:
+        validator: HTTP validators; the client's copy is current when set
         db: Database session dependency
 
     Returns:
         List[dict]: List of room objects with basic information
     """
+    if validator.not_modified:
+        return validator.response()
+
     # Get rooms
     query = select(Room)
     result = await db.execute(query)
@@ -61,7 +69,11 @@ async def get_rooms(db: AsyncSession = Depends(get_db)) -> Any:
 
 
 @router.get("/rooms/{room_id}", response_model=dict)
-async def get_room(room_id: UUID, db: AsyncSession = Depends(get_db)) -> Any:
+async def get_room(
+    room_id: UUID,
+    validator: CacheValidator = Depends(conditional("rooms", max_age=300)),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
     """
     Retrieve detailed information about a specific cinema room.
 
@@ -71,6 +83,7 @@ async def get_room(room_id: UUID, db: AsyncSession = Depends(get_db)) -> Any:
 
     Args:
         room_id: UUID of the room to retrieve
+        validator: HTTP validators; the client's copy is current when set
         db: Database session dependency
 
     Returns:
@@ -79,6 +92,9 @@ async def get_room(room_id: UUID, db: AsyncSession = Depends(get_db)) -> Any:
     Raises:
         HTTPException: If the room with the given ID is not found
     """
+    if validator.not_modified:
+        return validator.response()
+
     # Get room
     result = await db.execute(select(Room).filter(Room.id == room_id))
     room = result.scalars().first()
@@ -7,28 +7,45 @@ including CRUD operations and integrations with TMDB for movie data.
 
 from typing import Any, List
 
-import tmdbsimple as tmdb
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.core.config import settings
+from app.core.http_cache import CacheValidator, conditional
+from app.core.tmdb import TMDBError, TMDBNotFoundError
+from app.core.tmdb_cache import tmdb_cache
 from app.db.session import get_db
 from app.models.movie import Movie
 from app.schemas.movie import Movie as MovieSchema
 from app.schemas.movie import MovieDetail, TMDBMovie
 
-tmdb.API_KEY = settings.TMDB_API_KEY
+router = APIRouter(prefix="/movies", tags=["movies"])
 
 
-router = APIRouter(prefix="/movies", tags=["movies"])
+def _tmdb_error(error: TMDBError) -> HTTPException:
+    """Map a TMDB client error to the response of a TMDB-backed endpoint."""
+    if isinstance(error, TMDBNotFoundError):
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Movie not found")
+    return HTTPException(
+        status_code=status.HTTP_502_BAD_GATEWAY, detail=f"TMDB API error: {str(error)}"
+    )
 
 
 @router.get("/", response_model=List[MovieSchema])
-async def get_movies(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)) -> Any:
+async def get_movies(
+    skip: int = 0,
+    limit: int = 100,
+    validator: CacheValidator = Depends(conditional("movies", max_age=60)),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
     """
     Get list of movies from local database
+
+    Answers ``304 Not Modified`` without a query when the client's ETag is
+    current.
     """
+    if validator.not_modified:
+        return validator.response()
     result = await db.execute(select(Movie).offset(skip).limit(limit))
     movies = result.scalars().all()
     return movies
@@ -37,6 +54,7 @@ async def get_movies(skip: int = 0, limit: int = 100, db: AsyncSession = Depends
 @router.get("/by_id/{tmdb_id}", response_model=MovieDetail)
 async def get_movie(
     tmdb_id: int,
+    validator: CacheValidator = Depends(conditional("movies", max_age=60)),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
@@ -58,6 +76,8 @@ async def get_movie(
     Raises:
         HTTPException: If there's an issue retrieving the movies
     """
+    if validator.not_modified:
+        return validator.response()
 
     result = await db.execute(select(Movie).filter(Movie.tmdb_id == tmdb_id))
     movie = result.scalars().first()
@@ -93,8 +113,10 @@ async def get_now_playing_movies(
     Raises:
         HTTPException: If there's an error fetching data from TMDB API
     """
-    collection = tmdb.Movies()
-    now_playing = collection.now_playing(page=page, sort_by=sort_by)
+    try:
+        now_playing = await tmdb_cache.movie_list("now_playing", page=page, sort_by=sort_by)
+    except TMDBError as e:
+        raise _tmdb_error(e)
     return now_playing["results"]
 
 
@@ -120,8 +142,10 @@ async def get_upcoming_movies(
     Raises:
         HTTPException: If there's an error fetching data from TMDB API
     """
-    collection = tmdb.Movies()
-    upcoming = collection.upcoming(page=page, sort_by=sort_by)
+    try:
+        upcoming = await tmdb_cache.movie_list("upcoming", page=page, sort_by=sort_by)
+    except TMDBError as e:
+        raise _tmdb_error(e)
     return upcoming["results"]
 
 
@@ -147,8 +171,10 @@ async def get_popular_movies(
     Raises:
         HTTPException: If there's an error fetching data from TMDB API
     """
-    collection = tmdb.Movies()
-    popular = collection.popular(page=page, sort_by=sort_by)
+    try:
+        popular = await tmdb_cache.movie_list("popular", page=page, sort_by=sort_by)
+    except TMDBError as e:
+        raise _tmdb_error(e)
     return popular["results"]
 
 
@@ -174,8 +200,10 @@ async def get_top_rated_movies(
     Raises:
         HTTPException: If there's an error fetching data from TMDB API
     """
-    collection = tmdb.Movies()
-    top_rated = collection.top_rated(page=page, sort_by=sort_by)
+    try:
+        top_rated = await tmdb_cache.movie_list("top_rated", page=page, sort_by=sort_by)
+    except TMDBError as e:
+        raise _tmdb_error(e)
     return top_rated["results"]
 
 
@@ -188,20 +216,16 @@ async def search_movies(
     Search for movies in TMDB
     """
     try:
-        collection = tmdb.Search()
-        search_results = collection.movie(query=query, page=page)
+        search_results = await tmdb_cache.search_movies(query, page=page)
+    except TMDBError as e:
+        raise _tmdb_error(e)
 
-        if not search_results.get("results"):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No movies found",
-            )
-        return search_results["results"]
-
-    except Exception as e:
+    if not search_results.get("results"):
         raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY, detail=f"TMDB API error: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No movies found",
         )
+    return search_results["results"]
 
 
 @router.get("/tmdb/{tmdb_id}", response_model=TMDBMovie)
@@ -211,8 +235,10 @@ async def get_movie_from_tmdb(
     """
     Get a movie from TMDB by its ID
     """
-    collection = tmdb.Movies(tmdb_id)
-    movie = collection.info()
+    try:
+        movie = await tmdb_cache.movie(tmdb_id)
+    except TMDBError as e:
+        raise _tmdb_error(e)
     if not movie:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
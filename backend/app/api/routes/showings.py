@@ -1,15 +1,24 @@
-from typing import Any, Dict, List
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import Result
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
 
+from app.core.availability import availability
+from app.core.catalog import now_playing
+from app.core.http_cache import CacheValidator, conditional, validator_for
+from app.core.seat_holds import seat_holds
+from app.core.seat_map import pack_seat_map
 from app.db.session import get_db
 from app.models.movie import Movie
+from app.models.room import Room
 from app.models.showing import Showing
-from app.schemas.movie import Movie as MovieSchema
+from app.schemas.movie import NowPlayingMovie
+from app.schemas.showing import ShowingAvailabilityRequest
 
 router = APIRouter(prefix="/showings", tags=["showings"])
 
@@ -17,20 +26,25 @@ router = APIRouter(prefix="/showings", tags=["showings"])
 @router.get("/", response_model=List[Dict])
 async def get_showings(
     movie_id: int = Query(..., description="TMDB ID of the movie"),
+    validator: CacheValidator = Depends(conditional("showings", "movies", "rooms")),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
-    result = await db.execute(select(Movie).filter(Movie.tmdb_id == movie_id))
-    movie = result.scalars().first()
-    if not movie:
-        raise HTTPException(status_code=404, detail="Movie not found")
-
+    if validator.not_modified:
+        return validator.response()
+    movies = Movie.__table__.c
     result = await db.execute(
         select(Showing)
+        .join(Movie, Showing.__table__.c.movie_id == movies.id)
         .options(joinedload(Showing.room))
-        .filter(Showing.movie_id == movie.id)
-        .filter(Showing.status == "scheduled")
+        .filter(movies.tmdb_id == movie_id)
+        .filter(Showing.__table__.c.status == "scheduled")
     )
     showings = result.scalars().all()
+    if not showings:
+        # Only an empty result needs to tell an unknown movie apart
+        movie: Result[UUID] = await db.execute(select(movies.id).filter(movies.tmdb_id == movie_id))
+        if movie.first() is None:
+            raise HTTPException(status_code=404, detail="Movie not found")
 
     return [
         {
@@ -46,85 +60,207 @@ async def get_showings(
     ]
 
 
+@router.get("/schedule", response_model=List[Dict])
+async def get_schedule(
+    start_date: Optional[date] = Query(None, description="First day (default: today)"),
+    days: int = Query(1, ge=1, le=14, description="Number of days to include"),
+    movie_id: Optional[int] = Query(None, description="TMDB ID of the movie"),
+    room_id: Optional[UUID] = None,
+    is_3d: Optional[bool] = None,
+    is_imax: Optional[bool] = None,
+    is_dolby: Optional[bool] = None,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Get all scheduled showings in a date window, ordered by start time.
+
+    Movie, room and remaining tickets come from a single joined query, so a
+    full schedule costs one round trip. The window and the movie and room
+    filters are served by the partial ``(…, start_time)`` indexes over
+    scheduled showings.
+    """
+    first_day = start_date or datetime.utcnow().date()
+    window_start = datetime.combine(first_day, time.min)
+    window_end = window_start + timedelta(days=days)
+
+    showings, movies, rooms = Showing.__table__.c, Movie.__table__.c, Room.__table__.c
+    query = (
+        select(
+            showings.id,
+            showings.start_time,
+            showings.end_time,
+            showings.price,
+            showings.is_3d,
+            showings.is_imax,
+            showings.is_dolby,
+            showings.tickets_sold,
+            movies.tmdb_id,
+            movies.title,
+            movies.poster_path,
+            movies.runtime,
+            rooms.id.label("room_id"),
+            rooms.name.label("room_name"),
+            rooms.capacity,
+        )
+        .join(Movie.__table__, showings.movie_id == movies.id)
+        .join(Room.__table__, showings.room_id == rooms.id)
+        .filter(showings.status == "scheduled")
+        .filter(showings.start_time >= window_start)
+        .filter(showings.start_time < window_end)
+        .order_by(showings.start_time, rooms.name)
+    )
+    if movie_id is not None:
+        query = query.filter(movies.tmdb_id == movie_id)
+    if room_id is not None:
+        query = query.filter(showings.room_id == room_id)
+    if is_3d is not None:
+        query = query.filter(showings.is_3d.is_(is_3d))
+    if is_imax is not None:
+        query = query.filter(showings.is_imax.is_(is_imax))
+    if is_dolby is not None:
+        query = query.filter(showings.is_dolby.is_(is_dolby))
+
+    result: Result[Any] = await db.execute(query)
+    return [
+        {
+            "id": str(row.id),
+            "movie_id": row.tmdb_id,
+            "movie_title": row.title,
+            "movie_poster": row.poster_path,
+            "runtime": row.runtime,
+            "room_id": str(row.room_id),
+            "room_name": row.room_name,
+            "start_time": row.start_time.isoformat(),
+            "end_time": row.end_time.isoformat() if row.end_time else None,
+            "price": row.price,
+            "is_3d": bool(row.is_3d),
+            "is_imax": bool(row.is_imax),
+            "is_dolby": bool(row.is_dolby),
+            "total_capacity": row.capacity,
+            "available_tickets": max(row.capacity - row.tickets_sold, 0),
+        }
+        for row in result.all()
+    ]
+
+
+@router.post("/availability", response_model=List[Dict])
+async def get_showings_availability(
+    request: ShowingAvailabilityRequest,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Get ticket availability of many showings at once.
+
+    Takes a list of showing IDs and/or a start time window and answers with
+    one grouped query, so a page listing hundreds of showings needs a single
+    request. Unknown IDs are left out of the response.
+    """
+    rows = await availability.load_many(
+        db, request.showing_ids, request.start_time, request.end_time
+    )
+    return [
+        {
+            "showing_id": str(showing_id),
+            "status": status,
+            "total_capacity": capacity,
+            "available_tickets": max(capacity - sold, 0) if status == "scheduled" else 0,
+            "held_seats": held,
+        }
+        for showing_id, status, capacity, sold, held in rows
+    ]
+
+
 @router.get("/{id}/tickets", response_model=Dict)
 async def get_showing_tickets(
     id: UUID,
     db: AsyncSession = Depends(get_db),
 ) -> Any:
-    result = await db.execute(
-        select(Showing)
-        .options(joinedload(Showing.room), joinedload(Showing.movie))
-        .filter(Showing.id == id)
-    )
-    showing = result.scalars().first()
-    if not showing:
-        raise HTTPException(status_code=404, detail="Showing not found")
+    """
+    Get ticket availability and details of a showing.
 
-    # Fetch bookings_count using SQL expression
-    bookings_count_result = await db.execute(
-        select(Showing.bookings_count).where(Showing.id == showing.id)
-    )
-    bookings_count = bookings_count_result.scalar() or 0
+    Served from the per-process availability cache, see
+    :mod:`app.core.availability`; the database is only read when the entry
+    is missing or older than ``AVAILABILITY_TTL_SECONDS``.
+    """
+    entry = await availability.get(db, id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Showing not found")
 
     return {
-        "showing_id": str(showing.id),
-        "total_capacity": showing.room.capacity,
-        "available_tickets": showing.room.capacity - bookings_count,
-        "price": showing.price,
-        "movie_title": showing.movie.title if showing.movie else None,
-        "movie_id": showing.movie.tmdb_id if showing.movie else None,
-        "start_time": showing.start_time.isoformat() if showing.start_time else None,
-        "end_time": showing.end_time.isoformat() if showing.end_time else None,
-        "room_name": showing.room.name if showing.room else None,
-        "movie_poster": showing.movie.poster_path if showing.movie else None,
-        "movie_overview": showing.movie.overview if showing.movie else None,
+        "showing_id": str(id),
+        "status": entry.status,
+        "total_capacity": entry.capacity,
+        "available_tickets": entry.available,
+        "held_seats": entry.held,
+        **entry.details,
     }
 
 
 @router.get("/{id}/seats", response_model=List[Dict])
 async def get_showing_seats(
     id: UUID,
+    format: str = Query("json", pattern="^(json|packed)$", description="json or packed"),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
-    result = await db.execute(
-        select(Showing).options(joinedload(Showing.room)).filter(Showing.id == id)
-    )
-    showing = result.scalars().first()
-    if not showing:
+    """
+    Get the seat map of a showing.
+
+    The seat state is served from the in-memory seat hold engine, so a warm
+    showing is answered without touching the database. With ``format=packed``
+    the map is returned as ``application/octet-stream``: three bitsets
+    (unavailable, booked, held) in the room's row/number order, see
+    :func:`app.core.seat_map.pack_seat_map`.
+    """
+    state = await seat_holds.get_state(db, id)
+    if state is None:
         raise HTTPException(status_code=404, detail="Showing not found")
+    state.expire(datetime.utcnow())
+    layout = state.layout
 
-    rows = ["A", "B", "C", "D", "E", "F", "G", "H"]
-    seats_per_row = 12
-    seats = []
+    if format == "packed":
+        return Response(
+            content=pack_seat_map(layout, state.booked, state.held),
+            media_type="application/octet-stream",
+            headers={"X-Seat-Count": str(len(layout)), "X-Room-Id": str(layout.room_id)},
+        )
 
-    for row in rows:
-        for number in range(1, seats_per_row + 1):
-            is_accessible = row == "H" and number in [1, 2]
+    seats = []
+    for i, seat_id in enumerate(layout.seat_ids):
+        bit = 1 << i
+        if not layout.active & bit:
+            status = "unavailable"
+        elif state.booked & bit:
+            status = "booked"
+        elif state.held & bit:
+            status = "reserved"
+        else:
             status = "available"
-            if (row == "D" and number in [6, 7]) or (row == "E" and number in [6, 7]):
-                status = "booked"
-            seats.append(
-                {
-                    "id": f"{row}{number}",
-                    "row": row,
-                    "number": number,
-                    "status": status,
-                    "isAccessible": is_accessible,
-                    "price": 15.0 if is_accessible else 12.0,
-                }
-            )
-
+        seats.append(
+            {
+                "id": str(seat_id),
+                "row": layout.rows[i],
+                "number": layout.numbers[i],
+                "seat_type": layout.seat_types[i],
+                "status": status,
+                "isAccessible": bool(layout.accessible & bit),
+                "price": state.price,
+            }
+        )
     return seats
 
 
-@router.get("/now-playing", response_model=List[MovieSchema])
-async def get_now_playing_from_local(db: AsyncSession = Depends(get_db)) -> Any:
-    """
-    Get all movies that currently have at least one scheduled showing
+@router.get("/now-playing", response_model=List[NowPlayingMovie])
+async def get_now_playing_from_local(request: Request) -> Any:
     """
+    Get all movies that have at least one upcoming scheduled showing.
 
-    result = await db.execute(
-        select(Movie).join(Showing).filter(Showing.status == "scheduled").distinct()
-    )
-    movies = result.scalars().all()
-    return movies
+    Movies are listed soonest showtime first, with their next showtime and
+    lowest price. The list is served from a pre-serialized snapshot that is
+    only rebuilt when showings change, see :mod:`app.core.catalog`. The
+    snapshot's ETag lets browsers revalidate with ``If-None-Match``.
+    """
+    snapshot = await now_playing.get()
+    validator = validator_for(request, snapshot.etag, snapshot.built_at, max_age=0)
+    if validator.not_modified:
+        return validator.response()
+    return Response(content=snapshot.body, media_type="application/json", headers=validator.headers)
@@ -0,0 +1,278 @@
+"""
+Ticket availability cache for the LynrieScoop cinema application.
+
+``/showings/{id}/tickets`` is polled by the booking pages and by the admin
+screenings page for every showing. Instead of loading the showing with its
+room and movie on every poll, each process keeps the capacity, sold and
+held counts of recently requested showings in memory.
+
+The cache is fed from two directions: the booking commit path records the
+new ``tickets_sold`` right after committing, and ``screenings/{id}/update``
+MQTT events (published by every worker) keep other processes in step.
+Entries older than ``AVAILABILITY_TTL_SECONDS`` are reconciled against the
+database on the next read, which bounds the staleness of anything an event
+missed.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import paho.mqtt.client as mqtt
+from sqlalchemy import Result, and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.mqtt_client import handle_topic
+from app.core.seat_holds import HOLD_STATUSES, seat_holds
+from app.models.movie import Movie
+from app.models.room import Room
+from app.models.seat_reservation import SeatReservation
+from app.models.showing import Showing
+
+
+class ShowingAvailability:
+    """
+    Cached availability of a single showing.
+
+    Attributes:
+        showing_id: UUID of the showing
+        status: Status of the showing
+        capacity: Capacity of the showing's room
+        sold: Tickets sold
+        held: Seats currently held by buyers
+        details: Movie, room and time fields of the showing, which do not change
+        loaded_at: Monotonic time the entry was last reconciled with the database
+    """
+
+    __slots__ = ("showing_id", "status", "capacity", "sold", "held", "details", "loaded_at")
+
+    def __init__(
+        self,
+        showing_id: UUID,
+        status: str,
+        capacity: int,
+        sold: int,
+        held: int,
+        details: Dict[str, Any],
+    ) -> None:
+        self.showing_id = showing_id
+        self.status = status
+        self.capacity = capacity
+        self.sold = sold
+        self.held = held
+        self.details = details
+        self.loaded_at = time.monotonic()
+
+    @property
+    def available(self) -> int:
+        """Tickets that can still be booked; none once the showing is no longer scheduled."""
+        if self.status != "scheduled":
+            return 0
+        return max(self.capacity - self.sold, 0)
+
+
+class AvailabilityCache:
+    """
+    Per-process cache of :class:`ShowingAvailability` entries.
+
+    Entries are updated from the request handlers and from the MQTT client
+    thread, so every change goes through a lock.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._entries: Dict[UUID, ShowingAvailability] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, db: AsyncSession, showing_id: UUID) -> Optional[ShowingAvailability]:
+        """
+        Return the availability of a showing, reconciling it with the database if needed.
+
+        Args:
+            db: Database session used when the entry is missing or expired
+            showing_id: UUID of the showing
+
+        Returns:
+            Optional[ShowingAvailability]: The availability, or None if the showing does not exist
+        """
+        entry = self._entries.get(showing_id)
+        if entry is None or time.monotonic() - entry.loaded_at >= self.ttl:
+            entry = await self._load(db, showing_id)
+            if entry is None:
+                self.invalidate(showing_id)
+                return None
+            with self._lock:
+                self._entries[showing_id] = entry
+        held = seat_holds.held_count(showing_id)
+        if held is not None:
+            entry.held = held
+        return entry
+
+    async def _load(self, db: AsyncSession, showing_id: UUID) -> Optional[ShowingAvailability]:
+        showings, rooms, movies = Showing.__table__.c, Room.__table__.c, Movie.__table__.c
+        reservations = SeatReservation.__table__.c
+        held = (
+            select(func.count(reservations.id))
+            .where(reservations.showing_id == showing_id)
+            .where(reservations.status.in_(HOLD_STATUSES))
+            .where(reservations.expires_at > datetime.utcnow())
+            .scalar_subquery()
+        )
+        result: Result[Any] = await db.execute(
+            select(
+                showings.status,
+                showings.tickets_sold,
+                showings.price,
+                showings.start_time,
+                showings.end_time,
+                rooms.capacity,
+                rooms.name.label("room_name"),
+                movies.tmdb_id,
+                movies.title,
+                movies.poster_path,
+                movies.overview,
+                held.label("held"),
+            )
+            .join(Room.__table__, showings.room_id == rooms.id)
+            .outerjoin(Movie.__table__, showings.movie_id == movies.id)
+            .where(showings.id == showing_id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        details = {
+            "price": row.price,
+            "movie_title": row.title,
+            "movie_id": row.tmdb_id,
+            "start_time": row.start_time.isoformat() if row.start_time else None,
+            "end_time": row.end_time.isoformat() if row.end_time else None,
+            "room_name": row.room_name,
+            "movie_poster": row.poster_path,
+            "movie_overview": row.overview,
+        }
+        return ShowingAvailability(
+            showing_id, row.status, int(row.capacity), int(row.tickets_sold), int(row.held), details
+        )
+
+    async def load_many(
+        self,
+        db: AsyncSession,
+        showing_ids: Optional[Sequence[UUID]] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> List[Tuple[UUID, str, int, int, int]]:
+        """
+        Load the availability of many showings with one grouped query.
+
+        Showings are selected by ID and/or start time window. Cached entries
+        of the returned showings are refreshed along the way.
+
+        Args:
+            db: Database session
+            showing_ids: Showings to load
+            start_time: Only showings starting at or after this time
+            end_time: Only showings starting before this time
+
+        Returns:
+            List[Tuple[UUID, str, int, int, int]]: ``(showing_id, status, capacity,
+            sold, held)`` per showing, ordered by start time
+        """
+        showings, rooms = Showing.__table__.c, Room.__table__.c
+        reservations = SeatReservation.__table__.c
+        # Only active holds are joined, so booked seats do not inflate the aggregate
+        holds = and_(
+            reservations.showing_id == showings.id,
+            reservations.status.in_(HOLD_STATUSES),
+            reservations.expires_at > datetime.utcnow(),
+        )
+        query = (
+            select(
+                showings.id,
+                showings.status,
+                rooms.capacity,
+                showings.tickets_sold,
+                func.count(reservations.id),
+            )
+            .join(Room.__table__, showings.room_id == rooms.id)
+            .outerjoin(SeatReservation.__table__, holds)
+            .group_by(showings.id, rooms.capacity)
+            .order_by(showings.start_time)
+        )
+        if showing_ids is not None:
+            query = query.where(showings.id.in_(showing_ids))
+        if start_time is not None:
+            query = query.where(showings.start_time >= start_time)
+        if end_time is not None:
+            query = query.where(showings.start_time < end_time)
+
+        result: Result[UUID, str, int, int, int] = await db.execute(query)
+        rows = [
+            (showing_id, str(status), int(capacity), int(sold), int(held_count))
+            for showing_id, status, capacity, sold, held_count in result.all()
+        ]
+        with self._lock:
+            for showing_id, status, capacity, sold, held_count in rows:
+                entry = self._entries.get(showing_id)
+                if entry is not None:
+                    entry.status, entry.capacity, entry.sold = status, capacity, sold
+                    entry.held = held_count
+        return rows
+
+    def record_sold(self, showing_id: UUID, sold: int, capacity: Optional[int] = None) -> None:
+        """Record the committed ``tickets_sold`` of a showing, if it is cached."""
+        with self._lock:
+            entry = self._entries.get(showing_id)
+            if entry is not None:
+                entry.sold = max(entry.sold, sold)
+                if capacity is not None:
+                    entry.capacity = capacity
+
+    def invalidate(self, showing_id: UUID) -> None:
+        """Forget a showing so that the next read reloads it."""
+        with self._lock:
+            self._entries.pop(showing_id, None)
+
+    def apply_update(self, showing_id: UUID, payload: Dict[str, Any]) -> None:
+        """
+        Apply a ``screenings/{id}/update`` event to the cached entry.
+
+        MQTT does not order events from different workers, so a delayed event
+        may carry an older count. The sold count of a scheduled showing only
+        ever grows, so counts are applied monotonically; loads from the
+        database replace them as they are.
+
+        Args:
+            showing_id: UUID of the showing
+            payload: The event, see the MQTT integration docs
+        """
+        with self._lock:
+            entry = self._entries.get(showing_id)
+            if entry is None:
+                return
+            if "status" in payload:
+                entry.status = str(payload["status"])
+            capacity = payload.get("total_capacity")
+            if isinstance(capacity, int):
+                entry.capacity = capacity
+            available = payload.get("available_tickets")
+            if isinstance(available, int) and entry.status == "scheduled":
+                entry.sold = max(entry.sold, entry.capacity - available)
+            released = payload.get("released_seat_ids")
+            if isinstance(released, list):
+                entry.held = max(entry.held - len(released), 0)
+
+
+availability = AvailabilityCache(settings.AVAILABILITY_TTL_SECONDS)
+
+
+@handle_topic("screenings/+/update")
+def handle_screening_update(client: mqtt.Client, topic: str, payload: dict) -> None:
+    """Keep the availability cache in step with updates published by any worker."""
+    try:
+        showing_id = UUID(str(payload.get("screening_id") or topic.split("/")[1]))
+    except ValueError:
+        return
+    availability.apply_update(showing_id, payload)
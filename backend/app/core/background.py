@@ -0,0 +1,93 @@
+"""
+Background task support for the LynrieScoop cinema application.
+
+This module provides a small periodic task runner tied to the FastAPI
+application lifecycle. Tasks run on the application's event loop, can be
+woken up early, and keep running when a single iteration fails.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional
+
+from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Run an async job repeatedly with a fixed pause between runs.
+
+    Attributes:
+        name: Name used in log messages
+        interval: Seconds to wait between two runs
+        job: Coroutine function executed on every run
+    """
+
+    def __init__(self, name: str, interval: float, job: Callable[[], Awaitable[Any]]) -> None:
+        self.name = name
+        self.interval = interval
+        self.job = job
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def trigger(self) -> None:
+        """Wake the task up so that the next run starts immediately."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Background task {self.name} failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """Start the task on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        """Cancel the task and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+_tasks: List[PeriodicTask] = []
+
+
+def register_periodic_task(task: PeriodicTask) -> PeriodicTask:
+    """Register a task to be started and stopped with the application."""
+    _tasks.append(task)
+    return task
+
+
+def setup_background_tasks_for_app(app: FastAPI) -> None:
+    """Set up registered background tasks for the FastAPI application lifecycle"""
+
+    @app.on_event("startup")
+    async def start_background_tasks() -> None:
+        """Start all registered background tasks on application startup"""
+        for task in _tasks:
+            logger.info(f"Starting background task {task.name}")
+            task.start()
+
+    @app.on_event("shutdown")
+    async def stop_background_tasks() -> None:
+        """Stop all registered background tasks on application shutdown"""
+        for task in _tasks:
+            await task.stop()
@@ -0,0 +1,137 @@
+"""
+Booking reference allocation for the LynrieScoop cinema application.
+
+Booking references are short, human-friendly codes such as ``7K3Q-M9XD``.
+Every reference encodes a distinct number from the ``booking_reference_seq``
+database sequence, so references never collide and a booking never has to be
+retried. The sequence advances in blocks: one ``nextval`` reserves
+``REFERENCE_BLOCK_SIZE`` numbers for this process, which are then handed out
+from memory without a database round trip.
+
+Numbers are scrambled with a bijection before encoding, so consecutive
+bookings do not get consecutive-looking references. Codes use Crockford's
+base32 alphabet (no I, L, O or U) and end with a check symbol that catches
+single-character typos and most swapped neighbours.
+"""
+
+import threading
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.booking import REFERENCE_BLOCK_SIZE, booking_reference_seq
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_VALUES = {char: value for value, char in enumerate(ALPHABET)}
+_VALUES.update({"O": 0, "I": 1, "L": 1})
+
+# Seven base32 symbols hold 35 bits; the scramble is a bijection on that range
+_DATA_SYMBOLS = 7
+_DATA_BITS = 5 * _DATA_SYMBOLS
+_MASK = (1 << _DATA_BITS) - 1
+_MULTIPLIER = 0x5DEECE66D & _MASK | 1  # odd, so invertible modulo 2**35
+_XOR = 0x2A5C3E1B7
+
+
+def _check_symbol(symbols: str) -> str:
+    """Luhn mod 32 check symbol over base32 symbols."""
+    total = 0
+    for position, char in enumerate(reversed(symbols)):
+        value = _VALUES[char]
+        if position % 2 == 0:
+            value *= 2
+            value = value // 32 + value % 32
+        total += value
+    return ALPHABET[(32 - total % 32) % 32]
+
+
+def encode_reference(number: int) -> str:
+    """
+    Encode a sequence number as a booking reference.
+
+    Args:
+        number: Non-negative number from the reference sequence
+
+    Returns:
+        str: Reference of the form ``XXXX-XXXX`` (longer once 2**35 is exceeded)
+    """
+    value = ((number * _MULTIPLIER) & _MASK) ^ _XOR if number <= _MASK else number
+    symbols = ""
+    while value or len(symbols) < _DATA_SYMBOLS:
+        value, digit = divmod(value, 32)
+        symbols = ALPHABET[digit] + symbols
+    code = symbols + _check_symbol(symbols)
+    return f"{code[:4]}-{code[4:]}"
+
+
+def normalize_reference(code: str) -> Optional[str]:
+    """
+    Return the canonical form of a reference typed in by a customer.
+
+    Case, dashes and spaces are ignored and the look-alikes O, I and L are
+    read as 0, 1 and 1.
+
+    Args:
+        code: Reference as entered
+
+    Returns:
+        Optional[str]: The canonical reference, or None if the check symbol does not match
+    """
+    chars = code.upper().replace("-", "").replace(" ", "")
+    if len(chars) < _DATA_SYMBOLS + 1 or any(char not in _VALUES for char in chars):
+        return None
+    canonical = "".join(ALPHABET[_VALUES[char]] for char in chars)
+    if _check_symbol(canonical[:-1]) != canonical[-1]:
+        return None
+    return f"{canonical[:4]}-{canonical[4:]}"
+
+
+class ReferenceAllocator:
+    """
+    Hands out booking references from blocks of the reference sequence.
+
+    The allocator is shared by the request handlers and the MQTT client
+    thread, so the in-memory blocks are guarded by a lock. Blocks fetched by
+    two callers at once are both kept, so no number is ever wasted or reused.
+    """
+
+    def __init__(self, block_size: int) -> None:
+        self.block_size = block_size
+        self._blocks: Deque[Tuple[int, int]] = deque()
+        self._lock = threading.Lock()
+
+    def _take(self) -> Optional[int]:
+        with self._lock:
+            while self._blocks:
+                start, end = self._blocks[0]
+                if start < end:
+                    self._blocks[0] = (start + 1, end)
+                    return start
+                self._blocks.popleft()
+        return None
+
+    async def allocate(self, db: AsyncSession) -> str:
+        """
+        Return a new, unique booking reference.
+
+        A database round trip is only needed once every ``block_size``
+        references, to reserve the next block from the sequence.
+
+        Args:
+            db: Database session used when a new block has to be reserved
+
+        Returns:
+            str: The booking reference
+        """
+        number = self._take()
+        while number is None:
+            start = int((await db.execute(select(booking_reference_seq.next_value()))).scalar_one())
+            with self._lock:
+                self._blocks.append((start, start + self.block_size))
+            number = self._take()
+        return encode_reference(number)
+
+
+booking_references = ReferenceAllocator(REFERENCE_BLOCK_SIZE)
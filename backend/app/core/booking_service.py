@@ -0,0 +1,493 @@
+"""
+Booking service for the LynrieScoop cinema application.
+
+Every booking, whether it comes in over HTTP (``/bookings/create``) or MQTT
+(``booking/request``), goes through :data:`booking_service`. Requests are
+serialized per showing: each showing with pending requests has one worker
+task (an actor) that drains its queue. All requests that piled up while the
+previous transaction was running are processed together and committed in a
+single transaction, so a burst of buyers for one showing costs one row lock,
+one counter update and one commit per group instead of per booking.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple, cast
+from uuid import UUID
+
+import paho.mqtt.client as mqtt
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.core.availability import availability
+from app.core.booking_reference import booking_references
+from app.core.config import settings
+from app.core.idempotency import IdempotencyKeyInUse, idempotency, request_fingerprint
+from app.core.mailer import notify_outbox, queue_email, render_booking_confirmation
+from app.core.mqtt_client import get_app_loop, handle_topic, publish_message
+from app.core.seat_holds import SeatConflictError, SeatHoldError, seat_holds
+from app.core.ticketing import claim_tickets
+from app.core.waiting_room import WaitingRoomFull, waiting_room
+from app.db.session import AsyncSessionLocal
+from app.models.booking import Booking
+from app.models.showing import Showing
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class BookingError(Exception):
+    """Raised when a booking cannot be made."""
+
+
+class ShowingNotFoundError(BookingError):
+    """Raised when the showing does not exist."""
+
+
+class SoldOutError(BookingError):
+    """Raised when not enough tickets are left for the showing."""
+
+
+class BookingResult(NamedTuple):
+    """
+    Outcome of a successful booking.
+
+    Attributes:
+        booking_id: UUID of the new booking
+        booking_number: Customer-facing booking reference
+        showing_id: UUID of the booked showing
+        movie_title: Title of the movie
+        start_time: Start time of the showing
+        room_name: Name of the room
+        ticket_count: Number of tickets in the booking
+        seats: Seat labels (e.g. "D7") for seat bookings
+        total_price: Total price of the booking
+        status: Status of the booking
+        available_tickets: Tickets left for the showing after the booking
+        capacity: Capacity of the showing's room
+    """
+
+    booking_id: UUID
+    booking_number: str
+    showing_id: UUID
+    movie_title: str
+    start_time: datetime
+    room_name: str
+    ticket_count: int
+    seats: List[str]
+    total_price: float
+    status: str
+    available_tickets: int
+    capacity: int
+
+
+class BookingRequest:
+    """A booking request waiting in a showing's queue."""
+
+    __slots__ = ("user_id", "quantity", "seat_ids", "future")
+
+    def __init__(
+        self,
+        user_id: UUID,
+        quantity: int,
+        seat_ids: Sequence[UUID],
+        future: "asyncio.Future[BookingResult]",
+    ) -> None:
+        self.user_id = user_id
+        self.quantity = quantity
+        self.seat_ids = list(seat_ids)
+        self.future = future
+
+
+def _fail(request: BookingRequest, error: Exception) -> None:
+    if not request.future.done():
+        request.future.set_exception(error)
+
+
+class BookingService:
+    """
+    Per-showing booking actors with group commit.
+
+    Actors are created on the first request for a showing and stop after
+    ``idle_seconds`` without requests. A group holds at most ``max_group``
+    requests.
+    """
+
+    def __init__(self, max_group: int, idle_seconds: float) -> None:
+        self.max_group = max(1, max_group)
+        self.idle_seconds = idle_seconds
+        self._queues: Dict[UUID, "asyncio.Queue[BookingRequest]"] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def book(
+        self,
+        showing_id: UUID,
+        user_id: UUID,
+        quantity: int = 1,
+        seat_ids: Sequence[UUID] = (),
+    ) -> BookingResult:
+        """
+        Book tickets for a showing and wait until the booking is committed.
+
+        Args:
+            showing_id: UUID of the showing
+            user_id: UUID of the buyer
+            quantity: Number of tickets (ignored when seats are given)
+            seat_ids: Specific seats to book
+
+        Returns:
+            BookingResult: The committed booking
+
+        Raises:
+            ShowingNotFoundError: If the showing does not exist
+            SoldOutError: If not enough tickets are left
+            BookingError: If the showing cannot be booked
+            InvalidSeatError: If a seat does not belong to the showing's room
+            SeatConflictError: If a seat is booked or held by another user
+        """
+        future: "asyncio.Future[BookingResult]" = asyncio.get_running_loop().create_future()
+        quantity = len(seat_ids) if seat_ids else quantity
+        queue = self._queues.get(showing_id)
+        if queue is None:
+            queue = self._queues[showing_id] = asyncio.Queue()
+            task = asyncio.create_task(self._run(showing_id, queue), name=f"booking-{showing_id}")
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        queue.put_nowait(BookingRequest(user_id, quantity, seat_ids, future))
+        return await future
+
+    async def _run(self, showing_id: UUID, queue: "asyncio.Queue[BookingRequest]") -> None:
+        while True:
+            try:
+                first = await asyncio.wait_for(queue.get(), timeout=self.idle_seconds)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    del self._queues[showing_id]
+                    return
+                continue
+            group = [first]
+            while len(group) < self.max_group and not queue.empty():
+                group.append(queue.get_nowait())
+            try:
+                await self._process(showing_id, group)
+            except Exception as e:
+                logger.exception(f"Booking group for showing {showing_id} failed: {e}")
+                for request in group:
+                    _fail(request, e)
+
+    async def _process(self, showing_id: UUID, group: List[BookingRequest]) -> None:
+        """Book a group of requests for one showing in a single transaction."""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Showing)
+                .options(joinedload(Showing.room), joinedload(Showing.movie))
+                .where(Showing.__table__.c.id == showing_id)
+                .with_for_update(of=Showing)
+            )
+            showing = result.scalars().first()
+            if showing is None or showing.room is None:
+                missing: BookingError = (
+                    ShowingNotFoundError("Screening not found")
+                    if showing is None
+                    else BookingError("Room not linked to screening")
+                )
+                for request in group:
+                    _fail(request, missing)
+                return
+
+            if showing.status != "scheduled":
+                for request in group:
+                    _fail(request, BookingError("Screening is not open for booking"))
+                return
+
+            users = await self._load_users(db, group)
+            start_time = cast(datetime, showing.start_time)
+            capacity = int(showing.room.capacity)
+            sold = int(showing.tickets_sold)
+            booked: List[Tuple[BookingRequest, Booking, List[str]]] = []
+            failed: List[Tuple[BookingRequest, Exception]] = []
+            taken: Set[UUID] = set()
+
+            for request in group:
+                user = users.get(request.user_id)
+                if user is None:
+                    failed.append((request, BookingError("User not found")))
+                    continue
+                if sold + request.quantity > capacity:
+                    failed.append(
+                        (request, SoldOutError("Not enough tickets available for this screening"))
+                    )
+                    continue
+                booking = Booking(
+                    id=uuid.uuid4(),
+                    user_id=request.user_id,
+                    showing_id=showing_id,
+                    booking_number=await booking_references.allocate(db),
+                    ticket_count=request.quantity,
+                    total_price=showing.price * request.quantity,
+                    status="confirmed",
+                )
+                try:
+                    seats = await self._book_seats(db, showing_id, request, booking, taken)
+                except (SeatHoldError, BookingError) as e:
+                    failed.append((request, e))
+                    continue
+                except IntegrityError as e:
+                    # A seat row was taken concurrently; only this request fails
+                    logger.warning(f"Seat booking for showing {showing_id} conflicted: {e}")
+                    failed.append((request, BookingError("Seats are no longer available")))
+                    continue
+                if seats is None:
+                    # The room has no seat map; the ticket counter is all there is
+                    seats = []
+                    db.add(booking)
+                sold += request.quantity
+                booked.append((request, booking, seats))
+
+            if booked:
+                total = sum(request.quantity for request, _, _ in booked)
+                if await claim_tickets(db, showing_id, total) is None:
+                    # Cannot happen while the showing row is locked
+                    raise SoldOutError("Not enough tickets available for this screening")
+                for request, booking, seats in booked:
+                    user = users[request.user_id]
+                    try:
+                        subject, message_html = render_booking_confirmation(
+                            user_name=str(user.name),
+                            booking_number=str(booking.booking_number),
+                            movie_title=showing.movie.title if showing.movie else "Unknown",
+                            start_time=start_time,
+                            room_name=showing.room.name,
+                            total_price=float(booking.total_price),
+                            status="confirmed",
+                            ticket_count=request.quantity,
+                            seats=seats,
+                        )
+                        queue_email(db, f"{user.name} <{user.email}>", subject, message_html)
+                    except Exception as e:
+                        # A missing confirmation email must not cost the booking
+                        logger.exception(
+                            f"Queueing the confirmation of booking {booking.booking_number} "
+                            f"failed: {e}"
+                        )
+                await db.commit()
+
+        for request, error in failed:
+            _fail(request, error)
+        if not booked:
+            return
+
+        # The bookings are committed: answer the callers before anything else can fail
+        for request, booking, seats in booked:
+            if request.future.done():
+                # The caller went away; the booking stands
+                continue
+            request.future.set_result(
+                BookingResult(
+                    booking_id=cast(UUID, booking.id),
+                    booking_number=str(booking.booking_number),
+                    showing_id=showing_id,
+                    movie_title=showing.movie.title if showing.movie else "Unknown",
+                    start_time=start_time,
+                    room_name=showing.room.name,
+                    ticket_count=request.quantity,
+                    seats=seats,
+                    total_price=float(booking.total_price),
+                    status=str(booking.status),
+                    available_tickets=capacity - sold,
+                    capacity=capacity,
+                )
+            )
+
+        try:
+            notify_outbox()
+            availability.record_sold(showing_id, sold, capacity)
+            seat_ids = [seat_id for request, _, _ in booked for seat_id in request.seat_ids]
+            if seat_ids:
+                seat_holds.mark_booked(showing_id, seat_ids)
+                publish_message(
+                    f"screenings/{showing_id}/seats",
+                    {
+                        "screening_id": str(showing_id),
+                        "seat_ids": [str(seat_id) for seat_id in seat_ids],
+                        "status": "booked",
+                    },
+                )
+            publish_message(
+                f"screenings/{showing_id}/update",
+                {
+                    "screening_id": str(showing_id),
+                    "available_tickets": capacity - sold,
+                    "total_capacity": capacity,
+                },
+            )
+        except Exception as e:
+            logger.exception(f"Announcing bookings for showing {showing_id} failed: {e}")
+
+    async def _book_seats(
+        self,
+        db: AsyncSession,
+        showing_id: UUID,
+        request: BookingRequest,
+        booking: Booking,
+        taken: Set[UUID],
+    ) -> Optional[List[str]]:
+        """
+        Add a booking with its seats in a savepoint, choosing seats for quantity requests.
+
+        Chosen seats are stored on the request. Seats booked in the group are
+        added to ``taken``.
+
+        Returns:
+            Optional[List[str]]: Seat labels, or None if the room has no seat map
+            (nothing was added then)
+        """
+        retries = 0 if request.seat_ids else 1
+        while True:
+            seat_ids = request.seat_ids
+            if not seat_ids:
+                picked = await seat_holds.pick(
+                    db, showing_id, request.user_id, request.quantity, taken
+                )
+                if picked is None:
+                    return None
+                if len(picked) < request.quantity:
+                    raise SoldOutError("Not enough tickets available for this screening")
+                seat_ids = picked
+            try:
+                # The booking and its seats succeed or fail together
+                async with db.begin_nested():
+                    db.add(booking)
+                    await db.flush()
+                    seats = await seat_holds.book(
+                        db, showing_id, request.user_id, cast(UUID, booking.id), seat_ids
+                    )
+            except SeatConflictError:
+                if not retries:
+                    raise
+                # Seats chosen from a stale view, which has been reloaded
+                retries -= 1
+                continue
+            request.seat_ids = seat_ids
+            taken.update(seat_ids)
+            return seats
+
+    async def _load_users(self, db: AsyncSession, group: List[BookingRequest]) -> Dict[UUID, User]:
+        result = await db.execute(
+            select(User).where(User.__table__.c.id.in_({request.user_id for request in group}))
+        )
+        return {cast(UUID, user.id): user for user in result.scalars().all()}
+
+
+booking_service = BookingService(
+    settings.BOOKING_GROUP_MAX_SIZE, settings.BOOKING_ACTOR_IDLE_SECONDS
+)
+
+
+@handle_topic("booking/request")
+def handle_booking_request(client: mqtt.Client, topic: str, payload: dict) -> None:
+    """
+    Handle booking requests from clients.
+
+    The request is booked through :data:`booking_service` on the application's
+    event loop, after passing the showing's waiting room like ``/bookings/create``:
+    when the showing is busy, the buyer is queued and answered with their queue
+    token, to send along as ``queue_token`` once admitted. Requests may carry an
+    ``idempotency_key``: a redelivered request with the same key is answered with
+    the original response without booking again.
+    """
+
+    async def book(user_id: UUID, showing_id: UUID) -> dict:
+        """Book one ticket and return the response message for the client"""
+        try:
+            async with waiting_room.admission(showing_id, user_id, payload.get("queue_token")):
+                booking = await booking_service.book(showing_id, user_id)
+        except WaitingRoomFull as e:
+            return {
+                "success": False,
+                "message": str(e),
+                "queued": True,
+                "queue_token": e.entry.token,
+                "queue_number": e.entry.number,
+                "position": e.position,
+            }
+        except ShowingNotFoundError:
+            return {"success": False, "message": "Screening not found"}
+        except SoldOutError:
+            return {"success": False, "message": "No tickets available"}
+        except BookingError as e:
+            return {"success": False, "message": str(e)}
+        except Exception as e:
+            logger.exception(f"Booking request of user {user_id} failed: {e}")
+            return {"success": False, "message": "Booking failed"}
+        return {
+            "success": True,
+            "message": "Booking successful",
+            "bookingId": str(booking.booking_id),
+            "booking_number": booking.booking_number,
+            "movie_title": booking.movie_title,
+            "start_time": booking.start_time.isoformat(),
+            "room": booking.room_name,
+            "status": booking.status,
+        }
+
+    async def process_booking() -> None:
+        """Process the booking request asynchronously"""
+        user_id = payload.get("user_id")
+        showing_id = payload.get("showing_id")
+        idempotency_key = payload.get("idempotency_key")
+
+        try:
+            user_uuid, showing_uuid = UUID(str(user_id)), UUID(str(showing_id))
+        except ValueError:
+            logger.error(f"Invalid booking request: {payload}")
+            publish_message(
+                f"booking/response/{user_id}",
+                {"success": False, "message": "Invalid booking request"},
+            )
+            return
+
+        if not idempotency_key:
+            publish_message(f"booking/response/{user_id}", await book(user_uuid, showing_uuid))
+            return
+
+        key = f"mqtt-booking:{user_id}:{idempotency_key}"
+        fingerprint = request_fingerprint(str(showing_uuid))
+        try:
+            response = await idempotency.begin(key, fingerprint)
+        except IdempotencyKeyInUse as e:
+            logger.warning(f"Ignoring booking request with key {idempotency_key}: {e}")
+            return
+        if response is None:
+            try:
+                response = await book(user_uuid, showing_uuid)
+            except BaseException:
+                await idempotency.abandon(key)
+                raise
+            if response["success"]:
+                await idempotency.complete(key, fingerprint, response)
+            else:
+                await idempotency.abandon(key)
+        publish_message(f"booking/response/{user_id}", response)
+
+    loop = get_app_loop()
+    if loop is None:
+        logger.error("Cannot process booking request: application event loop not running")
+        return
+
+    async def process_or_report() -> None:
+        """Process the request, answering the client even if processing fails"""
+        try:
+            await process_booking()
+        except Exception as e:
+            logger.exception(f"Processing booking request {payload} failed: {e}")
+            publish_message(
+                f"booking/response/{payload.get('user_id')}",
+                {"success": False, "message": "Booking failed"},
+            )
+
+    asyncio.run_coroutine_threadsafe(process_or_report(), loop)
@@ -0,0 +1,185 @@
+"""
+Showing cancellation for the LynrieScoop cinema application.
+
+When a showing is cancelled, all of its bookings are cancelled with it. The
+work is set-based so that the cost does not grow with the number of round
+trips: one ``UPDATE ... RETURNING`` cancels every active booking, one
+``DELETE`` releases every seat, one query loads the affected users and one
+multi-row ``INSERT`` queues the refund emails, all in the caller's
+transaction. Once the caller has committed, :func:`publish_cancellation`
+tells every affected user over MQTT.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple
+from uuid import UUID
+
+from sqlalchemy import Result, Row, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.availability import availability
+from app.core.mailer import notify_outbox, render_booking_cancellation
+from app.core.mqtt_client import publish_message
+from app.core.seat_holds import seat_holds
+from app.models.booking import Booking
+from app.models.email_outbox import EmailOutbox
+from app.models.movie import Movie
+from app.models.room import Room
+from app.models.seat_reservation import SeatReservation
+from app.models.showing import Showing
+from app.models.user import User
+
+
+class CancelledBooking(NamedTuple):
+    """A booking cancelled together with its showing."""
+
+    booking_id: UUID
+    user_id: UUID
+    booking_number: str
+    ticket_count: int
+    refund_amount: float
+
+
+class ShowingCancellation(NamedTuple):
+    """
+    Result of :func:`cancel_showing_bookings`.
+
+    Attributes:
+        showing_id: UUID of the cancelled showing
+        capacity: Capacity of the showing's room
+        bookings: The bookings that were cancelled
+    """
+
+    showing_id: UUID
+    capacity: int
+    bookings: List[CancelledBooking]
+
+
+async def cancel_showing_bookings(db: AsyncSession, showing_id: UUID) -> ShowingCancellation:
+    """
+    Cancel every active booking of a showing in the caller's transaction.
+
+    The showing row is locked first, so bookings committed by the booking
+    service before the lock are included and bookings attempted after it see
+    the cancelled status. Seats are released, ``tickets_sold`` is reset and
+    one refund email is queued per booking. The caller commits and then
+    calls :func:`publish_cancellation`.
+
+    Args:
+        db: Database session with the caller's transaction
+        showing_id: UUID of the showing being cancelled
+
+    Returns:
+        ShowingCancellation: The cancelled bookings
+    """
+    showings, movies, rooms = Showing.__table__.c, Movie.__table__.c, Room.__table__.c
+    showing: Row[Any] = (
+        await db.execute(
+            update(Showing)
+            .where(showings.id == showing_id)
+            .values(tickets_sold=0)
+            .returning(showings.start_time, movies.title, rooms.capacity)
+            .where(showings.movie_id == movies.id)
+            .where(showings.room_id == rooms.id)
+            .execution_options(synchronize_session=False)
+        )
+    ).one()
+
+    result: Result[UUID, UUID, str, int, float] = await db.execute(
+        update(Booking)
+        .where(Booking.__table__.c.showing_id == showing_id)
+        .where(Booking.__table__.c.status.in_(("pending", "confirmed")))
+        .values(status="cancelled", updated_at=datetime.utcnow())
+        .returning(
+            Booking.id,
+            Booking.user_id,
+            Booking.booking_number,
+            Booking.ticket_count,
+            Booking.total_price,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    bookings = [CancelledBooking(*row) for row in result.all()]
+
+    await db.execute(
+        delete(SeatReservation)
+        .where(SeatReservation.__table__.c.showing_id == showing_id)
+        .execution_options(synchronize_session=False)
+    )
+
+    if bookings:
+        users = User.__table__.c
+        found: Result[UUID, str, str] = await db.execute(
+            select(users.id, users.name, users.email).where(
+                users.id.in_({booking.user_id for booking in bookings})
+            )
+        )
+        recipients = {user_id: (name, email) for user_id, name, email in found.all()}
+        emails: List[Dict[str, Any]] = []
+        for booking in bookings:
+            name, email = recipients[booking.user_id]
+            subject, html_body = render_booking_cancellation(
+                user_name=name,
+                booking_number=booking.booking_number,
+                movie_title=showing.title,
+                start_time=showing.start_time,
+                refund_amount=booking.refund_amount,
+            )
+            emails.append(
+                {"recipient": f"{name} <{email}>", "subject": subject, "html_body": html_body}
+            )
+        await db.execute(insert(EmailOutbox), emails)
+
+    return ShowingCancellation(showing_id, int(showing.capacity), bookings)
+
+
+def publish_cancellation(cancellation: ShowingCancellation) -> None:
+    """
+    Announce a committed showing cancellation.
+
+    Every affected user gets one ``booking/response/{user_id}`` message
+    listing all of their cancelled bookings, and everyone watching the
+    showing is told that it can no longer be booked.
+
+    Args:
+        cancellation: Result of :func:`cancel_showing_bookings`
+    """
+    showing_id = cancellation.showing_id
+    seat_holds.invalidate(showing_id)
+    availability.invalidate(showing_id)
+    if cancellation.bookings:
+        notify_outbox()
+
+    by_user: Dict[UUID, List[CancelledBooking]] = defaultdict(list)
+    for booking in cancellation.bookings:
+        by_user[booking.user_id].append(booking)
+    for user_id, bookings in by_user.items():
+        publish_message(
+            f"booking/response/{user_id}",
+            {
+                "success": True,
+                "status": "cancelled",
+                "message": "The screening was cancelled and your booking will be refunded",
+                "screening_id": str(showing_id),
+                "bookings": [
+                    {
+                        "bookingId": str(booking.booking_id),
+                        "booking_number": booking.booking_number,
+                        "ticket_count": booking.ticket_count,
+                        "refund_amount": booking.refund_amount,
+                    }
+                    for booking in bookings
+                ],
+            },
+        )
+
+    publish_message(
+        f"screenings/{showing_id}/update",
+        {
+            "screening_id": str(showing_id),
+            "status": "cancelled",
+            "available_tickets": 0,
+            "total_capacity": cancellation.capacity,
+        },
+    )
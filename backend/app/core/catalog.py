@@ -0,0 +1,161 @@
+"""
+Now-playing catalog for the LynrieScoop cinema application.
+
+The list of movies with upcoming showings is requested on every homepage
+and schedule page view but only changes when showings do. Each process
+keeps the list as a pre-serialized JSON snapshot that is rebuilt on the
+first request after it was invalidated.
+
+The snapshot is invalidated when a showing is created, updated, deleted or
+completed (:func:`showings_changed`), which also tells the other workers
+over MQTT. It additionally expires when the earliest "next showtime" in it
+has passed, and after ``CATALOG_TTL_SECONDS`` as a safety net.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import paho.mqtt.client as mqtt
+from sqlalchemy import Result, func, select
+
+from app.core.config import settings
+from app.core.mqtt_client import handle_topic, publish_message
+from app.db.session import AsyncSessionLocal
+from app.models.movie import Movie
+from app.models.showing import Showing
+from app.schemas.movie import Movie as MovieSchema
+
+INVALIDATE_TOPIC = "catalog/now-playing/invalidate"
+
+
+class Snapshot(NamedTuple):
+    """
+    A serialized now-playing list.
+
+    Attributes:
+        body: UTF-8 encoded JSON array of movies, soonest showtime first
+        etag: Strong ETag derived from the body
+        built_at: When the snapshot was built (UTC)
+    """
+
+    body: bytes
+    etag: str
+    built_at: datetime
+
+
+class NowPlayingCatalog:
+    """
+    Pre-serialized snapshot of the now-playing list.
+
+    Concurrent requests for a missing snapshot share a single rebuild. A
+    rebuild that overlaps an invalidation is served once but not kept.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._snapshot: Optional[Snapshot] = None
+        self._expires_at = 0.0
+        self._valid_until: Optional[datetime] = None
+        self._generation = 0
+        self._rebuild: Optional["asyncio.Task[Snapshot]"] = None
+
+    def invalidate(self) -> None:
+        """Drop the snapshot so that the next request rebuilds it."""
+        self._generation += 1
+        self._snapshot = None
+
+    def _fresh(self) -> bool:
+        if self._snapshot is None or time.monotonic() >= self._expires_at:
+            return False
+        return self._valid_until is None or datetime.utcnow() < self._valid_until
+
+    async def get(self) -> Snapshot:
+        """
+        Return the now-playing list as a JSON document.
+
+        Returns:
+            Snapshot: The serialized list with its validators
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and self._fresh():
+            return snapshot
+        rebuild = self._rebuild
+        if rebuild is None or rebuild.done():
+            rebuild = self._rebuild = asyncio.create_task(self._build(self._generation))
+        return await asyncio.shield(rebuild)
+
+    async def _build(self, generation: int) -> Snapshot:
+        movies, valid_until = await load_now_playing()
+        body = json.dumps(movies).encode()
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        snapshot = Snapshot(body, etag, datetime.utcnow())
+        if generation == self._generation:
+            self._snapshot = snapshot
+            self._expires_at = time.monotonic() + self.ttl
+            self._valid_until = valid_until
+        return snapshot
+
+
+async def load_now_playing() -> Tuple[List[Dict[str, Any]], Optional[datetime]]:
+    """
+    Load the movies that have upcoming scheduled showings.
+
+    Every movie carries its next showtime, lowest ticket price and number of
+    upcoming showings, so listing pages need no follow-up calls.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Optional[datetime]]: The movies, soonest
+        showtime first, and the earliest next showtime (when the list changes
+        next without any showing being edited)
+    """
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        showings = Showing.__table__.c
+        next_showtime = func.min(showings.start_time).label("next_showtime")
+        result: Result[Movie, datetime, float, int] = await db.execute(
+            select(Movie)
+            .add_columns(
+                next_showtime,
+                func.min(showings.price).label("lowest_price"),
+                func.count(showings.id).label("showing_count"),
+            )
+            .join(Showing, showings.movie_id == Movie.__table__.c.id)
+            .where(showings.status == "scheduled")
+            .where(showings.start_time >= now)
+            .group_by(Movie.id)
+            .order_by(next_showtime, Movie.title)
+        )
+        rows = result.all()
+
+    movies = []
+    for movie, starts_at, lowest_price, showing_count in rows:
+        entry = MovieSchema.model_validate(movie).model_dump(mode="json")
+        entry["next_showtime"] = starts_at.isoformat()
+        entry["lowest_price"] = lowest_price
+        entry["showing_count"] = showing_count
+        movies.append(entry)
+    valid_until = rows[0][1] if rows else None
+    return movies, valid_until
+
+
+now_playing = NowPlayingCatalog(settings.CATALOG_TTL_SECONDS)
+
+
+def showings_changed() -> None:
+    """
+    Invalidate the now-playing snapshot after a showing change was committed.
+
+    Other workers are told over MQTT so that they rebuild their snapshot too.
+    """
+    now_playing.invalidate()
+    publish_message(INVALIDATE_TOPIC, {"invalidated_at": datetime.utcnow().isoformat()})
+
+
+@handle_topic(INVALIDATE_TOPIC)
+def handle_catalog_invalidation(client: mqtt.Client, topic: str, payload: dict) -> None:
+    """Drop the local snapshot when another worker changed showings."""
+    now_playing.invalidate()
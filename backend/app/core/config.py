@@ -35,6 +35,41 @@ class Settings(BaseSettings):
         MQTT_PORT: Port for the MQTT broker connection
         TMDB_API_KEY: API key for The Movie Database API
         TMDB_API_BASE_URL: Base URL for TMDB API requests
+        TMDB_RATE_LIMIT_PER_SECOND: Sustained TMDB request rate, below TMDB's per-IP limit
+        TMDB_RATE_LIMIT_BURST: Number of TMDB requests allowed in a burst
+        TMDB_TIMEOUT_SECONDS: Timeout of a single TMDB request
+        TMDB_MAX_RETRIES: Retries of a TMDB request that was rate limited or failed
+        TMDB_MAX_CONNECTIONS: Size of the pooled TMDB connection pool
+        TMDB_LANGUAGE: Language of TMDB responses unless a request asks for another one
+        TMDB_CACHE_MAX_ENTRIES: Maximum number of TMDB responses cached in process memory
+        TMDB_IMPORT_CONCURRENCY: Movies fetched from TMDB at the same time by a bulk import
+        TMDB_SYNC_INTERVAL_SECONDS: Seconds between syncs of changed movie metadata from TMDB
+        MAX_TICKETS_PER_BOOKING: Maximum number of tickets in a single booking
+        SEAT_HOLD_TIMEOUT_MINUTES: How long a seat stays held before it is released
+        SEAT_HOLD_STATE_TTL_SECONDS: How long in-memory seat state is trusted before reloading
+        SEAT_HOLD_REAPER_INTERVAL_SECONDS: Seconds between sweeps for expired seat holds
+        SEAT_HOLD_REAPER_BATCH_SIZE: Maximum number of expired holds released per transaction
+        REDIS_URL: Optional Redis URL for state shared between workers (idempotency keys)
+        IDEMPOTENCY_TTL_SECONDS: How long the response of an idempotent request is kept
+        IDEMPOTENCY_MAX_KEYS: Maximum number of idempotency keys kept in process memory
+        WAITING_ROOM_ACTIVE_BUYERS: Buyers per showing allowed in the booking path at once
+        WAITING_ROOM_ADMISSION_SECONDS: How long an admitted buyer has to complete a booking
+        WAITING_ROOM_QUEUE_TTL_SECONDS: How long a waiting buyer keeps their place without polling
+        BOOKING_GROUP_MAX_SIZE: Maximum number of bookings for one showing committed together
+        BOOKING_ACTOR_IDLE_SECONDS: Seconds a showing's booking worker waits for new requests
+        AVAILABILITY_TTL_SECONDS: How long cached ticket availability is trusted before reloading
+        CATALOG_TTL_SECONDS: Upper bound for the age of the now-playing snapshot
+        TABLE_VERSIONS_RELOAD_SECONDS: Seconds between reloads of the persisted table versions
+        SHOWING_SWEEP_INTERVAL_SECONDS: Seconds between sweeps that complete ended showings
+        SHOWING_SWEEP_BATCH_SIZE: Maximum number of showings completed per transaction
+        SMTP_POOL_SIZE: Number of persistent SMTP connections used by the outbox sender
+        EMAIL_OUTBOX_BATCH_SIZE: Maximum number of outbox messages sent per batch
+        EMAIL_OUTBOX_POLL_SECONDS: Seconds between outbox polls when not woken up
+        EMAIL_MAX_ATTEMPTS: Delivery attempts before an outbox message is marked failed
+        EMAIL_RETRY_BASE_SECONDS: Initial retry delay, doubled after every failed attempt
+        EMAIL_RETRY_MAX_SECONDS: Upper bound for the retry delay
+        EMAIL_SEND_LEASE_SECONDS: How long a claimed outbox message is left to its sender
+        EMAIL_OUTBOX_RETENTION_DAYS: Days sent outbox messages are kept
     """
 
     # API configuration
@@ -56,6 +91,37 @@ class Settings(BaseSettings):
     # TMDB configuration
     TMDB_API_KEY: str = Field("NOT_A_SECRET")
     TMDB_API_BASE_URL: str = "https://api.themoviedb.org/3"
+    TMDB_RATE_LIMIT_PER_SECOND: float = 40.0
+    TMDB_RATE_LIMIT_BURST: int = 20
+    TMDB_TIMEOUT_SECONDS: float = 10.0
+    TMDB_MAX_RETRIES: int = 3
+    TMDB_MAX_CONNECTIONS: int = 10
+    TMDB_LANGUAGE: str = "en-US"
+    TMDB_CACHE_MAX_ENTRIES: int = 2000
+    TMDB_IMPORT_CONCURRENCY: int = 8
+    TMDB_SYNC_INTERVAL_SECONDS: float = 3600.0
+
+    # Booking configuration
+    MAX_TICKETS_PER_BOOKING: int = 10
+    SEAT_HOLD_TIMEOUT_MINUTES: int = 15
+    SEAT_HOLD_STATE_TTL_SECONDS: float = 60.0
+    SEAT_HOLD_REAPER_INTERVAL_SECONDS: float = 10.0
+    SEAT_HOLD_REAPER_BATCH_SIZE: int = 1000
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_MAX_KEYS: int = 100_000
+    WAITING_ROOM_ACTIVE_BUYERS: int = 50
+    WAITING_ROOM_ADMISSION_SECONDS: float = 120.0
+    WAITING_ROOM_QUEUE_TTL_SECONDS: float = 60.0
+    BOOKING_GROUP_MAX_SIZE: int = 64
+    BOOKING_ACTOR_IDLE_SECONDS: float = 30.0
+    AVAILABILITY_TTL_SECONDS: float = 30.0
+    CATALOG_TTL_SECONDS: float = 300.0
+    TABLE_VERSIONS_RELOAD_SECONDS: float = 30.0
+    SHOWING_SWEEP_INTERVAL_SECONDS: float = 60.0
+    SHOWING_SWEEP_BATCH_SIZE: int = 500
+
+    # Redis configuration
+    REDIS_URL: Optional[str] = None
 
     # Environment
     ENVIRONMENT: str = "dev"
@@ -73,6 +139,16 @@ class Settings(BaseSettings):
     EMAILS_FROM_EMAIL: Optional[EmailStr] = None
     EMAILS_FROM_NAME: Optional[str] = None
 
+    # Email outbox delivery
+    SMTP_POOL_SIZE: int = 2
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5.0
+    EMAIL_MAX_ATTEMPTS: int = 8
+    EMAIL_RETRY_BASE_SECONDS: int = 30
+    EMAIL_RETRY_MAX_SECONDS: int = 3600
+    EMAIL_SEND_LEASE_SECONDS: int = 300
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 30
+
     @field_validator("CORS_ORIGINS", mode="before")
     @classmethod
     def assemble_cors_origins(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
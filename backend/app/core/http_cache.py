@@ -0,0 +1,278 @@
+"""
+HTTP validator caching for the LynrieScoop cinema application.
+
+Public read endpoints (movies, showings, rooms) answer browser refreshes
+with ``304 Not Modified`` when nothing they depend on has changed. ETags
+and ``Last-Modified`` are derived from per-table version stamps alone, so a
+conditional request is answered before any database query or serialization.
+
+Stamps are microseconds since the epoch and are persisted in
+``table_versions``. A write bumps the stamps of the tables it changes in its
+own transaction (:meth:`TableVersions.record`), so they never go backwards,
+not even after a delete or a restart. Once the transaction commits, the new
+stamps are applied locally and published to the other workers over MQTT;
+every worker also reloads them periodically in case it missed a message.
+"""
+
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import paho.mqtt.client as mqtt
+from fastapi import Request, Response
+from sqlalchemy import Result, event, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicTask, register_periodic_task
+from app.core.config import settings
+from app.core.mqtt_client import handle_topic, publish_message
+from app.db.session import AsyncSessionLocal
+from app.models.movie import Movie
+from app.models.room import Room
+from app.models.showing import Showing
+from app.models.table_version import TableVersion
+
+TABLES_CHANGED_TOPIC = "cache/tables/changed"
+# Session.info key of the stamps recorded in the open transaction
+PENDING_STAMPS = "table_versions"
+
+# Tables with version stamps, and the column that tells when a row last changed
+VERSIONED_TABLES = {
+    "movies": Movie.updated_at,
+    "showings": Showing.updated_at,
+    "rooms": Room.updated_at,
+}
+
+
+def _stamp(moment: datetime) -> int:
+    return int(moment.replace(tzinfo=timezone.utc).timestamp() * 1_000_000)
+
+
+class TableVersions:
+    """
+    Version stamps of the tables behind the cached endpoints.
+
+    Stamps only move forward, so applying the same change twice (e.g. our
+    own MQTT message coming back) or out of order is harmless. Changes come
+    from request handlers and from the MQTT client thread, so they go
+    through a lock.
+    """
+
+    def __init__(self) -> None:
+        self._stamps: Dict[str, int] = {table: 0 for table in VERSIONED_TABLES}
+        self._lock = threading.Lock()
+
+    async def bootstrap(self) -> None:
+        """
+        Create missing stamp rows and load the stamps, once at startup.
+
+        Tables without a stamp yet start at their newest ``updated_at``.
+        """
+        async with AsyncSessionLocal() as db:
+            result: Result[Any] = await db.execute(select(TableVersion.name))
+            missing = [table for table in VERSIONED_TABLES if table not in set(result.scalars())]
+            if missing:
+                result = await db.execute(
+                    select(*(func.max(VERSIONED_TABLES[table]) for table in missing))
+                )
+                newest = result.one()
+                await db.execute(
+                    insert(TableVersion)
+                    .values(
+                        [
+                            {"name": table, "version": _stamp(updated_at) if updated_at else 0}
+                            for table, updated_at in zip(missing, newest)
+                        ]
+                    )
+                    .on_conflict_do_nothing()
+                )
+                await db.commit()
+        await self.reload()
+
+    async def reload(self) -> None:
+        """Load the persisted stamps, e.g. those of changes whose message was missed."""
+        async with AsyncSessionLocal() as db:
+            result: Result[Any] = await db.execute(select(TableVersion.name, TableVersion.version))
+            stamps = {row.name: row.version for row in result}
+        self.observe(stamps)
+
+    def observe(self, stamps: Dict[str, int]) -> None:
+        """Apply stamps reported by this or another worker."""
+        with self._lock:
+            for table, stamp in stamps.items():
+                if table in self._stamps and stamp > self._stamps[table]:
+                    self._stamps[table] = stamp
+
+    async def record(self, db: AsyncSession, *tables: str) -> None:
+        """
+        Bump the stamps of tables in the transaction that changes them.
+
+        Call this right before committing; the stamps' rows stay locked until
+        then. After the commit, the new stamps are applied and published to
+        the other workers; on rollback they are dropped.
+
+        Args:
+            db: Session of the changing transaction
+            tables: Names of the changed tables
+        """
+        stamp = _stamp(datetime.utcnow())
+        stmt = insert(TableVersion).values(
+            [{"name": table, "version": stamp} for table in sorted(tables)]
+        )
+        result: Result[Any] = await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[TableVersion.name],
+                set_={"version": func.greatest(TableVersion.version + 1, stmt.excluded.version)},
+            ).returning(TableVersion.name, TableVersion.version)
+        )
+        db.sync_session.info.setdefault(PENDING_STAMPS, {}).update(
+            {row.name: row.version for row in result}
+        )
+
+    def stamp(self, tables: Iterable[str]) -> int:
+        """Return the newest stamp of the given tables."""
+        return max(self._stamps[table] for table in tables)
+
+    def etag(self, tables: Iterable[str]) -> str:
+        """Return a weak ETag for a response built from the given tables."""
+        return 'W/"' + "-".join(f"{self._stamps[table]:x}" for table in tables) + '"'
+
+
+table_versions = TableVersions()
+
+table_versions_task = register_periodic_task(
+    PeriodicTask("table-versions", settings.TABLE_VERSIONS_RELOAD_SECONDS, table_versions.reload)
+)
+
+
+@event.listens_for(Session, "after_commit")
+def publish_recorded_stamps(session: Session) -> None:
+    """Apply and publish the stamps recorded in a transaction once it committed."""
+    stamps = session.info.pop(PENDING_STAMPS, None)
+    if stamps:
+        table_versions.observe(stamps)
+        publish_message(TABLES_CHANGED_TOPIC, {"tables": stamps})
+
+
+@event.listens_for(Session, "after_rollback")
+def drop_recorded_stamps(session: Session, *args: Any) -> None:
+    """Forget the stamps recorded in a transaction that was rolled back."""
+    session.info.pop(PENDING_STAMPS, None)
+
+
+@handle_topic(TABLES_CHANGED_TOPIC)
+def handle_tables_changed(client: mqtt.Client, topic: str, payload: dict) -> None:
+    """Apply table changes published by any worker."""
+    stamps = payload.get("tables")
+    if isinstance(stamps, dict):
+        table_versions.observe(
+            {table: stamp for table, stamp in stamps.items() if isinstance(stamp, int)}
+        )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an ``If-None-Match`` header against an ETag, using weak comparison.
+
+    Args:
+        if_none_match: The header value, if sent
+        etag: The current ETag
+
+    Returns:
+        bool: Whether the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: datetime) -> bool:
+    """Check an ``If-Modified-Since`` header, with the header's one-second precision."""
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+class CacheValidator:
+    """
+    Validators of one response, see :func:`conditional`.
+
+    Attributes:
+        headers: ``ETag``, ``Last-Modified`` and ``Cache-Control`` headers
+        not_modified: Whether the client's copy is current
+    """
+
+    def __init__(self, request: Request, etag: str, last_modified: datetime, max_age: int) -> None:
+        self.headers = {
+            "ETag": etag,
+            "Last-Modified": format_datetime(last_modified, usegmt=True),
+            "Cache-Control": f"public, max-age={max_age}, must-revalidate",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            # If-None-Match takes precedence over If-Modified-Since
+            self.not_modified = etag_matches(if_none_match, etag)
+        else:
+            self.not_modified = not_modified_since(
+                request.headers.get("if-modified-since"), last_modified
+            )
+
+    def response(self) -> Response:
+        """Return an empty ``304 Not Modified`` response carrying the validators."""
+        return Response(status_code=304, headers=self.headers)
+
+
+def validator_for(
+    request: Request, etag: str, last_modified: datetime, max_age: int
+) -> CacheValidator:
+    """
+    Build the validator of a response whose ETag is not table-based.
+
+    Args:
+        request: The incoming request
+        etag: ETag of the current representation
+        last_modified: When the representation last changed (UTC)
+        max_age: Seconds browsers and proxies may reuse the response unchecked
+
+    Returns:
+        CacheValidator: The validator
+    """
+    return CacheValidator(request, etag, last_modified.replace(tzinfo=timezone.utc), max_age)
+
+
+def conditional(*tables: str, max_age: int = 0) -> Callable[[Request, Response], CacheValidator]:
+    """
+    Create a dependency that validates a request against table versions.
+
+    The validator headers are added to the endpoint's response. Endpoints
+    return ``validator.response()`` first thing when ``validator.not_modified``
+    is set, before touching the database.
+
+    Args:
+        tables: Tables the response is built from
+        max_age: Seconds browsers and proxies may reuse the response unchecked
+
+    Returns:
+        Callable: The FastAPI dependency
+    """
+
+    def dependency(request: Request, response: Response) -> CacheValidator:
+        stamp = table_versions.stamp(tables)
+        last_modified = datetime.fromtimestamp(stamp / 1_000_000, tz=timezone.utc)
+        validator = CacheValidator(request, table_versions.etag(tables), last_modified, max_age)
+        response.headers.update(validator.headers)
+        return validator
+
+    return dependency
@@ -0,0 +1,201 @@
+"""
+Idempotency keys for the LynrieScoop cinema application.
+
+Clients retry booking requests on timeouts and MQTT messages can be
+redelivered. Requests that carry an idempotency key are recorded here: the
+first request reserves the key, and once it succeeded its response is stored
+so that replays return the original response without touching the database.
+
+Keys live in a small TTL store. By default the store is kept in process
+memory; when ``REDIS_URL`` is configured, keys are shared through Redis so
+that every application worker sees them.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+# How long a key stays reserved while its first request is being processed
+PENDING_TTL_SECONDS = 60
+
+
+class IdempotencyKeyInUse(Exception):
+    """Raised when a key is still being processed or was used for a different request."""
+
+
+def request_fingerprint(*parts: Any) -> str:
+    """Return a stable hash of the request parameters a key was used with."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _check_record(record: Dict[str, Any], fingerprint: str) -> Dict[str, Any]:
+    if record["fingerprint"] != fingerprint:
+        raise IdempotencyKeyInUse("Idempotency key was already used for a different request")
+    if record["response"] is None:
+        raise IdempotencyKeyInUse("A request with this idempotency key is still in progress")
+    response: Dict[str, Any] = record["response"]
+    return response
+
+
+class MemoryIdempotencyStore:
+    """
+    In-process key store with TTL eviction and a size bound.
+
+    The store is shared between the event loop and the MQTT client thread,
+    so all access goes through a lock.
+    """
+
+    def __init__(self, ttl: int, max_keys: int) -> None:
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._records: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float) -> None:
+        while self._records:
+            key, (expires, _) = next(iter(self._records.items()))
+            if expires > now and len(self._records) <= self.max_keys:
+                break
+            del self._records[key]
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._records.get(key)
+            if entry is not None and entry[0] > now:
+                return _check_record(entry[1], fingerprint)
+            record = {"fingerprint": fingerprint, "response": None}
+            self._records[key] = (now + PENDING_TTL_SECONDS, record)
+            self._records.move_to_end(key)
+        return None
+
+    async def complete(self, key: str, fingerprint: str, response: Dict[str, Any]) -> None:
+        record = {"fingerprint": fingerprint, "response": response}
+        with self._lock:
+            self._records[key] = (time.monotonic() + self.ttl, record)
+            self._records.move_to_end(key)
+
+    async def abandon(self, key: str) -> None:
+        with self._lock:
+            self._records.pop(key, None)
+
+
+class RedisIdempotencyStore:
+    """
+    Key store shared between workers through Redis.
+
+    Keys are reserved with ``SET NX`` and expire through Redis TTLs. MQTT
+    handlers hand their work to the application's event loop, so the app
+    uses a single client; one is still kept per event loop because a Redis
+    connection is bound to the loop that opened it (e.g. in scripts).
+    """
+
+    def __init__(self, url: str, ttl: int) -> None:
+        self.url = url
+        self.ttl = ttl
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _client(self) -> Any:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = redis.Redis.from_url(self.url, decode_responses=True)
+            self._clients[loop] = client
+        return client
+
+    def _key(self, key: str) -> str:
+        return f"idempotency:{key}"
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        client = self._client()
+        record = json.dumps({"fingerprint": fingerprint, "response": None})
+        if await client.set(self._key(key), record, nx=True, ex=PENDING_TTL_SECONDS):
+            return None
+        stored = await client.get(self._key(key))
+        if stored is None:
+            # Expired between the two calls; try once more
+            if await client.set(self._key(key), record, nx=True, ex=PENDING_TTL_SECONDS):
+                return None
+            raise IdempotencyKeyInUse("A request with this idempotency key is still in progress")
+        return _check_record(json.loads(stored), fingerprint)
+
+    async def complete(self, key: str, fingerprint: str, response: Dict[str, Any]) -> None:
+        record = json.dumps({"fingerprint": fingerprint, "response": response})
+        await self._client().set(self._key(key), record, ex=self.ttl)
+
+    async def abandon(self, key: str) -> None:
+        await self._client().delete(self._key(key))
+
+
+class IdempotencyKeys:
+    """
+    Front end of the configured key store.
+
+    Usage::
+
+        replay = await idempotency.begin(key, fingerprint)
+        if replay is not None:
+            return replay
+        try:
+            response = ...
+        except BaseException:
+            await idempotency.abandon(key)
+            raise
+        await idempotency.complete(key, fingerprint, response)
+    """
+
+    def __init__(self) -> None:
+        self._store: Optional[Union[MemoryIdempotencyStore, RedisIdempotencyStore]] = None
+
+    @property
+    def store(self) -> Union[MemoryIdempotencyStore, RedisIdempotencyStore]:
+        store = self._store
+        if store is None:
+            if settings.REDIS_URL:
+                store = RedisIdempotencyStore(settings.REDIS_URL, settings.IDEMPOTENCY_TTL_SECONDS)
+            else:
+                store = MemoryIdempotencyStore(
+                    settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_MAX_KEYS
+                )
+            self._store = store
+        return store
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Reserve a key for a new request, or return the stored response of a replay.
+
+        Args:
+            key: Idempotency key, scoped by the caller (e.g. per user)
+            fingerprint: Hash of the request parameters, see :func:`request_fingerprint`
+
+        Returns:
+            Optional[Dict[str, Any]]: The original response for a replay, None for a new request
+
+        Raises:
+            IdempotencyKeyInUse: If the key is still being processed or was used
+                for a different request
+        """
+        return await self.store.begin(key, fingerprint)
+
+    async def complete(self, key: str, fingerprint: str, response: Dict[str, Any]) -> None:
+        """Store the response of a successful request for replays."""
+        await self.store.complete(key, fingerprint, response)
+
+    async def abandon(self, key: str) -> None:
+        """Release a key whose request failed, so that it can be retried."""
+        await self.store.abandon(key)
+
+
+idempotency = IdempotencyKeys()
@@ -0,0 +1,457 @@
+"""
+Transactional email delivery for the LynrieScoop cinema application.
+
+Emails are never sent on the request path. Handlers render a message and add
+it to the ``email_outbox`` table in the same transaction as the change that
+triggers it; a background task drains the outbox over a small pool of
+persistent SMTP connections and retries failed deliveries with backoff.
+
+No transaction is held open while talking to the SMTP server: due messages
+are claimed by pushing their ``next_attempt_at`` past a send lease and
+committing, then sent, then their outcome is recorded in a second short
+transaction. Messages of a worker that died while sending become due again
+when the lease runs out. Sent messages are deleted after
+``EMAIL_OUTBOX_RETENTION_DAYS``.
+"""
+
+import asyncio
+import logging
+import random
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Row, bindparam, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.background import PeriodicTask, register_periodic_task
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.email_outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def render_booking_confirmation(
+    user_name: str,
+    booking_number: str,
+    movie_title: str,
+    start_time: datetime,
+    room_name: str,
+    total_price: float,
+    status: str,
+    ticket_count: int = 1,
+    seats: Sequence[str] = (),
+) -> Tuple[str, str]:
+    """
+    Render the booking confirmation email.
+
+    One confirmation is sent per booking, covering all of its tickets.
+
+    Returns:
+        Tuple[str, str]: The subject line and the HTML body
+    """
+    subject = f"LynrieScoop - Booking Confirmation - {booking_number}"
+    seats_html = f"<p><strong>Seats:</strong> {', '.join(seats)}</p>" if seats else ""
+    html = (
+        """<html>
+        <head>
+            <style>
+                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+                .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+                .header { background-color: #222; color: white; padding: 10px; text-align: center; }
+                .ticket { border: 1px solid #ddd; padding: 15px; margin-top: 20px; }
+                .footer { font-size: 12px; text-align: center; margin-top: 30px; color: #777; }
+            </style>
+        </head>"""
+        + f"""
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>LynrieScoop Cinema</h1>
+                    <h2>Ticket Confirmation</h2>
+                </div>
+
+                <p>Dear {user_name},</p>
+
+                <p>Thank you for your booking! Here are your ticket details:</p>
+
+                <div class="ticket">
+                    <p><strong>Booking Number:</strong> {booking_number}</p>
+                    <p><strong>Movie:</strong> {movie_title}</p>
+                    <p><strong>Date & Time:</strong> {start_time.isoformat()}</p>
+                    <p><strong>Room:</strong> {room_name}</p>
+                    <p><strong>Tickets:</strong> {ticket_count}</p>
+                    {seats_html}
+                    <p><strong>Total Price:</strong> ${total_price}</p>
+                    <p><strong>Status:</strong> {status}</p>
+                </div>
+
+                <p>Please arrive 15 minutes before the showing. Enjoy your movie!</p>
+
+                <div class="footer">
+                    <p>This is an automated message, please do not reply to this email.</p>
+                    <p>&copy; 2025 LynrieScoop Cinema. All rights reserved.</p>
+                </div>
+            </div>
+        </body>
+        </html>"""
+    )
+    return subject, html
+
+
+def render_booking_cancellation(
+    user_name: str,
+    booking_number: str,
+    movie_title: str,
+    start_time: datetime,
+    refund_amount: float,
+) -> Tuple[str, str]:
+    """
+    Render the email sent when a booking is cancelled because its showing was cancelled.
+
+    Returns:
+        Tuple[str, str]: The subject line and the HTML body
+    """
+    subject = f"LynrieScoop - Showing Cancelled - {booking_number}"
+    html = (
+        """<html>
+        <head>
+            <style>
+                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+                .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+                .header { background-color: #222; color: white; padding: 10px; text-align: center; }
+                .ticket { border: 1px solid #ddd; padding: 15px; margin-top: 20px; }
+                .footer { font-size: 12px; text-align: center; margin-top: 30px; color: #777; }
+            </style>
+        </head>"""
+        + f"""
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>LynrieScoop Cinema</h1>
+                    <h2>Showing Cancelled</h2>
+                </div>
+
+                <p>Dear {user_name},</p>
+
+                <p>We are sorry to let you know that the following showing has been cancelled.
+                Your booking has been cancelled and will be refunded in full.</p>
+
+                <div class="ticket">
+                    <p><strong>Booking Number:</strong> {booking_number}</p>
+                    <p><strong>Movie:</strong> {movie_title}</p>
+                    <p><strong>Date & Time:</strong> {start_time.isoformat()}</p>
+                    <p><strong>Refund:</strong> ${refund_amount}</p>
+                </div>
+
+                <div class="footer">
+                    <p>This is an automated message, please do not reply to this email.</p>
+                    <p>&copy; 2025 LynrieScoop Cinema. All rights reserved.</p>
+                </div>
+            </div>
+        </body>
+        </html>"""
+    )
+    return subject, html
+
+
+def queue_email(db: AsyncSession, recipient: str, subject: str, html_body: str) -> EmailOutbox:
+    """
+    Add an email to the outbox as part of the caller's transaction.
+
+    The message is only visible to the sender once the caller commits. Call
+    :func:`notify_outbox` after the commit to have it delivered right away.
+
+    Args:
+        db: Database session with the caller's transaction
+        recipient: Formatted recipient address ("Name <email>")
+        subject: Email subject line
+        html_body: HTML body of the email
+
+    Returns:
+        EmailOutbox: The pending outbox row
+    """
+    message = EmailOutbox(recipient=recipient, subject=subject, html_body=html_body)
+    db.add(message)
+    return message
+
+
+def smtp_configured() -> bool:
+    """Return True if all SMTP settings needed for delivery are present."""
+    return bool(
+        settings.SMTP_HOST and settings.SMTP_PORT and settings.SMTP_USER and settings.SMTP_PASSWORD
+    )
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of persistent, authenticated SMTP connections.
+
+    Connections are used from worker threads so that the blocking ``smtplib``
+    calls never run on the event loop. Idle connections older than
+    ``idle_timeout`` seconds are checked with ``NOOP`` before being reused.
+    """
+
+    def __init__(self, size: int, idle_timeout: float = 30.0) -> None:
+        self.size = max(1, size)
+        self.idle_timeout = idle_timeout
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(str(settings.SMTP_HOST), int(settings.SMTP_PORT or 0), timeout=30)
+        if settings.SMTP_TLS:
+            server.starttls()
+        server.login(str(settings.SMTP_USER), str(settings.SMTP_PASSWORD))
+        return server
+
+    def acquire(self) -> smtplib.SMTP:
+        """Take an idle connection from the pool or open a new one."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                server, idle_since = self._idle.pop()
+            if time.monotonic() - idle_since < self.idle_timeout:
+                return server
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except smtplib.SMTPException:
+                pass
+            self._discard(server)
+        return self._connect()
+
+    def release(self, server: smtplib.SMTP) -> None:
+        """Return a healthy connection to the pool."""
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((server, time.monotonic()))
+                return
+        self._discard(server)
+
+    def _discard(self, server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def send_many(self, messages: Sequence[Tuple[str, str]]) -> List[Optional[str]]:
+        """
+        Send several messages over a single pooled connection.
+
+        Args:
+            messages: ``(recipient, MIME message string)`` pairs
+
+        Returns:
+            List[Optional[str]]: Per message, None on success or the error text
+        """
+        sender = f"{settings.EMAILS_FROM_NAME} <{settings.EMAILS_FROM_EMAIL}>"
+        errors: List[Optional[str]] = []
+        server: Optional[smtplib.SMTP] = None
+        for recipient, body in messages:
+            try:
+                if server is None:
+                    server = self.acquire()
+                server.sendmail(sender, recipient, body)
+                errors.append(None)
+            except smtplib.SMTPServerDisconnected as e:
+                # The connection is unusable; the next message reconnects
+                if server is not None:
+                    server.close()
+                server = None
+                errors.append(str(e))
+            except smtplib.SMTPException as e:
+                # Refused by the server (e.g. a bad recipient); the connection is fine
+                errors.append(str(e))
+            except OSError as e:
+                # Network failure; the next message reconnects
+                if server is not None:
+                    server.close()
+                server = None
+                errors.append(str(e))
+        if server is not None:
+            self.release(server)
+        return errors
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._discard(server)
+
+
+smtp_pool = SMTPConnectionPool(settings.SMTP_POOL_SIZE)
+
+
+def _build_mime(recipient: str, subject: str, html_body: str) -> str:
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = f"{settings.EMAILS_FROM_NAME} <{settings.EMAILS_FROM_EMAIL}>"
+    msg["To"] = recipient
+    msg.attach(MIMEText(html_body, "html"))
+    return msg.as_string()
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter for the given number of failed attempts."""
+    delay = min(
+        settings.EMAIL_RETRY_MAX_SECONDS,
+        settings.EMAIL_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1),
+    )
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+async def _send_batch(messages: Sequence[Row[Any]]) -> List[Optional[str]]:
+    """Send a batch, spreading it over the pooled connections in worker threads."""
+    prepared = [
+        (str(m.recipient), _build_mime(str(m.recipient), str(m.subject), str(m.html_body)))
+        for m in messages
+    ]
+    chunks = [list(range(i, len(prepared), smtp_pool.size)) for i in range(smtp_pool.size)]
+    chunks = [chunk for chunk in chunks if chunk]
+    results = await asyncio.gather(
+        *[asyncio.to_thread(smtp_pool.send_many, [prepared[i] for i in chunk]) for chunk in chunks]
+    )
+    errors: List[Optional[str]] = [None] * len(prepared)
+    for chunk, chunk_errors in zip(chunks, results):
+        for index, error in zip(chunk, chunk_errors):
+            errors[index] = error
+    return errors
+
+
+async def _claim_batch() -> List[Row[Any]]:
+    """
+    Claim due messages for sending and commit the claim.
+
+    Claiming counts as an attempt and moves the messages' ``next_attempt_at``
+    past the send lease, so other workers skip them while they are being sent.
+    """
+    outbox = EmailOutbox.__table__.c
+    now = datetime.utcnow()
+    due = (
+        select(outbox.id)
+        .where(outbox.status == "pending")
+        .where(outbox.next_attempt_at <= now)
+        .order_by(outbox.next_attempt_at)
+        .limit(settings.EMAIL_OUTBOX_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(EmailOutbox.__table__)
+            .where(outbox.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=outbox.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=settings.EMAIL_SEND_LEASE_SECONDS),
+            )
+            .returning(
+                outbox.id, outbox.recipient, outbox.subject, outbox.html_body, outbox.attempts
+            )
+        )
+        claimed = list(result.all())
+        await db.commit()
+    return claimed
+
+
+async def _record_results(messages: Sequence[Row[Any]], errors: Sequence[Optional[str]]) -> None:
+    """Record the outcome of sending claimed messages, in one statement."""
+    now = datetime.utcnow()
+    outcomes: List[Dict[str, Any]] = []
+    for message, error in zip(messages, errors):
+        outcome = {
+            "match_id": message.id,
+            "status": "pending",
+            "sent_at": None,
+            "last_error": error,
+            "next_attempt_at": now,
+        }
+        if error is None:
+            outcome.update(status="sent", sent_at=now)
+        elif message.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+            outcome.update(status="failed")
+            logger.error(f"Giving up on email {message.id} to {message.recipient}: {error}")
+        else:
+            outcome.update(next_attempt_at=now + _retry_delay(message.attempts))
+            logger.warning(f"Email {message.id} failed (attempt {message.attempts}): {error}")
+        outcomes.append(outcome)
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(EmailOutbox.__table__)
+            .where(EmailOutbox.__table__.c.id == bindparam("match_id"))
+            .execution_options(synchronize_session=False),
+            outcomes,
+        )
+        await db.commit()
+
+
+async def deliver_pending_emails() -> int:
+    """
+    Drain due messages from the outbox.
+
+    Due messages are claimed with ``FOR UPDATE SKIP LOCKED`` so that several
+    workers can drain the same outbox without sending a message twice.
+
+    Returns:
+        int: Number of messages attempted
+    """
+    if not smtp_configured():
+        logger.debug("SMTP is not configured; leaving outbox messages pending")
+        return 0
+
+    attempted = 0
+    while True:
+        messages = await _claim_batch()
+        if not messages:
+            return attempted
+        errors = await _send_batch(messages)
+        await _record_results(messages, errors)
+
+        attempted += len(messages)
+        if len(messages) < settings.EMAIL_OUTBOX_BATCH_SIZE:
+            return attempted
+
+
+async def delete_old_emails() -> int:
+    """
+    Delete sent messages older than ``EMAIL_OUTBOX_RETENTION_DAYS``.
+
+    Failed messages are kept for inspection.
+
+    Returns:
+        int: Number of messages deleted
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+    outbox = EmailOutbox.__table__.c
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            delete(EmailOutbox.__table__)
+            .where(outbox.status == "sent")
+            .where(outbox.sent_at < cutoff)
+        )
+        await db.commit()
+    deleted = int(getattr(result, "rowcount", 0) or 0)
+    if deleted:
+        logger.info(f"Deleted {deleted} sent email(s) from the outbox")
+    return deleted
+
+
+email_outbox_task = register_periodic_task(
+    PeriodicTask("email-outbox", settings.EMAIL_OUTBOX_POLL_SECONDS, deliver_pending_emails)
+)
+
+email_retention_task = register_periodic_task(
+    PeriodicTask("email-outbox-retention", 3600.0, delete_old_emails)
+)
+
+
+def notify_outbox() -> None:
+    """Wake the outbox sender after committing new messages."""
+    email_outbox_task.trigger()
@@ -9,31 +9,24 @@ and topic subscription with handler registration.
 import asyncio
 import json
 import logging
-import uuid
 from functools import wraps
 from typing import Any, Callable, Dict
-from uuid import UUID
 
 import paho.mqtt.client as mqtt
 from fastapi import FastAPI
 from paho.mqtt.client import MQTTMessage
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import joinedload
 
 from app.core.config import settings
-from app.models import Booking, Showing
 
 logger = logging.getLogger(__name__)
-# Convert PostgresDsn to string and use asyncpg driver
-postgres_url = str(settings.DATABASE_URL)
-async_postgres_url = postgres_url.replace("postgresql://", "postgresql+asyncpg://")
-engine = create_async_engine(async_postgres_url)
-async_session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
 # MQTT client singleton
 _mqtt_client: mqtt.Client | None = None
 
+# Event loop of the application; topic handlers run in the MQTT client thread
+# and schedule their async work on it
+_app_loop: asyncio.AbstractEventLoop | None = None
+
 # Topic handlers
 _topic_handlers: dict[str, Callable[[mqtt.Client, str, Dict[str, Any]], None]] = {}
 
@@ -99,7 +92,10 @@ def on_connect(client: mqtt.Client, userdata: Any, flags: dict, rc: int) -> None
         # Subscribe to topics
         client.subscribe("booking/request")
         client.subscribe("seats/status/#")
-        logger.info("Subscribed to booking and seat topics")
+        client.subscribe("screenings/+/update")
+        client.subscribe("catalog/now-playing/invalidate")
+        client.subscribe("cache/tables/changed")
+        logger.info("Subscribed to booking, seat, screening, catalog and cache topics")
     else:
         logger.error(f"Failed to connect to MQTT broker with code {rc}")
 
@@ -149,6 +145,11 @@ def handle_topic(topic_pattern: str) -> Callable:
     return decorator
 
 
+def get_app_loop() -> asyncio.AbstractEventLoop | None:
+    """Return the application's event loop, once the application has started"""
+    return _app_loop
+
+
 def publish_message(
     topic: str, payload: Dict[str, Any], qos: int = 0, retain: bool = False
 ) -> bool:
@@ -177,6 +178,8 @@ def setup_mqtt_for_app(app: FastAPI) -> None:
     @app.on_event("startup")
     def startup_mqtt_client() -> None:
         """Initialize MQTT client on application startup"""
+        global _app_loop
+        _app_loop = asyncio.get_running_loop()
         logger.info("Initializing MQTT client on application startup")
         init_mqtt_client()
 
@@ -189,99 +192,3 @@ def setup_mqtt_for_app(app: FastAPI) -> None:
             client.loop_stop()
             client.disconnect()
             logger.info("MQTT client disconnected")
-
-
-# Topic handlers for specific MQTT topics
-@handle_topic("booking/request")
-def handle_booking_request(client: mqtt.Client, topic: str, payload: dict) -> None:
-    """Handle booking requests from clients"""
-
-    async def process_booking() -> None:
-        """Process the booking request asynchronously"""
-        user_id = payload.get("user_id")
-        showing_id = payload.get("showing_id")
-
-        if not user_id or not showing_id:
-            logger.error(f"Invalid booking request: {payload}")
-            publish_message(
-                f"booking/response/{user_id}",
-                {"success": False, "message": "Invalid booking request"},
-            )
-            return
-
-        async with async_session() as db:
-            result = await db.execute(
-                select(Showing)
-                .options(joinedload(Showing.room), joinedload(Showing.movie))
-                .filter(Showing.id == UUID(showing_id))
-            )
-            showing = result.scalars().first()
-
-            if not showing:
-                publish_message(
-                    f"booking/response/{user_id}",
-                    {"success": False, "message": "Screening not found"},
-                )
-                return
-
-            # Fetch bookings_count using SQL expression
-            bookings_count_result = await db.execute(
-                select(getattr(Showing, "bookings_count")).where(Showing.id == showing.id)
-            )
-            bookings_count = bookings_count_result.scalar() or 0
-
-            if bookings_count >= showing.room.capacity:
-                publish_message(
-                    f"booking/response/{user_id}",
-                    {"success": False, "message": "No tickets available"},
-                )
-                return
-
-            booking = Booking(
-                id=uuid.uuid4(),
-                user_id=UUID(user_id),
-                showing_id=showing.id,
-                booking_number=str(uuid.uuid4())[:8].upper(),
-                total_price=showing.price,
-                status="confirmed",
-            )
-
-            db.add(booking)
-            await db.commit()
-
-            # MQTT feedback
-            remaining = showing.room.capacity - (bookings_count + 1)
-            publish_message(
-                f"screenings/{showing_id}/update",
-                {
-                    "screening_id": showing_id,
-                    "available_tickets": remaining,
-                    "total_capacity": showing.room.capacity,
-                },
-            )
-
-            publish_message(
-                f"booking/response/{user_id}",
-                {
-                    "success": True,
-                    "message": "Booking successful",
-                    "bookingId": str(booking.id),
-                    "movie_title": showing.movie.title if showing.movie else "Unknown",
-                    "start_time": showing.start_time.isoformat(),
-                    "room": showing.room.name if showing.room else "Unknown",
-                    "status": "confirmed",
-                },
-            )
-
-    # Schedule the coroutine on the main event loop
-    try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            asyncio.run_coroutine_threadsafe(process_booking(), loop)
-        else:
-            loop.run_until_complete(process_booking())
-    except RuntimeError:
-        # If no event loop is running, create a new one (for safety in rare cases)
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(process_booking())
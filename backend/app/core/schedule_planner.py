@@ -0,0 +1,313 @@
+"""
+Schedule planner for the LynrieScoop cinema application.
+
+Proposes showings for every room over a number of days using the rules of
+the original seed scheduler: showings start at fixed time slots, afternoon
+slots go to family-friendly movies first, a movie is shown at most three
+times a day and never twice at the same time, and showings in a room never
+overlap (existing scheduled showings included).
+
+Within those rules each slot goes to the movie with the best score, where
+the score combines the movie's rating, its past occupancy and how well its
+runtime fills the room until the next slot. Scores do not depend on the day
+or the room, so they are computed once per (slot, movie) pair up front and
+every slot only walks a pre-sorted ranking; larger rooms pick first, so the
+strongest movies land in the biggest rooms.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Float, Result, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.scheduling import ScheduleIndex
+from app.models.movie import Movie
+from app.models.room import Room
+from app.models.showing import Showing
+
+DEFAULT_TIME_SLOTS: List[time] = [
+    time(13, 45),
+    time(14, 0),
+    time(14, 15),
+    time(16, 30),
+    time(16, 45),
+    time(19, 30),
+    time(19, 45),
+    time(21, 30),
+    time(21, 45),
+]
+# Slots starting before this time prefer family-friendly movies
+AFTERNOON_END = time(17, 0)
+MAX_SHOWINGS_PER_MOVIE_PER_DAY = 3
+DEFAULT_RUNTIME_MINUTES = 120
+# Genres stored either as TMDB genre IDs (seed data) or names (TMDB import)
+FAMILY_GENRES = {"10751", "16", "family", "animation"}
+# Past showings considered for occupancy
+OCCUPANCY_LOOKBACK = timedelta(days=28)
+
+RATING_WEIGHT = 0.5
+OCCUPANCY_WEIGHT = 0.5
+# Larger than any demand score, so family-friendly movies always win afternoon slots
+FAMILY_BONUS = 1.0
+
+
+class PlannerMovie(NamedTuple):
+    """
+    A movie that can be scheduled.
+
+    Attributes:
+        movie_id: UUID of the movie
+        runtime: Runtime in minutes
+        rating: Average vote, 0-10
+        family_friendly: Whether the movie is suitable for afternoon family slots
+        occupancy: Average share of seats sold at past showings, if it had any
+    """
+
+    movie_id: UUID
+    runtime: int
+    rating: float
+    family_friendly: bool
+    occupancy: Optional[float] = None
+
+
+class PlannerRoom(NamedTuple):
+    """A room that showings can be planned in."""
+
+    room_id: UUID
+    capacity: int
+
+
+class ProposedShowing(NamedTuple):
+    """A showing proposed by :func:`plan_schedule`."""
+
+    movie_id: UUID
+    room_id: UUID
+    start_time: datetime
+    end_time: datetime
+    score: float
+
+
+def is_family_friendly(genres: Optional[Iterable[str]]) -> bool:
+    """Return whether a movie's genres include family or animation."""
+    return any(str(genre).lower() in FAMILY_GENRES for genre in genres or ())
+
+
+def _minutes(slot: time) -> int:
+    return slot.hour * 60 + slot.minute
+
+
+def score_slots(movies: Sequence[PlannerMovie], time_slots: Sequence[time]) -> List[List[float]]:
+    """
+    Score every movie for every time slot.
+
+    The demand of a movie is its rating and past occupancy; movies without
+    past showings use their rating for both. Demand is scaled by the share
+    of the room's time until the next slot it could take afterwards that the
+    movie actually fills, so runtimes that leave long idle gaps score lower.
+
+    Args:
+        movies: Movies to score
+        time_slots: Start times, in order
+
+    Returns:
+        List[List[float]]: ``scores[slot][movie]``
+    """
+    demand = [
+        RATING_WEIGHT * movie.rating / 10
+        + OCCUPANCY_WEIGHT * (movie.occupancy if movie.occupancy is not None else movie.rating / 10)
+        for movie in movies
+    ]
+    starts = [_minutes(slot) for slot in time_slots]
+    scores = []
+    for i, slot in enumerate(time_slots):
+        bonus = [
+            FAMILY_BONUS if slot < AFTERNOON_END and movie.family_friendly else 0.0
+            for movie in movies
+        ]
+        fill = []
+        for movie in movies:
+            ends = starts[i] + movie.runtime
+            next_start = next((start for start in starts[i + 1 :] if start >= ends), None)
+            # The last showing of the day leaves no gap to fill
+            fill.append(1.0 if next_start is None else movie.runtime / (next_start - starts[i]))
+        scores.append([d * f + b for d, f, b in zip(demand, fill, bonus)])
+    return scores
+
+
+def plan_schedule(
+    movies: Sequence[PlannerMovie],
+    rooms: Sequence[PlannerRoom],
+    start_date: date,
+    days: int,
+    index: Optional[ScheduleIndex] = None,
+    time_slots: Sequence[time] = DEFAULT_TIME_SLOTS,
+    not_before: Optional[datetime] = None,
+) -> List[ProposedShowing]:
+    """
+    Greedily fill the time slots of every room.
+
+    Args:
+        movies: Movies to choose from
+        rooms: Rooms to plan
+        start_date: First day to plan
+        days: Number of days to plan
+        index: Existing showings of the rooms; proposals are added to it
+        time_slots: Start times, in order
+        not_before: Slots starting before this time are skipped
+
+    Returns:
+        List[ProposedShowing]: The proposed showings, by start time
+    """
+    if index is None:
+        index = ScheduleIndex()
+    scores = score_slots(movies, time_slots)
+    rankings = [
+        sorted(range(len(movies)), key=lambda m: slot_scores[m], reverse=True)
+        for slot_scores in scores
+    ]
+    rooms = sorted(rooms, key=lambda room: room.capacity, reverse=True)
+    runtimes = [timedelta(minutes=movie.runtime) for movie in movies]
+
+    proposals: List[ProposedShowing] = []
+    for day in range(days):
+        current_date = start_date + timedelta(days=day)
+        showings_today = [0] * len(movies)
+        for slot, slot_scores, ranking in zip(time_slots, scores, rankings):
+            start_time = datetime.combine(current_date, slot)
+            if not_before is not None and start_time < not_before:
+                continue
+            in_slot = set()
+            for room in rooms:
+                if index.rooms[room.room_id].conflict(
+                    start_time, start_time + timedelta(minutes=1)
+                ):
+                    continue
+                for m in ranking:
+                    if showings_today[m] >= MAX_SHOWINGS_PER_MOVIE_PER_DAY or m in in_slot:
+                        continue
+                    end_time = start_time + runtimes[m]
+                    if (
+                        index.reserve(room.room_id, start_time, end_time, len(proposals))
+                        is not None
+                    ):
+                        continue
+                    proposals.append(
+                        ProposedShowing(
+                            movies[m].movie_id, room.room_id, start_time, end_time, slot_scores[m]
+                        )
+                    )
+                    showings_today[m] += 1
+                    in_slot.add(m)
+                    break
+    return proposals
+
+
+async def load_rooms(
+    db: AsyncSession, room_ids: Optional[Iterable[UUID]] = None
+) -> List[PlannerRoom]:
+    """
+    Load the rooms to plan.
+
+    Args:
+        db: Database session
+        room_ids: Rooms to load (default: all rooms)
+
+    Returns:
+        List[PlannerRoom]: The rooms
+    """
+    rooms = Room.__table__.c
+    query = select(rooms.id, rooms.capacity)
+    if room_ids is not None:
+        query = query.where(rooms.id.in_(set(room_ids)))
+    result: Result[UUID, int] = await db.execute(query)
+    return [PlannerRoom(room_id, int(capacity)) for room_id, capacity in result.all()]
+
+
+async def load_movies(db: AsyncSession, now: Optional[datetime] = None) -> List[PlannerMovie]:
+    """
+    Load every movie with its average occupancy over the last four weeks.
+
+    Args:
+        db: Database session
+        now: Current time (default: now, UTC)
+
+    Returns:
+        List[PlannerMovie]: The movies
+    """
+    now = now or datetime.utcnow()
+    showings, rooms = Showing.__table__.c, Room.__table__.c
+    occupancy = (
+        select(showings.movie_id)
+        .add_columns(
+            func.avg(cast(showings.tickets_sold, Float) / rooms.capacity).label("occupancy")
+        )
+        .join(Room.__table__, showings.room_id == rooms.id)
+        .where(showings.status != "cancelled")
+        .where(showings.start_time >= now - OCCUPANCY_LOOKBACK)
+        .where(showings.start_time < now)
+        .group_by(showings.movie_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            Movie.id,
+            Movie.runtime,
+            Movie.vote_average,
+            Movie.genres,
+            occupancy.c.occupancy,
+        ).outerjoin(occupancy, occupancy.c.movie_id == Movie.id)
+    )
+    return [
+        PlannerMovie(
+            row.id,
+            int(row.runtime or DEFAULT_RUNTIME_MINUTES),
+            float(row.vote_average or 0),
+            is_family_friendly(row.genres),
+            float(row.occupancy) if row.occupancy is not None else None,
+        )
+        for row in result.all()
+    ]
+
+
+async def propose_schedule(
+    db: AsyncSession,
+    start_date: date,
+    days: int = 7,
+    room_ids: Optional[Iterable[UUID]] = None,
+) -> List[ProposedShowing]:
+    """
+    Propose showings for the given rooms around their existing schedule.
+
+    Args:
+        db: Database session
+        start_date: First day to plan
+        days: Number of days to plan
+        room_ids: Rooms to plan (default: all rooms)
+
+    Returns:
+        List[ProposedShowing]: The proposed showings, by start time
+    """
+    now = datetime.utcnow()
+    rooms = await load_rooms(db, room_ids)
+    movies = await load_movies(db, now)
+    if not rooms or not movies:
+        return []
+    window_start = datetime.combine(start_date, time.min)
+    index = await ScheduleIndex.load(
+        db,
+        [room.room_id for room in rooms],
+        window_start - timedelta(days=1),
+        window_start + timedelta(days=days + 1),
+    )
+    return plan_schedule(movies, rooms, start_date, days, index, not_before=now)
+
+
+def summarize(proposals: Sequence[ProposedShowing]) -> Dict[UUID, int]:
+    """Return the minutes of screen time proposed per room."""
+    minutes: Dict[UUID, int] = {}
+    for proposal in proposals:
+        duration = int((proposal.end_time - proposal.start_time).total_seconds() // 60)
+        minutes[proposal.room_id] = minutes.get(proposal.room_id, 0) + duration
+    return minutes
@@ -0,0 +1,129 @@
+"""
+Room schedule conflict detection for the LynrieScoop cinema application.
+
+Bulk schedule changes validate every new showing against the scheduled
+showings of its room. Instead of one overlap query per showing, the
+existing showings of all affected rooms are loaded once into per-room
+sorted interval lists and each new showing is checked with a binary search.
+Showings are half-open intervals ``[start_time, end_time)``, so a showing
+may start exactly when the previous one ends.
+
+Where the ``ex_showings_room_time`` exclusion constraint (see
+:mod:`app.db.init_db`) could be installed, it enforces the same rule in the
+database, so a concurrent change that slips past the in-memory check is
+still rejected. Without it, existing showings may already overlap, so the
+check does not assume they don't.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Union
+from uuid import UUID
+
+from sqlalchemy import Result, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.showing import Showing
+
+# A conflicting showing: the ID of an existing showing, or the position of a
+# showing added earlier in the same batch
+Conflict = Union[UUID, int]
+
+
+class RoomSchedule:
+    """
+    Scheduled showings of one room, sorted by start time.
+
+    Alongside the end times, the latest end time of every prefix is kept:
+    the showings that start before a new showing ends are scanned backwards
+    only as long as one of them can still reach into it.
+    """
+
+    __slots__ = ("starts", "ends", "max_ends", "keys")
+
+    def __init__(self) -> None:
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        self.max_ends: List[datetime] = []
+        self.keys: List[Conflict] = []
+
+    def conflict(self, start_time: datetime, end_time: datetime) -> Optional[Conflict]:
+        """Return a showing that overlaps ``[start_time, end_time)``, if any."""
+        i = bisect_left(self.starts, end_time) - 1
+        while i >= 0 and self.max_ends[i] > start_time:
+            if self.ends[i] > start_time:
+                return self.keys[i]
+            i -= 1
+        return None
+
+    def add(self, start_time: datetime, end_time: datetime, key: Conflict) -> None:
+        i = bisect_right(self.starts, start_time)
+        self.starts.insert(i, start_time)
+        self.ends.insert(i, end_time)
+        self.keys.insert(i, key)
+        self.max_ends.insert(i, end_time)
+        for j in range(i, len(self.ends)):
+            self.max_ends[j] = max(self.ends[j], self.max_ends[j - 1]) if j else self.ends[j]
+
+
+class ScheduleIndex:
+    """Per-room interval index over a time window."""
+
+    def __init__(self) -> None:
+        self.rooms: Dict[UUID, RoomSchedule] = defaultdict(RoomSchedule)
+
+    @classmethod
+    async def load(
+        cls,
+        db: AsyncSession,
+        room_ids: Iterable[UUID],
+        window_start: datetime,
+        window_end: datetime,
+    ) -> "ScheduleIndex":
+        """
+        Load the scheduled showings of rooms that overlap a time window.
+
+        Args:
+            db: Database session
+            room_ids: Rooms to load
+            window_start: Start of the window
+            window_end: End of the window
+
+        Returns:
+            ScheduleIndex: The index, with one query for all rooms
+        """
+        index = cls()
+        showings = Showing.__table__.c
+        result: Result[UUID, UUID, datetime, datetime] = await db.execute(
+            select(showings.id, showings.room_id, showings.start_time, showings.end_time)
+            .where(showings.room_id.in_(set(room_ids)))
+            .where(showings.status == "scheduled")
+            .where(showings.start_time < window_end)
+            .where(showings.end_time > window_start)
+        )
+        for showing_id, room_id, start_time, end_time in result.all():
+            index.rooms[room_id].add(start_time, end_time, showing_id)
+        return index
+
+    def reserve(
+        self, room_id: UUID, start_time: datetime, end_time: datetime, position: int
+    ) -> Optional[Conflict]:
+        """
+        Add a new showing to the index unless it overlaps another one.
+
+        Args:
+            room_id: Room of the new showing
+            start_time: Start of the new showing
+            end_time: End of the new showing
+            position: Position of the new showing in its batch
+
+        Returns:
+            Optional[Conflict]: None if the showing was added, otherwise the
+            conflicting showing
+        """
+        room = self.rooms[room_id]
+        conflict = room.conflict(start_time, end_time)
+        if conflict is None:
+            room.add(start_time, end_time, position)
+        return conflict
@@ -0,0 +1,576 @@
+"""
+Seat hold engine for the LynrieScoop cinema application.
+
+This module keeps a compact in-memory view of the seats of every active
+showing: which seats exist, which are booked and which are temporarily held
+by a user. Conflicting holds are rejected from memory without touching the
+database. Accepted holds are persisted to ``seat_reservations`` with an
+``expires_at`` timestamp; the database stays the final arbiter, so several
+application workers can share the same showings safely. A background task
+releases holds once they expire.
+
+Seats are the single source of truth for what is left of a showing: bookings
+that only give a quantity get seats assigned (:meth:`SeatHoldEngine.pick`),
+so they never take seats other users hold, and a held seat can never have
+been sold already.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Collection, Dict, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import Result, Row, delete, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.background import PeriodicTask, register_periodic_task
+from app.core.config import settings
+from app.core.mqtt_client import publish_message
+from app.core.seat_map import RoomLayout, get_room_layout
+from app.db.session import AsyncSessionLocal
+from app.models.room import Room
+from app.models.seat_reservation import SeatReservation
+from app.models.showing import Showing
+
+logger = logging.getLogger(__name__)
+
+HOLD_STATUSES = ("selected", "reserved")
+
+
+class SeatHoldError(Exception):
+    """Base class for seat hold errors."""
+
+    def __init__(self, message: str, seat_ids: Sequence[UUID] = ()) -> None:
+        super().__init__(message)
+        self.seat_ids = list(seat_ids)
+
+
+class SeatConflictError(SeatHoldError):
+    """Raised when a seat is already booked or held by another user."""
+
+
+class InvalidSeatError(SeatHoldError):
+    """Raised when a seat does not exist for the showing or cannot be booked."""
+
+
+class ShowingClosedError(SeatHoldError):
+    """Raised when seats are held for a showing that is not open for booking."""
+
+
+class ShowingSeats:
+    """
+    In-memory seat state of a single showing.
+
+    Seats are addressed by their index in the room layout (see
+    :mod:`app.core.seat_map`); booked and held seats are kept as bitsets.
+
+    Attributes:
+        layout: Seat layout of the showing's room
+        price: Ticket price of the showing
+        booked: Bitset of booked seats
+        held: Bitset of seats with an active hold
+        holds: Held seat indices, mapped to the holding user and the expiry time
+        loaded_at: Monotonic time the state was loaded from the database
+    """
+
+    __slots__ = ("layout", "price", "booked", "held", "holds", "loaded_at")
+
+    def __init__(self, layout: RoomLayout, price: float) -> None:
+        self.layout = layout
+        self.price = price
+        self.booked = 0
+        self.held = 0
+        self.holds: Dict[int, Tuple[Optional[UUID], datetime]] = {}
+        self.loaded_at = time.monotonic()
+
+    @property
+    def room_id(self) -> UUID:
+        return self.layout.room_id
+
+    def add_hold(self, i: int, user_id: Optional[UUID], expires_at: datetime) -> None:
+        self.holds[i] = (user_id, expires_at)
+        self.held |= 1 << i
+
+    def drop_hold(self, i: int) -> None:
+        self.holds.pop(i, None)
+        self.held &= ~(1 << i)
+
+    def expire(self, now: datetime) -> List[UUID]:
+        """Drop expired holds and return the seats that became available."""
+        expired = [i for i, (_, expires) in self.holds.items() if expires <= now]
+        for i in expired:
+            self.drop_hold(i)
+        return [self.layout.seat_ids[i] for i in expired]
+
+    def conflicts(self, user_id: UUID, indices: Sequence[int], now: datetime) -> List[int]:
+        """Return the seats that are booked or held by someone other than ``user_id``."""
+        conflicting = []
+        for i in indices:
+            bit = 1 << i
+            if self.booked & bit:
+                conflicting.append(i)
+            elif self.held & bit:
+                holder, expires = self.holds[i]
+                if holder != user_id and expires > now:
+                    conflicting.append(i)
+        return conflicting
+
+    def held_by(self, user_id: UUID, now: datetime) -> List[int]:
+        """Return the seats currently held by ``user_id``."""
+        return [
+            i for i, (holder, expires) in self.holds.items() if holder == user_id and expires > now
+        ]
+
+    def available_count(self) -> int:
+        """Return the number of active seats that are neither booked nor held."""
+        return (self.layout.active & ~self.booked & ~self.held).bit_count()
+
+
+class SeatHoldEngine:
+    """
+    Per-process seat hold manager.
+
+    The seat state of a showing is loaded once (two small queries, plus one
+    for the room layout if it is not cached yet) and then served from memory
+    until it is older than ``state_ttl`` seconds. Writes go through a single
+    ``INSERT ... ON CONFLICT DO UPDATE`` that only takes a seat over when it
+    is free or its hold has expired, so a stale view can never lead to a
+    double booking.
+    """
+
+    def __init__(self, timeout_minutes: int, state_ttl: float) -> None:
+        self.timeout = timedelta(minutes=timeout_minutes)
+        self.state_ttl = state_ttl
+        self._showings: Dict[UUID, ShowingSeats] = {}
+
+    def invalidate(self, showing_id: UUID) -> None:
+        """Forget the in-memory state of a showing so it is reloaded on next use."""
+        self._showings.pop(showing_id, None)
+
+    async def get_state(self, db: AsyncSession, showing_id: UUID) -> Optional[ShowingSeats]:
+        """
+        Return the seat state of a showing, loading it from the database if needed.
+
+        Args:
+            db: Database session used to load the state
+            showing_id: UUID of the showing
+
+        Returns:
+            Optional[ShowingSeats]: The seat state, or None if the showing does not exist
+        """
+        state = self._showings.get(showing_id)
+        if state is not None and time.monotonic() - state.loaded_at < self.state_ttl:
+            return state
+
+        showings = Showing.__table__.c
+        reservation = SeatReservation.__table__.c
+        showing: Optional[Row[Any]] = (
+            await db.execute(
+                select(showings.room_id, showings.price).where(showings.id == showing_id)
+            )
+        ).first()
+        if showing is None:
+            self.invalidate(showing_id)
+            return None
+
+        layout = await get_room_layout(db, showing.room_id)
+        state = ShowingSeats(layout, float(showing.price))
+        now = datetime.utcnow()
+        reservations: Result[UUID, Optional[UUID], str, Optional[datetime]] = await db.execute(
+            select(
+                reservation.seat_id,
+                reservation.user_id,
+                reservation.status,
+                reservation.expires_at,
+            ).where(reservation.showing_id == showing_id)
+        )
+        for seat_id, user_id, status, expires_at in reservations.all():
+            i = layout.index.get(seat_id)
+            if i is None:
+                continue
+            if status == "booked":
+                state.booked |= 1 << i
+            elif status in HOLD_STATUSES and expires_at is not None and expires_at > now:
+                state.add_hold(i, user_id, expires_at)
+
+        self._showings[showing_id] = state
+        return state
+
+    def _validate(self, state: ShowingSeats, user_id: UUID, seat_ids: Sequence[UUID]) -> List[int]:
+        """Map seats to layout indices and reject unknown, inactive or taken seats."""
+        layout = state.layout
+        indices = [layout.index.get(seat_id, -1) for seat_id in seat_ids]
+        unknown = [
+            seat_id for seat_id, i in zip(seat_ids, indices) if i < 0 or not layout.active >> i & 1
+        ]
+        if unknown:
+            raise InvalidSeatError("Invalid seats for this showing", unknown)
+        now = datetime.utcnow()
+        state.expire(now)
+        conflicting = state.conflicts(user_id, indices, now)
+        if conflicting:
+            raise SeatConflictError(
+                "One or more seats are already taken", [layout.seat_ids[i] for i in conflicting]
+            )
+        return indices
+
+    async def _upsert(
+        self,
+        db: AsyncSession,
+        showing_id: UUID,
+        state: ShowingSeats,
+        user_id: UUID,
+        indices: Sequence[int],
+        status: str,
+        expires_at: Optional[datetime],
+        booking_id: Optional[UUID],
+    ) -> None:
+        """Take the seats over in the database unless another user still owns them."""
+        now = datetime.utcnow()
+        layout = state.layout
+        seat_ids = [layout.seat_ids[i] for i in indices]
+        reservation = SeatReservation.__table__.c
+        values = insert(SeatReservation).values(
+            [
+                {
+                    "showing_id": showing_id,
+                    "seat_id": layout.seat_ids[i],
+                    "row": layout.rows[i],
+                    "number": layout.numbers[i],
+                    "price": state.price,
+                    "status": status,
+                    "user_id": user_id,
+                    "booking_id": booking_id,
+                    "expires_at": expires_at,
+                }
+                for i in indices
+            ]
+        )
+        stmt = values.on_conflict_do_update(
+            index_elements=[reservation.showing_id, reservation.seat_id],
+            set_={
+                "status": values.excluded.status,
+                "user_id": values.excluded.user_id,
+                "booking_id": values.excluded.booking_id,
+                "expires_at": values.excluded.expires_at,
+                "price": values.excluded.price,
+                "updated_at": now,
+            },
+            where=(reservation.status != "booked")
+            & or_(
+                reservation.status == "available",
+                reservation.user_id == user_id,
+                reservation.expires_at <= now,
+            ),
+        ).returning(reservation.seat_id)
+        taken: Set[UUID] = set((await db.execute(stmt)).scalars().all())
+        if len(taken) < len(seat_ids):
+            # Another worker got there first; our view of the showing is stale
+            self.invalidate(showing_id)
+            raise SeatConflictError(
+                "One or more seats are already taken",
+                [seat_id for seat_id in seat_ids if seat_id not in taken],
+            )
+
+    async def hold(
+        self, db: AsyncSession, showing_id: UUID, user_id: UUID, seat_ids: Sequence[UUID]
+    ) -> datetime:
+        """
+        Hold seats for a user and commit the hold.
+
+        Holding a seat the user already holds extends the hold.
+
+        Args:
+            db: Database session
+            showing_id: UUID of the showing
+            user_id: UUID of the user holding the seats
+            seat_ids: Seats to hold
+
+        Returns:
+            datetime: When the hold expires
+
+        Raises:
+            LookupError: If the showing does not exist
+            InvalidSeatError: If a seat does not belong to the showing's room
+            SeatConflictError: If a seat is booked or held by another user, or the
+                user would hold more than ``MAX_TICKETS_PER_BOOKING`` seats
+            ShowingClosedError: If the showing is not scheduled (any more)
+        """
+        state = await self.get_state(db, showing_id)
+        if state is None:
+            raise LookupError("Showing not found")
+        indices = self._validate(state, user_id, seat_ids)
+        now = datetime.utcnow()
+        if len(set(state.held_by(user_id, now)) | set(indices)) > settings.MAX_TICKETS_PER_BOOKING:
+            raise SeatConflictError("Too many seats held for this showing", seat_ids)
+
+        expires_at = now + self.timeout
+        try:
+            # Shares the showing row with other holds; waits for a cancellation
+            showings = Showing.__table__.c
+            status = (
+                await db.execute(
+                    select(showings.status)
+                    .where(showings.id == showing_id)
+                    .with_for_update(read=True)
+                )
+            ).scalar_one_or_none()
+            if status != "scheduled":
+                raise ShowingClosedError("Screening is not open for booking", seat_ids)
+            await self._upsert(
+                db, showing_id, state, user_id, indices, "reserved", expires_at, None
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        for i in indices:
+            state.add_hold(i, user_id, expires_at)
+        return expires_at
+
+    async def release(
+        self, db: AsyncSession, showing_id: UUID, user_id: UUID, seat_ids: Sequence[UUID]
+    ) -> List[UUID]:
+        """
+        Release seats held by a user and commit.
+
+        Returns:
+            List[UUID]: The seats that were released
+        """
+        reservation = SeatReservation.__table__.c
+        result: Result[Any] = await db.execute(
+            delete(SeatReservation)
+            .where(reservation.showing_id == showing_id)
+            .where(reservation.seat_id.in_(seat_ids))
+            .where(reservation.user_id == user_id)
+            .where(reservation.status.in_(HOLD_STATUSES))
+            .returning(reservation.seat_id)
+        )
+        released = list(result.scalars().all())
+        await db.commit()
+        state = self._showings.get(showing_id)
+        if state is not None:
+            for seat_id in released:
+                if seat_id in state.layout.index:
+                    state.drop_hold(state.layout.index[seat_id])
+        return released
+
+    async def book(
+        self,
+        db: AsyncSession,
+        showing_id: UUID,
+        user_id: UUID,
+        booking_id: UUID,
+        seat_ids: Sequence[UUID],
+    ) -> List[str]:
+        """
+        Book seats for a booking in the caller's transaction.
+
+        Seats held by the user are promoted to ``booked``; free seats are booked
+        directly. The caller commits and then calls :meth:`mark_booked`.
+
+        Returns:
+            List[str]: Seat labels (e.g. "D7") in row order
+
+        Raises:
+            LookupError: If the showing does not exist
+            InvalidSeatError: If a seat does not belong to the showing's room
+            SeatConflictError: If a seat is booked or held by another user
+        """
+        state = await self.get_state(db, showing_id)
+        if state is None:
+            raise LookupError("Showing not found")
+        indices = self._validate(state, user_id, seat_ids)
+        await self._upsert(db, showing_id, state, user_id, indices, "booked", None, booking_id)
+        return [state.layout.label(i) for i in sorted(indices)]
+
+    async def pick(
+        self,
+        db: AsyncSession,
+        showing_id: UUID,
+        user_id: UUID,
+        quantity: int,
+        exclude: Collection[UUID] = (),
+    ) -> Optional[List[UUID]]:
+        """
+        Choose seats for a booking that only gives a quantity.
+
+        Seats the user holds come first, then the first run of adjacent free
+        seats in a row, then the first free seats in layout order. Seats that
+        are booked or held by other users are never chosen.
+
+        Args:
+            db: Database session
+            showing_id: UUID of the showing
+            user_id: UUID of the buyer
+            quantity: Number of seats
+            exclude: Seats already taken in the caller's transaction
+
+        Returns:
+            Optional[List[UUID]]: The seats, fewer than ``quantity`` if not enough
+            are free, or None if the showing's room has no seat map
+
+        Raises:
+            LookupError: If the showing does not exist
+        """
+        state = await self.get_state(db, showing_id)
+        if state is None:
+            raise LookupError("Showing not found")
+        layout = state.layout
+        if not len(layout):
+            return None
+        now = datetime.utcnow()
+        state.expire(now)
+        excluded = {layout.index[seat_id] for seat_id in exclude if seat_id in layout.index}
+        own = [i for i in sorted(state.held_by(user_id, now)) if i not in excluded][:quantity]
+        free_bits = layout.active & ~state.booked & ~state.held
+        free = [i for i in range(len(layout)) if free_bits >> i & 1 and i not in excluded]
+
+        needed = quantity - len(own)
+        chosen = free[:needed]
+        run: List[int] = []
+        for i in free:
+            if run and (
+                layout.rows[i] != layout.rows[run[-1]]
+                or layout.numbers[i] != layout.numbers[run[-1]] + 1
+            ):
+                run = []
+            run.append(i)
+            if len(run) == needed:
+                chosen = run
+                break
+        return [layout.seat_ids[i] for i in own + chosen]
+
+    def forget_expired(
+        self, showing_id: UUID, released: Sequence[Tuple[UUID, datetime]]
+    ) -> Optional[int]:
+        """
+        Drop holds released by the reaper from the in-memory state.
+
+        Holds taken again after the reaper deleted them are kept.
+
+        Args:
+            showing_id: UUID of the showing
+            released: ``(seat_id, expires_at)`` of every deleted hold
+
+        Returns:
+            Optional[int]: Seats now available, or None if the showing is not loaded
+        """
+        state = self._showings.get(showing_id)
+        if state is None:
+            return None
+        for seat_id, expires_at in released:
+            i = state.layout.index.get(seat_id)
+            hold = state.holds.get(i) if i is not None else None
+            if i is not None and hold is not None and hold[1] <= expires_at:
+                state.drop_hold(i)
+        return state.available_count()
+
+    def held_count(self, showing_id: UUID) -> Optional[int]:
+        """Return the number of held seats from memory, or None if the showing is not loaded."""
+        state = self._showings.get(showing_id)
+        if state is None:
+            return None
+        state.expire(datetime.utcnow())
+        return state.held.bit_count()
+
+    def mark_booked(self, showing_id: UUID, seat_ids: Sequence[UUID]) -> None:
+        """Record committed bookings in the in-memory state."""
+        state = self._showings.get(showing_id)
+        if state is None:
+            return
+        for seat_id in seat_ids:
+            i = state.layout.index.get(seat_id)
+            if i is not None:
+                state.drop_hold(i)
+                state.booked |= 1 << i
+
+
+seat_holds = SeatHoldEngine(
+    settings.SEAT_HOLD_TIMEOUT_MINUTES, settings.SEAT_HOLD_STATE_TTL_SECONDS
+)
+
+
+async def reap_expired_holds() -> int:
+    """
+    Release expired seat holds in bounded batches.
+
+    Every batch deletes at most ``SEAT_HOLD_REAPER_BATCH_SIZE`` expired holds,
+    found through the partial ``expires_at`` index, in its own short
+    transaction. Rows locked by a concurrent hold or booking are skipped and
+    picked up by the next sweep. Once the sweep is done, one
+    ``screenings/{id}/update`` message is published per affected showing.
+
+    Returns:
+        int: Number of holds released
+    """
+    batch_size = settings.SEAT_HOLD_REAPER_BATCH_SIZE
+    released: Dict[UUID, List[Tuple[UUID, datetime]]] = defaultdict(list)
+    reservation = SeatReservation.__table__.c
+    while True:
+        async with AsyncSessionLocal() as db:
+            now = datetime.utcnow()
+            expired = (
+                select(reservation.id)
+                .where(reservation.status.in_(HOLD_STATUSES))
+                .where(reservation.expires_at <= now)
+                .order_by(reservation.expires_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result: Result[UUID, UUID, datetime] = await db.execute(
+                delete(SeatReservation)
+                .where(reservation.id.in_(expired))
+                .returning(
+                    reservation.showing_id,
+                    reservation.seat_id,
+                    reservation.expires_at,
+                )
+            )
+            rows = result.all()
+            await db.commit()
+        for showing_id, seat_id, expires_at in rows:
+            released[showing_id].append((seat_id, expires_at))
+        if len(rows) < batch_size:
+            break
+        # Let request handlers run between batches during large sweeps
+        await asyncio.sleep(0)
+
+    if not released:
+        return 0
+
+    async with AsyncSessionLocal() as db:
+        showings, rooms = Showing.__table__.c, Room.__table__.c
+        counts: Result[UUID, int, int] = await db.execute(
+            select(showings.id, showings.tickets_sold, rooms.capacity)
+            .join(Room.__table__, showings.room_id == rooms.id)
+            .where(showings.id.in_(list(released)))
+        )
+        counters = {showing_id: (sold, capacity) for showing_id, sold, capacity in counts.all()}
+
+    for showing_id, holds in released.items():
+        payload: Dict[str, Any] = {
+            "screening_id": str(showing_id),
+            "released_seat_ids": [str(seat_id) for seat_id, _ in holds],
+        }
+        available_seats = seat_holds.forget_expired(showing_id, holds)
+        if available_seats is not None:
+            payload["available_seats"] = available_seats
+        if showing_id in counters:
+            sold, capacity = counters[showing_id]
+            payload["available_tickets"] = capacity - sold
+            payload["total_capacity"] = capacity
+        publish_message(f"screenings/{showing_id}/update", payload)
+
+    total = sum(len(holds) for holds in released.values())
+    logger.info(f"Released {total} expired seat hold(s) for {len(released)} showing(s)")
+    return total
+
+
+seat_hold_reaper_task = register_periodic_task(
+    PeriodicTask("seat-hold-reaper", settings.SEAT_HOLD_REAPER_INTERVAL_SECONDS, reap_expired_holds)
+)
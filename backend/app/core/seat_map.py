@@ -0,0 +1,132 @@
+"""
+Seat map support for the LynrieScoop cinema application.
+
+This module caches the seat layout of every room, loaded once from the
+``seats`` table, and provides the bit-packed encoding of a showing's seat
+availability. A seat is addressed by its index in the room layout, so the
+occupancy of a showing fits in a few plain integers used as bitsets.
+"""
+
+import time
+from typing import Dict, List
+from uuid import UUID
+
+from sqlalchemy import Result, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.seat import Seat
+
+# Seats are only created by seeding and schema upgrades, at startup; layouts
+# changed by hand in the database are picked up within the hour
+LAYOUT_TTL_SECONDS = 3600.0
+
+
+class RoomLayout:
+    """
+    Seat layout of a room, ordered by row and seat number.
+
+    Attributes:
+        room_id: Room the layout belongs to
+        seat_ids: Seat UUIDs in layout order
+        rows: Row identifier per seat
+        numbers: Seat number per seat
+        seat_types: Seat type per seat ("standard", "premium", ...)
+        accessible: Bitset of wheelchair accessible seats
+        active: Bitset of seats that can be booked
+        index: Seat UUID to layout index
+        loaded_at: Monotonic time the layout was loaded
+    """
+
+    __slots__ = (
+        "room_id",
+        "seat_ids",
+        "rows",
+        "numbers",
+        "seat_types",
+        "accessible",
+        "active",
+        "index",
+        "loaded_at",
+    )
+
+    def __init__(self, room_id: UUID) -> None:
+        self.room_id = room_id
+        self.seat_ids: List[UUID] = []
+        self.rows: List[str] = []
+        self.numbers: List[int] = []
+        self.seat_types: List[str] = []
+        self.accessible = 0
+        self.active = 0
+        self.index: Dict[UUID, int] = {}
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.seat_ids)
+
+    def label(self, i: int) -> str:
+        """Return the human readable label of a seat, e.g. "D7"."""
+        return f"{self.rows[i]}{self.numbers[i]}"
+
+
+_layouts: Dict[UUID, RoomLayout] = {}
+
+
+async def get_room_layout(db: AsyncSession, room_id: UUID) -> RoomLayout:
+    """
+    Return the cached seat layout of a room, loading it on first use.
+
+    Args:
+        db: Database session used to load the layout
+        room_id: UUID of the room
+
+    Returns:
+        RoomLayout: The room's seat layout (empty if the room has no seats)
+    """
+    layout = _layouts.get(room_id)
+    if layout is not None and time.monotonic() - layout.loaded_at < LAYOUT_TTL_SECONDS:
+        return layout
+
+    seats = Seat.__table__.c
+    result: Result[UUID, str, int, str, bool, bool] = await db.execute(
+        select(
+            seats.id, seats.row, seats.number, seats.seat_type, seats.is_accessible, seats.is_active
+        )
+        .where(seats.room_id == room_id)
+        .order_by(seats.row, seats.number)
+    )
+    layout = RoomLayout(room_id)
+    for i, (seat_id, row, number, seat_type, is_accessible, is_active) in enumerate(result.all()):
+        layout.seat_ids.append(seat_id)
+        layout.rows.append(row)
+        layout.numbers.append(number)
+        layout.seat_types.append(seat_type)
+        layout.index[seat_id] = i
+        if is_accessible:
+            layout.accessible |= 1 << i
+        if is_active:
+            layout.active |= 1 << i
+    _layouts[room_id] = layout
+    return layout
+
+
+def pack_seat_map(layout: RoomLayout, booked: int, held: int) -> bytes:
+    """
+    Encode a showing's seat availability as three consecutive bitsets.
+
+    The payload contains the unavailable, booked and held bitsets, each
+    ``ceil(seat_count / 8)`` bytes long. Seat ``i`` (in layout order) is bit
+    ``i % 8`` of byte ``i // 8`` of each bitset. A 400-seat room encodes to
+    150 bytes.
+
+    Args:
+        layout: Room layout the bit positions refer to
+        booked: Bitset of booked seats
+        held: Bitset of held seats
+
+    Returns:
+        bytes: The packed seat map
+    """
+    count = len(layout)
+    size = (count + 7) // 8
+    unavailable = ~layout.active & ((1 << count) - 1)
+    return b"".join(bits.to_bytes(size, "little") for bits in (unavailable, booked, held & ~booked))
@@ -0,0 +1,110 @@
+"""
+Showing lifecycle sweep for the LynrieScoop cinema application.
+
+Showings are created as ``scheduled`` and stay that way until this periodic
+job marks them ``completed`` once they have ended, together with their
+confirmed bookings. Hot queries only look at scheduled showings and are
+served by partial indexes over them, so they stay proportional to the live
+schedule instead of growing with the history.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Tuple
+from uuid import UUID
+
+from sqlalchemy import Result, select, update
+
+from app.core.availability import availability
+from app.core.background import PeriodicTask, register_periodic_task
+from app.core.catalog import showings_changed
+from app.core.config import settings
+from app.core.http_cache import table_versions
+from app.core.mqtt_client import publish_message
+from app.core.seat_holds import seat_holds
+from app.db.session import AsyncSessionLocal
+from app.models.booking import Booking
+from app.models.showing import Showing
+
+logger = logging.getLogger(__name__)
+
+# Showings that ended longer ago than this are completed silently: nobody is
+# watching them any more, and a first sweep over old data would otherwise
+# publish one update per historical showing
+ANNOUNCE_WINDOW = timedelta(hours=6)
+
+
+async def complete_ended_showings() -> int:
+    """
+    Mark ended showings and their confirmed bookings as completed.
+
+    Showings are processed in batches of ``SHOWING_SWEEP_BATCH_SIZE``, each
+    in its own transaction with one ``UPDATE`` for the showings and one for
+    their bookings. Rows locked by another worker are skipped and picked up
+    by a later sweep.
+
+    Returns:
+        int: Number of showings completed
+    """
+    batch_size = settings.SHOWING_SWEEP_BATCH_SIZE
+    completed: List[Tuple[UUID, datetime]] = []
+    showings, bookings = Showing.__table__.c, Booking.__table__.c
+    while True:
+        async with AsyncSessionLocal() as db:
+            now = datetime.utcnow()
+            ended = (
+                select(showings.id)
+                .where(showings.status == "scheduled")
+                .where(showings.end_time <= now)
+                .order_by(showings.end_time)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result: Result[UUID, datetime] = await db.execute(
+                update(Showing)
+                .where(showings.id.in_(ended))
+                .values(status="completed", updated_at=now)
+                .returning(showings.id, showings.end_time)
+                .execution_options(synchronize_session=False)
+            )
+            rows = [(showing_id, end_time) for showing_id, end_time in result.all()]
+            if rows:
+                await db.execute(
+                    update(Booking)
+                    .where(bookings.showing_id.in_([showing_id for showing_id, _ in rows]))
+                    .where(bookings.status == "confirmed")
+                    .values(status="completed", updated_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+                await table_versions.record(db, "showings")
+            await db.commit()
+        completed.extend(rows)
+        if len(rows) < batch_size:
+            break
+        # Let request handlers run between batches during large sweeps
+        await asyncio.sleep(0)
+
+    if not completed:
+        return 0
+
+    announce_after = datetime.utcnow() - ANNOUNCE_WINDOW
+    for showing_id, end_time in completed:
+        seat_holds.invalidate(showing_id)
+        availability.invalidate(showing_id)
+        if end_time > announce_after:
+            publish_message(
+                f"screenings/{showing_id}/update",
+                {"screening_id": str(showing_id), "status": "completed", "available_tickets": 0},
+            )
+    showings_changed()
+
+    logger.info(f"Completed {len(completed)} ended showing(s)")
+    return len(completed)
+
+
+showing_sweeper_task = register_periodic_task(
+    PeriodicTask(
+        "showing-sweeper", settings.SHOWING_SWEEP_INTERVAL_SECONDS, complete_ended_showings
+    )
+)
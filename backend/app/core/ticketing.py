@@ -0,0 +1,70 @@
+"""
+Ticket capacity enforcement for the LynrieScoop cinema application.
+
+This module keeps the denormalized ``Showing.tickets_sold`` counter in sync
+with bookings. Capacity is checked and claimed with a single conditional
+``UPDATE ... RETURNING`` so that concurrent buyers can never oversell a
+showing and no booking rows have to be counted on the request path.
+"""
+
+from typing import Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Result, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.room import Room
+from app.models.showing import Showing
+
+
+async def claim_tickets(
+    db: AsyncSession, showing_id: UUID, count: int = 1
+) -> Optional[Tuple[int, int]]:
+    """
+    Atomically claim tickets for a showing if enough capacity is left.
+
+    The counter is only incremented when ``tickets_sold + count`` still fits
+    in the room's capacity. The row lock taken by the update is held until
+    the surrounding transaction commits or rolls back, so the claim is undone
+    automatically if the booking insert fails.
+
+    Args:
+        db: Database session with the booking transaction
+        showing_id: UUID of the showing to claim tickets for
+        count: Number of tickets to claim
+
+    Returns:
+        Optional[Tuple[int, int]]: ``(tickets_sold, capacity)`` after the claim,
+        or None if the showing does not exist or has too few tickets left
+    """
+    showings, rooms = Showing.__table__.c, Room.__table__.c
+    result: Result[int, int] = await db.execute(
+        update(Showing)
+        .where(showings.id == showing_id)
+        .where(showings.room_id == rooms.id)
+        .where(showings.tickets_sold + count <= rooms.capacity)
+        .values(tickets_sold=showings.tickets_sold + count)
+        .returning(showings.tickets_sold, rooms.capacity)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return int(row[0]), int(row[1])
+
+
+async def release_tickets(db: AsyncSession, showing_id: UUID, count: int = 1) -> None:
+    """
+    Return previously claimed tickets to a showing.
+
+    Args:
+        db: Database session with the cancellation transaction
+        showing_id: UUID of the showing to release tickets for
+        count: Number of tickets to release
+    """
+    await db.execute(
+        update(Showing)
+        .where(Showing.__table__.c.id == showing_id)
+        .values(tickets_sold=func.greatest(Showing.__table__.c.tickets_sold - count, 0))
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,270 @@
+"""
+Async TMDB client for the LynrieScoop cinema application.
+
+All calls to The Movie Database go through one shared ``httpx.AsyncClient``
+per process, so requests reuse pooled HTTP/2 connections instead of
+blocking the event loop on a fresh connection each time. Outgoing requests
+pass a token bucket sized to TMDB's rate limit, and rate-limited (429),
+failed (5xx) or dropped requests are retried with exponential backoff and
+full jitter.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Movie lists served by ``/movie/{list}``
+MOVIE_LISTS = {"now_playing", "upcoming", "popular", "top_rated"}
+
+RETRY_BASE_SECONDS = 0.25
+RETRY_MAX_SECONDS = 8.0
+
+
+class TMDBError(Exception):
+    """
+    TMDB could not answer a request.
+
+    Attributes:
+        status_code: HTTP status returned by TMDB, if it answered at all
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TMDBNotFoundError(TMDBError):
+    """The requested TMDB resource does not exist."""
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter for one event loop.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``;
+    every request takes one and waits until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait for and take one token."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Return the full-jitter delay before retry number ``attempt`` (from 0)."""
+    return random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**attempt))
+
+
+class TMDBClient:
+    """
+    Pooled, rate-limited TMDB API client.
+
+    The HTTP client and the rate limiter are created on first use, on the
+    running event loop, and released by :meth:`aclose`.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        rate: float,
+        burst: int,
+        timeout: float,
+        max_retries: int,
+        max_connections: int,
+        language: str = "en-US",
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.language = language
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+        self._bucket: Optional[TokenBucket] = None
+
+    def _connection(self) -> Tuple[httpx.AsyncClient, TokenBucket]:
+        if self._client is None or self._bucket is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=True,
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 3.0)),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                headers={"Accept": "application/json"},
+            )
+            self._bucket = TokenBucket(self.rate, self.burst)
+        return self._client, self._bucket
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._bucket = None
+
+    async def get(self, path: str, **params: Any) -> Dict[str, Any]:
+        """
+        Request a TMDB API resource.
+
+        Args:
+            path: Path below the API base URL, e.g. ``/movie/550``
+            params: Query parameters; ``None`` values are left out and the
+                language defaults to the client's
+
+        Returns:
+            Dict[str, Any]: The decoded JSON response
+
+        Raises:
+            TMDBNotFoundError: If TMDB does not know the resource
+            TMDBError: If TMDB rejects the request or stays unavailable after retrying
+        """
+        client, bucket = self._connection()
+        query = {key: value for key, value in params.items() if value is not None}
+        query.setdefault("language", self.language)
+        query["api_key"] = self.api_key
+
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            retry_after: Optional[float] = None
+            try:
+                response = await client.get(path, params=query)
+            except httpx.TransportError as e:
+                error = TMDBError(f"TMDB request failed: {e}")
+            else:
+                if response.status_code == 404:
+                    raise TMDBNotFoundError("Not found on TMDB", 404)
+                if response.is_success:
+                    return dict(response.json())
+                error = TMDBError(
+                    f"TMDB returned {response.status_code}", status_code=response.status_code
+                )
+                if response.status_code != 429 and response.status_code < 500:
+                    raise error
+                if response.status_code == 429:
+                    try:
+                        retry_after = float(response.headers.get("Retry-After", ""))
+                    except ValueError:
+                        pass
+
+            if attempt >= self.max_retries:
+                raise error
+            delay = backoff_delay(attempt)
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, RETRY_MAX_SECONDS))
+            logger.warning(f"{error} for {path}, retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def check_movie_list(name: str) -> None:
+        """Reject names that are not TMDB movie lists."""
+        if name not in MOVIE_LISTS:
+            raise ValueError(f"Unknown TMDB movie list: {name}")
+
+    async def movie_list(self, name: str, page: int = 1, **params: Any) -> Dict[str, Any]:
+        """
+        Get a page of one of TMDB's movie lists.
+
+        Args:
+            name: One of ``now_playing``, ``upcoming``, ``popular`` or ``top_rated``
+            page: Page number
+            params: Additional query parameters
+
+        Returns:
+            Dict[str, Any]: The page, with the movies in ``results``
+        """
+        self.check_movie_list(name)
+        return await self.get(f"/movie/{name}", page=page, **params)
+
+    async def search_movies(self, query: str, page: int = 1) -> Dict[str, Any]:
+        """Search TMDB for movies by title."""
+        return await self.get("/search/movie", query=query, page=page)
+
+    async def movie_changes(
+        self, start_date: date, end_date: date, page: int = 1
+    ) -> Dict[str, Any]:
+        """
+        Get a page of the IDs of movies changed on TMDB in a period.
+
+        Args:
+            start_date: First day of the period
+            end_date: Last day of the period, at most 14 days after ``start_date``
+            page: Page number
+
+        Returns:
+            Dict[str, Any]: The page, with ``{"id": ...}`` items in ``results``
+        """
+        return await self.get(
+            "/movie/changes",
+            start_date=start_date.isoformat(),
+            end_date=end_date.isoformat(),
+            page=page,
+        )
+
+    async def movie(
+        self, tmdb_id: int, append_to_response: Optional[str] = None, **params: Any
+    ) -> Dict[str, Any]:
+        """
+        Get the details of a movie.
+
+        Args:
+            tmdb_id: TMDB ID of the movie
+            append_to_response: Extra resources to include, e.g. ``credits,videos``
+            params: Additional query parameters
+
+        Returns:
+            Dict[str, Any]: The movie
+        """
+        return await self.get(f"/movie/{tmdb_id}", append_to_response=append_to_response, **params)
+
+
+tmdb_client = TMDBClient(
+    base_url=settings.TMDB_API_BASE_URL,
+    api_key=settings.TMDB_API_KEY,
+    rate=settings.TMDB_RATE_LIMIT_PER_SECOND,
+    burst=settings.TMDB_RATE_LIMIT_BURST,
+    timeout=settings.TMDB_TIMEOUT_SECONDS,
+    max_retries=settings.TMDB_MAX_RETRIES,
+    max_connections=settings.TMDB_MAX_CONNECTIONS,
+    language=settings.TMDB_LANGUAGE,
+)
+
+
+def setup_tmdb_for_app(app: FastAPI) -> None:
+    """Close the TMDB client's connections on application shutdown"""
+
+    @app.on_event("shutdown")
+    async def close_tmdb_client() -> None:
+        """Close pooled TMDB connections on application shutdown"""
+        await tmdb_client.aclose()
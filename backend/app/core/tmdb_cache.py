@@ -0,0 +1,239 @@
+"""
+TMDB response cache for the LynrieScoop cinema application.
+
+TMDB's movie lists change a few times a day, but the homepage asks for
+them on every visit. Responses are cached here in front of the TMDB client,
+keyed by endpoint, query parameters and language:
+
+- every endpoint has a TTL during which the cached response is served as is,
+  followed by a stale window during which it is still served while one
+  background request refreshes it (stale-while-revalidate);
+- 404s are cached for a short while too, so lookups of unknown IDs do not
+  go upstream every time;
+- concurrent misses for the same key share a single upstream request.
+
+Entries are kept in a bounded in-process LRU. When ``REDIS_URL`` is
+configured, they are also shared through Redis, so a worker that starts
+cold picks up what the others already fetched.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Pattern, Set, Tuple
+from urllib.parse import urlencode
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.tmdb import TMDBClient, TMDBNotFoundError, tmdb_client
+
+logger = logging.getLogger(__name__)
+
+# (path pattern, seconds served fresh, further seconds served stale while refreshing)
+CACHE_POLICIES: List[Tuple[Pattern[str], int, int]] = [
+    (re.compile(r"^/movie/(now_playing|upcoming|popular|top_rated)$"), 1800, 86400),
+    (re.compile(r"^/search/movie$"), 3600, 86400),
+    (re.compile(r"^/movie/\d+$"), 21600, 7 * 86400),
+]
+DEFAULT_POLICY = (600, 3600)
+# How long a 404 is remembered; not-found entries are never served stale
+NOT_FOUND_TTL = 600
+
+
+class CacheEntry(NamedTuple):
+    """
+    A cached TMDB response.
+
+    Attributes:
+        data: The response, or None for a 404
+        fresh_until: Wall-clock time until which the entry is served as is
+        stale_until: Wall-clock time until which the entry may be served while refreshing
+    """
+
+    data: Optional[Dict[str, Any]]
+    fresh_until: float
+    stale_until: float
+
+
+def cache_policy(path: str) -> Tuple[int, int]:
+    """Return the TTL and stale window of an endpoint."""
+    for pattern, ttl, stale in CACHE_POLICIES:
+        if pattern.match(path):
+            return ttl, stale
+    return DEFAULT_POLICY
+
+
+def cache_key(path: str, params: Dict[str, Any]) -> str:
+    """Return the cache key of a request; ``params`` must include the language."""
+    return f"tmdb:{path}?{urlencode(sorted(params.items()))}"
+
+
+class MemoryCache:
+    """In-process LRU of cache entries, bounded in size."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class RedisCache:
+    """
+    Cache entries shared between workers through Redis.
+
+    Entries expire through Redis TTLs at the end of their stale window. One
+    client is kept per event loop.
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _client(self) -> Any:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = redis.Redis.from_url(self.url, decode_responses=True)
+            self._clients[loop] = client
+        return client
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        stored = await self._client().get(key)
+        if stored is None:
+            return None
+        return CacheEntry(*json.loads(stored))
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        expires_in = max(int(entry.stale_until - time.time()), 1)
+        await self._client().set(key, json.dumps(list(entry)), ex=expires_in)
+
+
+class CachedTMDBClient:
+    """
+    Caching front end of :class:`~app.core.tmdb.TMDBClient`.
+
+    Offers the same read methods as the client. A failing shared backend
+    only costs the cache, never the request.
+    """
+
+    def __init__(
+        self, client: TMDBClient, max_entries: int, redis_url: Optional[str] = None
+    ) -> None:
+        self.client = client
+        self.memory = MemoryCache(max_entries)
+        self.shared = RedisCache(redis_url) if redis_url else None
+        self._inflight: Dict[str, "asyncio.Task[CacheEntry]"] = {}
+        self._refreshes: Set["asyncio.Task[Any]"] = set()
+
+    async def get(self, path: str, **params: Any) -> Dict[str, Any]:
+        """
+        Request a TMDB API resource through the cache.
+
+        Args:
+            path: Path below the API base URL, e.g. ``/movie/550``
+            params: Query parameters; ``None`` values are left out
+
+        Returns:
+            Dict[str, Any]: The decoded JSON response
+
+        Raises:
+            TMDBNotFoundError: If TMDB does not know the resource (possibly cached)
+            TMDBError: If TMDB could not be reached and nothing usable is cached
+        """
+        query = {key: value for key, value in params.items() if value is not None}
+        query.setdefault("language", self.client.language)
+        key = cache_key(path, query)
+
+        now = time.time()
+        entry = await self._lookup(key)
+        if entry is None or entry.stale_until <= now:
+            entry = await asyncio.shield(self._fetch(key, path, query))
+        elif entry.fresh_until <= now:
+            self._refresh(key, path, query)
+        if entry.data is None:
+            raise TMDBNotFoundError("Not found on TMDB", 404)
+        return entry.data
+
+    async def _lookup(self, key: str) -> Optional[CacheEntry]:
+        entry = self.memory.get(key)
+        if entry is None and self.shared is not None:
+            try:
+                entry = await self.shared.get(key)
+            except redis.RedisError as e:
+                logger.warning(f"Shared TMDB cache unavailable: {e}")
+            if entry is not None:
+                self.memory.set(key, entry)
+        return entry
+
+    def _fetch(self, key: str, path: str, query: Dict[str, Any]) -> "asyncio.Task[CacheEntry]":
+        # Concurrent misses for a key share one upstream request
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._load(key, path, query))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    def _refresh(self, key: str, path: str, query: Dict[str, Any]) -> None:
+        if key in self._inflight:
+            return
+        task = self._fetch(key, path, query)
+        self._refreshes.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: "asyncio.Task[Any]") -> None:
+        self._refreshes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Refreshing a stale TMDB response failed: {task.exception()}")
+
+    async def _load(self, key: str, path: str, query: Dict[str, Any]) -> CacheEntry:
+        now = time.time()
+        try:
+            data: Optional[Dict[str, Any]] = await self.client.get(path, **query)
+            ttl, stale = cache_policy(path)
+        except TMDBNotFoundError:
+            data, ttl, stale = None, NOT_FOUND_TTL, 0
+        entry = CacheEntry(data, now + ttl, now + ttl + stale)
+        self.memory.set(key, entry)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, entry)
+            except redis.RedisError as e:
+                logger.warning(f"Shared TMDB cache unavailable: {e}")
+        return entry
+
+    async def movie_list(self, name: str, page: int = 1, **params: Any) -> Dict[str, Any]:
+        """Get a page of one of TMDB's movie lists, see :meth:`TMDBClient.movie_list`."""
+        TMDBClient.check_movie_list(name)
+        return await self.get(f"/movie/{name}", page=page, **params)
+
+    async def search_movies(self, query: str, page: int = 1) -> Dict[str, Any]:
+        """Search TMDB for movies by title."""
+        return await self.get("/search/movie", query=query, page=page)
+
+    async def movie(
+        self, tmdb_id: int, append_to_response: Optional[str] = None, **params: Any
+    ) -> Dict[str, Any]:
+        """Get the details of a movie, see :meth:`TMDBClient.movie`."""
+        return await self.get(f"/movie/{tmdb_id}", append_to_response=append_to_response, **params)
+
+
+tmdb_cache = CachedTMDBClient(tmdb_client, settings.TMDB_CACHE_MAX_ENTRIES, settings.REDIS_URL)
@@ -0,0 +1,269 @@
+"""
+Bulk TMDB import for the LynrieScoop cinema application.
+
+Stocking a new season means importing dozens of movies. An import job
+takes a list of TMDB IDs and/or pages of a TMDB movie list, fetches the
+details, credits and videos of every movie concurrently (bounded by
+``TMDB_IMPORT_CONCURRENCY``, and by the TMDB client's rate limit), and
+writes them all with one ``INSERT ... ON CONFLICT (tmdb_id) DO UPDATE``:
+new movies are added and known ones refreshed.
+
+Jobs run in the background of the worker that accepted them. Progress is
+published on ``movies/import/{job_id}``; the worker also keeps the state of
+its recent jobs for polling.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql.dml import ReturningInsert
+
+from app.core.catalog import showings_changed
+from app.core.config import settings
+from app.core.http_cache import table_versions
+from app.core.mqtt_client import publish_message
+from app.core.tmdb import TMDBClient, TMDBError, TMDBNotFoundError, tmdb_client
+from app.db.session import AsyncSessionLocal
+from app.models.movie import Movie
+
+logger = logging.getLogger(__name__)
+
+# Number of finished jobs kept for polling
+MAX_FINISHED_JOBS = 50
+# Progress messages published per job, besides the final one
+PROGRESS_STEPS = 20
+# Cast members stored per movie
+MAX_CAST = 10
+
+
+def movie_values(movie_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a TMDB movie, with appended credits and videos, to ``Movie`` columns.
+
+    Args:
+        movie_data: Response of ``/movie/{id}?append_to_response=credits,videos``
+
+    Returns:
+        Dict[str, Any]: Column values of the movie
+    """
+    credits = movie_data.get("credits") or {}
+    directors = [crew["name"] for crew in credits.get("crew", []) if crew.get("job") == "Director"]
+    trailers = [
+        video["key"]
+        for video in (movie_data.get("videos") or {}).get("results", [])
+        if video.get("type") == "Trailer" and video.get("site") == "YouTube"
+    ]
+
+    release_date = None
+    if movie_data.get("release_date"):
+        try:
+            release_date = datetime.strptime(movie_data["release_date"], "%Y-%m-%d")
+        except ValueError:
+            pass
+
+    return {
+        "tmdb_id": movie_data["id"],
+        "title": movie_data["title"],
+        "overview": movie_data.get("overview"),
+        "poster_path": movie_data.get("poster_path"),
+        "backdrop_path": movie_data.get("backdrop_path"),
+        "release_date": release_date,
+        "runtime": movie_data.get("runtime") or 0,
+        "status": movie_data.get("status") or "Released",
+        "vote_average": movie_data.get("vote_average", 0.0),
+        "vote_count": movie_data.get("vote_count", 0),
+        "genres": [genre["name"] for genre in movie_data.get("genres", [])],
+        "director": directors[0] if directors else "",
+        "cast": [actor["name"] for actor in credits.get("cast", [])[:MAX_CAST]],
+        "trailer_url": f"https://www.youtube.com/watch?v={trailers[0]}" if trailers else None,
+    }
+
+
+async def upsert_movies(rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Insert movies, or update them if their TMDB ID is already known.
+
+    Args:
+        rows: Column values from :func:`movie_values`, one row per TMDB ID
+
+    Returns:
+        Dict[str, int]: Number of movies ``created`` and ``updated``
+    """
+    if not rows:
+        return {"created": 0, "updated": 0}
+    now = datetime.utcnow()
+    stmt = insert(Movie).values([{**row, "created_at": now, "updated_at": now} for row in rows])
+    upsert: ReturningInsert[Any] = stmt.on_conflict_do_update(
+        index_elements=[Movie.tmdb_id],
+        set_={
+            **{column: stmt.excluded[column] for column in rows[0] if column != "tmdb_id"},
+            "updated_at": now,
+        },
+    ).returning(
+        # xmax is only set on rows that existed before, i.e. were updated
+        literal_column("xmax = 0").label("created")
+    )
+    async with AsyncSessionLocal() as db:
+        created: List[bool] = list((await db.execute(upsert)).scalars().all())
+        await table_versions.record(db, "movies")
+        await db.commit()
+    inserted = sum(created)
+    return {"created": inserted, "updated": len(created) - inserted}
+
+
+class ImportJob:
+    """
+    State of a bulk import, as published and polled.
+
+    Attributes:
+        job_id: Identifier of the job
+        tmdb_ids: TMDB IDs to import, without duplicates
+        status: ``running``, ``completed`` or ``failed``
+        done: Number of movies fetched (or given up on) so far
+        created: Number of movies added to the catalog
+        updated: Number of known movies refreshed
+        not_found: TMDB IDs TMDB does not know
+        failed: TMDB IDs that could not be fetched
+        error: Why the job failed, if it did
+    """
+
+    def __init__(self, tmdb_ids: Iterable[int]) -> None:
+        self.job_id = str(uuid.uuid4())
+        self.tmdb_ids = list(dict.fromkeys(tmdb_ids))
+        self.status = "running"
+        self.done = 0
+        self.created = 0
+        self.updated = 0
+        self.not_found: List[int] = []
+        self.failed: List[int] = []
+        self.error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the job's state as a JSON-serializable dict."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total": len(self.tmdb_ids),
+            "done": self.done,
+            "created": self.created,
+            "updated": self.updated,
+            "not_found": self.not_found,
+            "failed": self.failed,
+            "error": self.error,
+        }
+
+    def publish(self) -> None:
+        """Publish the job's state on ``movies/import/{job_id}``."""
+        publish_message(f"movies/import/{self.job_id}", self.as_dict())
+
+
+class TMDBImporter:
+    """Runs bulk import jobs and remembers the recent ones."""
+
+    def __init__(self, client: TMDBClient, concurrency: int) -> None:
+        self.client = client
+        self.concurrency = concurrency
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def list_ids(self, name: str, pages: int) -> List[int]:
+        """
+        Get the TMDB IDs on the first pages of a TMDB movie list.
+
+        Args:
+            name: One of ``now_playing``, ``upcoming``, ``popular`` or ``top_rated``
+            pages: Number of pages
+
+        Returns:
+            List[int]: The IDs, in list order
+        """
+        results = await asyncio.gather(
+            *(self.client.movie_list(name, page=page) for page in range(1, pages + 1))
+        )
+        return [movie["id"] for result in results for movie in result["results"]]
+
+    def start(self, tmdb_ids: Iterable[int]) -> ImportJob:
+        """
+        Start importing movies in the background.
+
+        Args:
+            tmdb_ids: TMDB IDs of the movies
+
+        Returns:
+            ImportJob: The running job
+        """
+        job = ImportJob(tmdb_ids)
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > MAX_FINISHED_JOBS:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.status == "running":
+                break
+            self._jobs.popitem(last=False)
+        task = asyncio.get_running_loop().create_task(self.run(job), name=f"import-{job.job_id}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        """Return a job started by this worker, if it is still remembered."""
+        return self._jobs.get(job_id)
+
+    async def fetch(self, job: ImportJob, publish: bool = True) -> List[Dict[str, Any]]:
+        """
+        Fetch the job's movies concurrently.
+
+        Unknown and failed TMDB IDs are recorded on the job.
+
+        Args:
+            job: The job
+            publish: Whether to publish the job's progress
+
+        Returns:
+            List[Dict[str, Any]]: Column values of the fetched movies
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        step = max(len(job.tmdb_ids) // PROGRESS_STEPS, 1)
+
+        async def fetch_one(tmdb_id: int) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return movie_values(
+                        await self.client.movie(tmdb_id, append_to_response="credits,videos")
+                    )
+                except TMDBNotFoundError:
+                    job.not_found.append(tmdb_id)
+                except (TMDBError, KeyError) as e:
+                    logger.warning(f"Fetching TMDB movie {tmdb_id} failed: {e}")
+                    job.failed.append(tmdb_id)
+                finally:
+                    job.done += 1
+                    if publish and job.done % step == 0 and job.done < len(job.tmdb_ids):
+                        job.publish()
+                return None
+
+        fetched = await asyncio.gather(*(fetch_one(tmdb_id) for tmdb_id in job.tmdb_ids))
+        return [row for row in fetched if row is not None]
+
+    async def run(self, job: ImportJob) -> None:
+        """Fetch the job's movies and write them in one statement."""
+        try:
+            counts = await upsert_movies(await self.fetch(job))
+            job.created, job.updated = counts["created"], counts["updated"]
+            job.status = "completed"
+        except Exception as e:
+            logger.exception(f"TMDB import {job.job_id} failed: {e}")
+            job.status, job.error = "failed", str(e)
+        else:
+            if job.updated:
+                # The now-playing snapshot embeds movie details
+                showings_changed()
+        job.publish()
+
+
+tmdb_importer = TMDBImporter(tmdb_client, settings.TMDB_IMPORT_CONCURRENCY)
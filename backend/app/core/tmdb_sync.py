@@ -0,0 +1,185 @@
+"""
+TMDB metadata sync for the LynrieScoop cinema application.
+
+Ratings, runtimes, cast and trailers of imported movies keep changing on
+TMDB. Instead of refetching the whole catalog, this periodic job asks
+TMDB's changes feed which movies changed since the last sync, refetches
+only the local ones among them and updates them in one batch.
+
+The watermark of the last sync is kept in ``sync_state``. A worker claims
+the sync with a short transaction that sets ``running_until``, fetches
+from TMDB without holding a transaction open, and writes the results and
+the new watermark in a second one. Movies that could not be fetched do not
+hold the watermark back: their IDs are kept in ``retry_ids`` and fetched
+again by the next run.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, cast
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.background import PeriodicTask, register_periodic_task
+from app.core.catalog import showings_changed
+from app.core.config import settings
+from app.core.http_cache import table_versions
+from app.core.tmdb import TMDBClient, TMDBError, tmdb_client
+from app.core.tmdb_import import ImportJob, tmdb_importer
+from app.db.session import AsyncSessionLocal
+from app.models.movie import Movie
+from app.models.sync_state import SyncState
+
+logger = logging.getLogger(__name__)
+
+SYNC_NAME = "tmdb_movie_changes"
+# Longest period TMDB's changes feed answers in one request; also how far
+# back the first sync looks
+MAX_WINDOW = timedelta(days=14)
+# How long a claim lasts; a worker that dies mid-sync blocks others this long
+LEASE = timedelta(minutes=30)
+
+
+async def changed_movie_ids(client: TMDBClient, since: datetime, until: datetime) -> Set[int]:
+    """
+    Get the IDs of all movies changed on TMDB in a period.
+
+    The feed has day granularity, so the day of ``since`` is included in
+    full. Longer periods are split into 14-day windows.
+
+    Args:
+        client: TMDB client
+        since: Start of the period
+        until: End of the period
+
+    Returns:
+        Set[int]: TMDB IDs of the changed movies
+    """
+    changed: Set[int] = set()
+    start = since
+    while True:
+        end = min(start + MAX_WINDOW, until)
+        first = await client.movie_changes(start.date(), end.date())
+        pages = [first] + list(
+            await asyncio.gather(
+                *(
+                    client.movie_changes(start.date(), end.date(), page=page)
+                    for page in range(2, first.get("total_pages", 1) + 1)
+                )
+            )
+        )
+        changed.update(item["id"] for page in pages for item in page["results"])
+        if end >= until:
+            return changed
+        start = end
+
+
+def _update_statement() -> Any:
+    # One UPDATE executed for every row, matched on the TMDB ID
+    return (
+        update(Movie.__table__)
+        .where(Movie.__table__.c.tmdb_id == bindparam("match_tmdb_id"))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _claim() -> Optional[SyncState]:
+    # Claim the sync unless another worker holds an unexpired claim
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(SyncState).values(name=SYNC_NAME).on_conflict_do_nothing())
+        result = await db.execute(
+            select(SyncState).filter_by(name=SYNC_NAME).with_for_update(skip_locked=True)
+        )
+        state = result.scalar_one_or_none()
+        now = datetime.utcnow()
+        running_until = cast(Optional[datetime], state.running_until) if state else None
+        if state is None or (running_until is not None and running_until > now):
+            return None
+        await db.execute(
+            update(SyncState).filter_by(name=SYNC_NAME).values(running_until=now + LEASE)
+        )
+        await db.commit()
+        return state
+
+
+async def _release() -> None:
+    # Give up the claim of a failed sync, leaving its progress as it was
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(SyncState)
+            .filter_by(name=SYNC_NAME)
+            .values(running_until=None, updated_at=datetime.utcnow())
+        )
+        await db.commit()
+
+
+async def sync_movie_changes() -> int:
+    """
+    Refresh the local movies that changed on TMDB since the last sync.
+
+    Returns:
+        int: Number of movies refreshed
+    """
+    state = await _claim()
+    if state is None:
+        # Another worker is syncing
+        return 0
+
+    until = datetime.utcnow()
+    since = cast(Optional[datetime], state.watermark) or until - MAX_WINDOW
+    retry: Set[int] = set(cast(Optional[List[int]], state.retry_ids) or [])
+    try:
+        changed = await changed_movie_ids(tmdb_client, since, until)
+        async with AsyncSessionLocal() as db:
+            local: Set[int] = set((await db.execute(select(Movie.tmdb_id))).scalars().all())
+        job = ImportJob(sorted((changed | retry) & local))
+        rows: List[Dict[str, Any]] = await tmdb_importer.fetch(job, publish=False)
+    except Exception as e:
+        if isinstance(e, TMDBError):
+            logger.warning(f"Fetching TMDB changes failed, retrying next time: {e}")
+        else:
+            logger.exception(f"TMDB sync failed: {e}")
+        await _release()
+        return 0
+
+    if job.failed:
+        logger.warning(f"Refreshing TMDB movies {job.failed} failed, retrying next time")
+    async with AsyncSessionLocal() as db:
+        if rows:
+            now = datetime.utcnow()
+            await db.execute(
+                _update_statement(),
+                [
+                    {
+                        **{column: value for column, value in row.items() if column != "tmdb_id"},
+                        "match_tmdb_id": row["tmdb_id"],
+                        "updated_at": now,
+                    }
+                    for row in rows
+                ],
+            )
+            await table_versions.record(db, "movies")
+        await db.execute(
+            update(SyncState)
+            .filter_by(name=SYNC_NAME)
+            .values(
+                watermark=until,
+                retry_ids=sorted(job.failed),
+                running_until=None,
+                updated_at=datetime.utcnow(),
+            )
+        )
+        await db.commit()
+
+    if rows:
+        # The now-playing snapshot embeds movie details
+        showings_changed()
+    logger.info(f"TMDB sync: {len(changed)} movies changed, {len(rows)} of ours refreshed")
+    return len(rows)
+
+
+tmdb_sync_task = register_periodic_task(
+    PeriodicTask("tmdb-sync", settings.TMDB_SYNC_INTERVAL_SECONDS, sync_movie_changes)
+)
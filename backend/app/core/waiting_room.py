@@ -0,0 +1,236 @@
+"""
+Virtual waiting room for the LynrieScoop cinema application.
+
+Only ``WAITING_ROOM_ACTIVE_BUYERS`` buyers per showing are let into the
+booking path at the same time. While a showing has free slots and nobody is
+waiting, booking requests pass straight through. Once it is full, buyers get
+a queue token and a place in line, and are admitted in order as slots free
+up. Admitted buyers have ``WAITING_ROOM_ADMISSION_SECONDS`` to book before
+their slot is handed to the next buyer. Waiting buyers keep their place by
+polling their status at least every ``WAITING_ROOM_QUEUE_TTL_SECONDS``;
+buyers who left are dropped from the line.
+
+Progress is broadcast on ``screenings/{id}/queue`` as a "now serving"
+number: a buyer whose queue number is at most ``admitted_through`` may book.
+The waiting room is kept in process memory, so the limit applies per
+application worker.
+"""
+
+import secrets
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+from uuid import UUID
+
+from app.core.background import PeriodicTask, register_periodic_task
+from app.core.config import settings
+from app.core.mqtt_client import publish_message
+
+
+class QueueEntry:
+    """
+    A buyer's place in a showing's queue.
+
+    Attributes:
+        token: Secret token identifying the entry
+        user_id: The buyer
+        number: Position in the order of arrival, starting at 1
+        admitted_until: Monotonic deadline for booking once admitted, else None
+        expires_at: Monotonic deadline for the next poll while waiting
+    """
+
+    __slots__ = ("token", "user_id", "number", "admitted_until", "expires_at")
+
+    def __init__(self, token: str, user_id: UUID, number: int, expires_at: float) -> None:
+        self.token = token
+        self.user_id = user_id
+        self.number = number
+        self.admitted_until: Optional[float] = None
+        self.expires_at = expires_at
+
+
+class WaitingRoomFull(Exception):
+    """Raised when a buyer has to wait for a slot; carries the buyer's queue entry."""
+
+    def __init__(self, entry: QueueEntry, position: int) -> None:
+        super().__init__("This showing is busy, you have been placed in the queue")
+        self.entry = entry
+        self.position = position
+
+
+class ShowingQueue:
+    """Queue and active buyers of a single showing."""
+
+    __slots__ = ("next_number", "admitted_through", "waiting", "admitted", "passing", "by_user")
+
+    def __init__(self) -> None:
+        self.next_number = 1
+        self.admitted_through = 0
+        self.waiting: "OrderedDict[str, QueueEntry]" = OrderedDict()
+        self.admitted: Dict[str, QueueEntry] = {}
+        self.passing = 0  # requests let through without queueing, still in progress
+        self.by_user: Dict[UUID, str] = {}
+
+    def active(self) -> int:
+        return len(self.admitted) + self.passing
+
+    def position(self, entry: QueueEntry) -> int:
+        """Number of buyers ahead of the entry plus one, or 0 once admitted."""
+        if entry.admitted_until is not None:
+            return 0
+        return entry.number - self.admitted_through
+
+
+class WaitingRoom:
+    """Admission control for the booking path of every showing."""
+
+    def __init__(self, active_buyers: int, admission_seconds: float, queue_ttl: float) -> None:
+        self.active_buyers = max(1, active_buyers)
+        self.admission_seconds = admission_seconds
+        self.queue_ttl = queue_ttl
+        self._queues: Dict[UUID, ShowingQueue] = {}
+        self._tokens: Dict[str, Tuple[UUID, QueueEntry]] = {}
+
+    def _remove(self, showing_id: UUID, queue: ShowingQueue, entry: QueueEntry) -> None:
+        queue.waiting.pop(entry.token, None)
+        queue.admitted.pop(entry.token, None)
+        if queue.by_user.get(entry.user_id) == entry.token:
+            del queue.by_user[entry.user_id]
+        self._tokens.pop(entry.token, None)
+
+    def _advance(self, showing_id: UUID, queue: ShowingQueue) -> None:
+        """Expire unused admissions and abandoned places, and admit buyers into free slots."""
+        now = time.monotonic()
+        for entry in [e for e in queue.admitted.values() if (e.admitted_until or 0) <= now]:
+            self._remove(showing_id, queue, entry)
+        for entry in [e for e in queue.waiting.values() if e.expires_at <= now]:
+            self._remove(showing_id, queue, entry)
+
+        admitted_through = queue.admitted_through
+        while queue.waiting and queue.active() < self.active_buyers:
+            _, entry = queue.waiting.popitem(last=False)
+            entry.admitted_until = now + self.admission_seconds
+            queue.admitted[entry.token] = entry
+            queue.admitted_through = entry.number
+        if queue.admitted_through != admitted_through:
+            self._publish(showing_id, queue)
+
+        if not queue.waiting and not queue.admitted and not queue.passing:
+            if self._queues.get(showing_id) is queue:
+                del self._queues[showing_id]
+
+    def _publish(self, showing_id: UUID, queue: ShowingQueue) -> None:
+        publish_message(
+            f"screenings/{showing_id}/queue",
+            {
+                "screening_id": str(showing_id),
+                "admitted_through": queue.admitted_through,
+                "waiting": len(queue.waiting),
+            },
+        )
+
+    def _touch(self, entry: QueueEntry) -> None:
+        """Extend a waiting buyer's place; the buyer is still polling."""
+        entry.expires_at = time.monotonic() + self.queue_ttl
+
+    def join(self, showing_id: UUID, user_id: UUID) -> Tuple[QueueEntry, int]:
+        """
+        Put a buyer in the showing's queue, or return their existing entry.
+
+        Returns:
+            Tuple[QueueEntry, int]: The entry and its position (0 once admitted)
+        """
+        queue = self._queues.setdefault(showing_id, ShowingQueue())
+        token = queue.by_user.get(user_id)
+        if token is not None:
+            self._touch(self._tokens[token][1])
+        else:
+            token = secrets.token_urlsafe(16)
+            entry = QueueEntry(token, user_id, queue.next_number, time.monotonic() + self.queue_ttl)
+            queue.next_number += 1
+            queue.waiting[token] = entry
+            queue.by_user[user_id] = token
+            self._tokens[token] = (showing_id, entry)
+            self._advance(showing_id, queue)
+            if entry.admitted_until is None:
+                self._publish(showing_id, queue)
+        entry = self._tokens[token][1]
+        return entry, queue.position(entry)
+
+    def status(
+        self, showing_id: UUID, user_id: UUID, token: str
+    ) -> Optional[Tuple[QueueEntry, int]]:
+        """Return a buyer's entry and position, or None if the token is unknown or expired."""
+        found = self._tokens.get(token)
+        if found is None or found[0] != showing_id or found[1].user_id != user_id:
+            return None
+        queue = self._queues[showing_id]
+        self._advance(showing_id, queue)
+        if token not in self._tokens:
+            return None
+        self._touch(found[1])
+        return found[1], queue.position(found[1])
+
+    @asynccontextmanager
+    async def admission(
+        self, showing_id: UUID, user_id: UUID, token: Optional[str] = None
+    ) -> AsyncIterator[None]:
+        """
+        Hold a booking slot for the duration of a booking attempt.
+
+        Buyers with an admitted token use their slot; the slot is released when
+        the booking succeeds and kept until the admission expires when it fails,
+        so the buyer can try again. Without a token, the request passes through
+        when a slot is free and nobody is waiting.
+
+        Raises:
+            WaitingRoomFull: If the buyer has to wait; they are queued if they
+                were not already
+        """
+        queue = self._queues.get(showing_id)
+        if queue is not None:
+            self._advance(showing_id, queue)
+        queue = self._queues.get(showing_id)
+        if not token and queue is not None:
+            # Buyers who already queued keep their place even without the token
+            token = queue.by_user.get(user_id)
+
+        found = self._tokens.get(token) if token else None
+        if found is not None and found[0] == showing_id and found[1].user_id == user_id:
+            entry = found[1]
+            assert queue is not None
+            if entry.admitted_until is None:
+                self._touch(entry)
+                raise WaitingRoomFull(entry, queue.position(entry))
+            yield
+            self._remove(showing_id, queue, entry)
+            self._advance(showing_id, queue)
+            return
+
+        if queue is not None and (queue.waiting or queue.active() >= self.active_buyers):
+            raise WaitingRoomFull(*self.join(showing_id, user_id))
+
+        queue = self._queues.setdefault(showing_id, ShowingQueue())
+        queue.passing += 1
+        try:
+            yield
+        finally:
+            queue.passing -= 1
+            self._advance(showing_id, queue)
+
+    async def expire_admissions(self) -> None:
+        """Hand slots not used in time to the next in line and drop buyers who stopped polling."""
+        for showing_id, queue in list(self._queues.items()):
+            self._advance(showing_id, queue)
+
+
+waiting_room = WaitingRoom(
+    settings.WAITING_ROOM_ACTIVE_BUYERS,
+    settings.WAITING_ROOM_ADMISSION_SECONDS,
+    settings.WAITING_ROOM_QUEUE_TTL_SECONDS,
+)
+
+waiting_room_task = register_periodic_task(
+    PeriodicTask("waiting-room", 1.0, waiting_room.expire_admissions)
+)
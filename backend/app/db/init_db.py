@@ -7,10 +7,12 @@ and populate the database with seed data if needed.
 """
 
 import logging
+from typing import List, Tuple
 
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.sql import text
 
-from app.db.seed_data import create_sample_data
+from app.db.seed_data import SEATS_PER_ROW, create_sample_data
 from app.db.session import AsyncSessionLocal, Base, engine
 
 # from app.models import (
@@ -24,6 +26,64 @@ from app.db.session import AsyncSessionLocal, Base, engine
 
 logger = logging.getLogger(__name__)
 
+# Idempotent DDL for columns added to (and indexes dropped from) tables that
+# already exist in deployed databases, and backfills of the new data they
+# need. ``create_all`` only creates missing tables, not missing columns.
+SCHEMA_UPGRADES: List[str] = [
+    "ALTER TABLE showings ADD COLUMN IF NOT EXISTS tickets_sold INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE bookings ADD COLUMN IF NOT EXISTS ticket_count INTEGER NOT NULL DEFAULT 1",
+    "ALTER TABLE seat_reservations ALTER COLUMN booking_id DROP NOT NULL",
+    "ALTER TABLE seat_reservations ADD COLUMN IF NOT EXISTS user_id UUID REFERENCES users (id)",
+    "ALTER TABLE sync_state ADD COLUMN IF NOT EXISTS running_until TIMESTAMP",
+    "ALTER TABLE sync_state ADD COLUMN IF NOT EXISTS retry_ids INTEGER[]",
+    # Replaced by partial indexes over scheduled showings
+    "DROP INDEX IF EXISTS ix_showings_status_start_time",
+    "DROP INDEX IF EXISTS ix_showings_movie_status_start_time",
+    "DROP INDEX IF EXISTS ix_showings_room_status_start_time",
+    # Rooms created before seats existed get the layout rooms are seeded with
+    f"""
+    INSERT INTO seats (
+        id, room_id, "row", number, seat_type, is_accessible, is_active, created_at, updated_at
+    )
+    SELECT
+        gen_random_uuid(),
+        rooms.id,
+        chr(ascii('A') + i / {SEATS_PER_ROW}),
+        i % {SEATS_PER_ROW} + 1,
+        'standard',
+        i / {SEATS_PER_ROW} = (rooms.capacity - 1) / {SEATS_PER_ROW} AND i % {SEATS_PER_ROW} < 2,
+        true,
+        now() AT TIME ZONE 'utc',
+        now() AT TIME ZONE 'utc'
+    FROM rooms CROSS JOIN generate_series(0, rooms.capacity - 1) AS i
+    WHERE NOT EXISTS (SELECT 1 FROM seats WHERE seats.room_id = rooms.id)
+    """,
+]
+
+# DDL that depends on optional PostgreSQL extensions. Each entry runs in its
+# own transaction; a failure (e.g. btree_gist not available) is logged and the
+# application keeps relying on its own checks.
+OPTIONAL_SCHEMA_UPGRADES: List[Tuple[str, List[str]]] = [
+    (
+        "exclusion constraint against overlapping showings in a room",
+        [
+            "CREATE EXTENSION IF NOT EXISTS btree_gist",
+            """
+            DO $$
+            BEGIN
+                IF NOT EXISTS (
+                    SELECT 1 FROM pg_constraint WHERE conname = 'ex_showings_room_time'
+                ) THEN
+                    ALTER TABLE showings ADD CONSTRAINT ex_showings_room_time
+                        EXCLUDE USING gist (room_id WITH =, tsrange(start_time, end_time) WITH &&)
+                        WHERE (status = 'scheduled');
+                END IF;
+            END $$
+            """,
+        ],
+    ),
+]
+
 
 async def create_tables() -> None:
     """
@@ -48,6 +108,38 @@ async def create_tables() -> None:
     logger.info("Database tables created successfully!")
 
 
+async def upgrade_schema() -> None:
+    """
+    Bring existing tables up to date with the SQLAlchemy models.
+
+    Runs the statements in ``SCHEMA_UPGRADES``, creates any index declared
+    on the models that does not exist yet and then tries the statements in
+    ``OPTIONAL_SCHEMA_UPGRADES``.
+
+    Returns:
+        None
+    """
+    logger.info("Upgrading database schema...")
+    async with engine.begin() as conn:
+        for statement in SCHEMA_UPGRADES:
+            await conn.execute(text(statement))
+        await conn.run_sync(
+            lambda sync_conn: [
+                index.create(sync_conn, checkfirst=True)
+                for table in Base.metadata.sorted_tables
+                for index in table.indexes
+            ]
+        )
+    for description, statements in OPTIONAL_SCHEMA_UPGRADES:
+        try:
+            async with engine.begin() as conn:
+                for statement in statements:
+                    await conn.execute(text(statement))
+        except SQLAlchemyError as e:
+            logger.warning("Skipping %s: %s", description, e)
+    logger.info("Database schema is up to date")
+
+
 async def check_connection() -> bool:
     """Test database connection."""
     logger.info("Testing database connection...")
@@ -66,6 +158,7 @@ async def init_db() -> None:
     connection_ok = await check_connection()
     if connection_ok:
         await create_tables()
+        await upgrade_schema()
         # Add sample data for development
         await create_sample_data()
     else:
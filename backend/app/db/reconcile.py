@@ -0,0 +1,71 @@
+"""
+Counter reconciliation for the LynrieScoop cinema application.
+
+This module rebuilds denormalized counters from the source tables. Run it by
+hand after a database restore, when the counters may no longer match the
+restored bookings::
+
+    python -m app.db.reconcile
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import AsyncSessionLocal
+from app.models.booking import Booking
+from app.models.showing import Showing
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_showing_counters(session: AsyncSession) -> int:
+    """
+    Recompute ``Showing.tickets_sold`` from the bookings table.
+
+    Cancelled bookings do not hold capacity and are not counted. Only showings
+    whose counter drifted are updated, in a single set-based statement.
+
+    The showing rows are locked first, as booking groups do, so that the sums
+    are taken after any booking in flight has committed and none can commit
+    until the counters are written.
+
+    Args:
+        session: Database session to run the reconciliation in
+
+    Returns:
+        int: Number of showings whose counter was corrected
+    """
+    bookings = Booking.__table__.c
+    sold = (
+        select(func.coalesce(func.sum(bookings.ticket_count), 0))
+        .where(bookings.showing_id == Showing.__table__.c.id)
+        .where(bookings.status != "cancelled")
+        .correlate(Showing)
+        .scalar_subquery()
+    )
+    await session.execute(select(Showing.id).order_by(Showing.id).with_for_update())
+    result = await session.execute(
+        update(Showing)
+        .where(Showing.tickets_sold != sold)
+        .values(tickets_sold=sold)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    corrected = result.rowcount or 0  # type: ignore[attr-defined]
+    if corrected:
+        logger.warning("Reconciled tickets_sold for %d showing(s)", corrected)
+    return corrected
+
+
+async def reconcile_all() -> None:
+    """Run every counter reconciliation in its own session."""
+    async with AsyncSessionLocal() as session:
+        await reconcile_showing_counters(session)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(reconcile_all())
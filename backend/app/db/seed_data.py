@@ -1,24 +1,28 @@
 import asyncio
 import logging
 import random
-from collections import defaultdict
-from datetime import datetime, time, timedelta
-from typing import Any, Dict, List, Set, Tuple, cast
+from datetime import datetime
+from typing import Any, List, cast
 from uuid import UUID
 
 from sqlalchemy import select
 from sqlalchemy.sql import text
 
+from app.core.schedule_planner import load_movies, load_rooms, plan_schedule
 from app.core.security import get_password_hash
 from app.db.session import AsyncSessionLocal
 from app.models.cinema import Cinema
 from app.models.movie import Movie
 from app.models.room import Room
+from app.models.seat import Seat
 from app.models.showing import Showing
 from app.models.user import User
 
 logger = logging.getLogger(__name__)
 
+# Seats per row of the layouts generated for rooms
+SEATS_PER_ROW = 12
+
 tmdb_movies = [
     {
         "adult": False,
@@ -242,6 +246,23 @@ async def create_sample_data() -> None:
         result = await session.execute(select(Room).where(Room.cinema_id == cinema.id))
         rooms = cast(List[Room], list(result.scalars()))  # type: ignore
 
+        # Seats: rows of SEATS_PER_ROW filling each room's capacity; the first
+        # two seats of the last row are wheelchair accessible
+        seats_per_row = SEATS_PER_ROW
+        for room in rooms:
+            capacity = to_int(room.capacity)
+            last_row = (capacity - 1) // seats_per_row
+            session.add_all(
+                Seat(
+                    room_id=room.id,
+                    row=chr(ord("A") + i // seats_per_row),
+                    number=i % seats_per_row + 1,
+                    is_accessible=i // seats_per_row == last_row and i % seats_per_row < 2,
+                )
+                for i in range(capacity)
+            )
+        await session.commit()
+
         # Movies
         for tmdb_movie in tmdb_movies:
             movie = Movie(
@@ -259,96 +280,20 @@ async def create_sample_data() -> None:
             session.add(movie)
         await session.commit()
 
-        result = await session.execute(select(Movie))
-        movies = cast(List[Movie], list(result.scalars()))  # type: ignore
-        movie_map: Dict[int, Movie] = {
-            to_int(movie.tmdb_id): movie for movie in movies if movie.tmdb_id is not None
-        }
-
-        def is_family_friendly(movie_data: Dict[str, Any]) -> bool:
-            return 10751 in movie_data.get("genre_ids", []) or 16 in movie_data.get("genre_ids", [])
-
-        time_slots: List[time] = [
-            datetime.strptime(t, "%H:%M").time()
-            for t in [
-                "13:45",
-                "14:00",
-                "14:15",
-                "16:30",
-                "16:45",
-                "19:30",
-                "19:45",
-                "21:30",
-                "21:45",
-            ]
-        ]
-        afternoon_slots = {t for t in time_slots if t < time(17, 0)}
-        start_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-
-        for day_offset in range(7):
-            current_date = start_date + timedelta(days=day_offset)
-            room_schedule: Dict[UUID, List[Tuple[datetime, datetime]]] = {
-                to_uuid(room.id): [] for room in rooms
-            }
-            movie_counts: Dict[int, int] = {to_int(m["tmdb_id"]): 0 for m in tmdb_movies}
-            scheduled_movies_per_slot: Dict[datetime, Set[int]] = defaultdict(set)
-
-            for slot in time_slots:
-                start_time = current_date.replace(hour=slot.hour, minute=slot.minute)
-                random.shuffle(rooms)
-
-                for room in rooms:
-                    room_key = to_uuid(room.id)
-                    if any(s <= start_time < e for s, e in room_schedule[room_key]):
-                        continue
-
-                    eligible_movies = []
-                    for m in tmdb_movies:
-                        tmdb_id = cast(int, m["tmdb_id"])
-                        if (
-                            movie_counts[tmdb_id] < 3
-                            and movie_map[tmdb_id].id not in scheduled_movies_per_slot[start_time]
-                        ):
-                            eligible_movies.append(m)
-
-                    if slot in afternoon_slots:
-                        eligible_movies.sort(
-                            key=lambda m: (
-                                not is_family_friendly(m),
-                                -float(str(m["vote_average"])),
-                            )
-                        )
-                    else:
-                        eligible_movies.sort(key=lambda m: -float(str(m["vote_average"])))
-
-                    for m in eligible_movies:
-                        movie_ = movie_map.get(to_int(m["tmdb_id"]))
-                        if movie_ is None:
-                            continue
-
-                        runtime = int(movie.runtime or 120)
-                        end_time = start_time + timedelta(minutes=runtime)
-
-                        if any(
-                            not (end_time <= s or start_time >= e)
-                            for s, e in room_schedule[room_key]
-                        ):
-                            continue
-
-                        session.add(
-                            Showing(
-                                movie_id=movie_.id,
-                                room_id=room.id,
-                                start_time=start_time,
-                                end_time=end_time,
-                                status="scheduled",
-                                price=12.50,
-                            )
-                        )
-                        room_schedule[room_key].append((start_time, end_time))
-                        movie_counts[to_int(m["tmdb_id"])] += 1
-                        scheduled_movies_per_slot[start_time].add(to_int(movie.id))  # type: ignore
-                        break
+        # Showings for the coming week, planned like the admin schedule proposals
+        planner_rooms = await load_rooms(session)
+        planner_movies = await load_movies(session)
+        for proposal in plan_schedule(planner_movies, planner_rooms, datetime.now().date(), days=7):
+            session.add(
+                Showing(
+                    movie_id=proposal.movie_id,
+                    room_id=proposal.room_id,
+                    start_time=proposal.start_time,
+                    end_time=proposal.end_time,
+                    status="scheduled",
+                    price=12.50,
+                )
+            )
 
         await session.commit()
         logger.info("Sample data created successfully!")
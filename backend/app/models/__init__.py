@@ -7,11 +7,14 @@ from app.models.booking import Booking
 
 # Import models in order of dependency
 from app.models.cinema import Cinema
+from app.models.email_outbox import EmailOutbox
 from app.models.movie import Movie
 from app.models.room import Room
 from app.models.seat import Seat
 from app.models.seat_reservation import SeatReservation
 from app.models.showing import Showing
+from app.models.sync_state import SyncState
+from app.models.table_version import TableVersion
 from app.models.user import User
 
 # This ensures all models are loaded when importing from app.models
@@ -24,4 +27,7 @@ __all__ = [
     "User",
     "Booking",
     "SeatReservation",
+    "EmailOutbox",
+    "SyncState",
+    "TableVersion",
 ]
@@ -9,12 +9,31 @@ import uuid
 from datetime import datetime
 from typing import Literal
 
-from sqlalchemy import Column, DateTime, Enum, Float, ForeignKey, String
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Sequence,
+    String,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
 
+# Booking references are allocated in blocks of this many sequence numbers,
+# see app.core.booking_reference
+REFERENCE_BLOCK_SIZE = 100
+
+booking_reference_seq = Sequence(
+    "booking_reference_seq", start=1, increment=REFERENCE_BLOCK_SIZE, metadata=Base.metadata
+)
+
 
 class Booking(Base):
     """
@@ -28,7 +47,8 @@ class Booking(Base):
         id (UUID): Primary key, unique identifier for the booking
         user_id (UUID): Foreign key to the users table
         showing_id (UUID): Foreign key to the showings table
-        booking_number (str): Unique booking reference number for customers
+        booking_number (str): Unique booking reference for customers (e.g. "7K3Q-M9XD")
+        ticket_count (int): Number of tickets in the booking
         total_price (float): Total price of the booking
         status (str): Current status of the booking:
             - "pending": Initial state when booking is created
@@ -47,11 +67,20 @@ class Booking(Base):
     """
 
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Active bookings of a showing, for cancellation and the lifecycle sweep
+        Index(
+            "ix_bookings_active_showing",
+            "showing_id",
+            postgresql_where=text("status IN ('pending', 'confirmed')"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     showing_id = Column(UUID(as_uuid=True), ForeignKey("showings.id"), nullable=False)
     booking_number = Column(String, unique=True, nullable=False, index=True)
+    ticket_count = Column(Integer, nullable=False, default=1, server_default="1")
     total_price = Column(Float, nullable=False)
     status: Column[Literal["pending", "confirmed", "cancelled", "completed"]] = Column(
         Enum("pending", "confirmed", "cancelled", "completed", name="booking_status"),
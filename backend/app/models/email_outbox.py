@@ -0,0 +1,63 @@
+"""
+EmailOutbox data model for the LynrieScoop cinema application.
+
+This module defines the ORM model for the transactional email outbox. Emails
+are written to the outbox in the same transaction as the change that triggers
+them and are delivered later by a background sender.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Literal
+
+from sqlalchemy import Column, DateTime, Enum, Index, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.session import Base
+
+
+class EmailOutbox(Base):
+    """
+    SQLAlchemy ORM model representing a queued outgoing email.
+
+    Attributes:
+        id (UUID): Primary key, unique identifier for the message
+        recipient (str): Formatted recipient address ("Name <email>")
+        subject (str): Email subject line
+        html_body (str): HTML body of the email
+        status (str): Delivery status of the message:
+            - "pending": Waiting to be sent (or retried)
+            - "sent": Delivered to the SMTP server
+            - "failed": Gave up after the maximum number of attempts
+        attempts (int): Number of delivery attempts made so far
+        next_attempt_at (datetime): Earliest time the next attempt may be made
+        last_error (str): Error message of the last failed attempt
+        created_at (datetime): When the message was queued
+        sent_at (datetime): When the message was delivered
+    """
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index(
+            "ix_email_outbox_pending",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html_body = Column(Text, nullable=False)
+    status: Column[Literal["pending", "sent", "failed"]] = Column(
+        Enum("pending", "sent", "failed", name="email_status"),
+        default="pending",
+        nullable=False,
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
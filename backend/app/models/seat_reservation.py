@@ -9,7 +9,7 @@ import uuid
 from datetime import datetime
 from typing import Literal
 
-from sqlalchemy import Column, DateTime, Enum, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Enum, Float, ForeignKey, Index, Integer, String, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -26,7 +26,9 @@ class SeatReservation(Base):
 
     Attributes:
         id (UUID): Primary key, unique identifier for the reservation
-        booking_id (UUID): Foreign key to the booking this reservation belongs to
+        booking_id (UUID): Foreign key to the booking this reservation belongs to,
+            empty while the seat is only held
+        user_id (UUID): Foreign key to the user holding or owning the seat
         showing_id (UUID): Foreign key to the movie showing
         seat_id (UUID): Foreign key to the specific seat being reserved
         row (str): Row identifier, duplicated from the seat for quick access
@@ -48,9 +50,20 @@ class SeatReservation(Base):
     """
 
     __tablename__ = "seat_reservations"
+    __table_args__ = (
+        # A seat can only be taken once per showing
+        Index("uq_seat_reservations_showing_seat", "showing_id", "seat_id", unique=True),
+        # Lets the hold reaper find expired holds without scanning booked seats
+        Index(
+            "ix_seat_reservations_hold_expiry",
+            "expires_at",
+            postgresql_where=text("status IN ('selected', 'reserved')"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id"), nullable=False)
+    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id"), nullable=True, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     showing_id = Column(UUID(as_uuid=True), ForeignKey("showings.id"), nullable=False)
     seat_id = Column(UUID(as_uuid=True), ForeignKey("seats.id"), nullable=False)
     row = Column(String, nullable=False)  # Row identifier (A, B, C, etc.)
@@ -9,7 +9,19 @@ import uuid
 from datetime import datetime
 from typing import Literal, cast
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, Float, ForeignKey, func, select
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    func,
+    select,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
@@ -36,6 +48,9 @@ class Showing(Base):
         is_imax (bool): Whether this showing is in IMAX format
         is_dolby (bool): Whether this showing is in Dolby format
         price (float): Base ticket price for this showing
+        tickets_sold (int): Denormalized number of tickets sold for this showing,
+            maintained by the booking transaction and rebuilt by
+            :func:`app.db.reconcile.reconcile_showing_counters`
         status (str): Current status of the showing:
             - "scheduled": The showing is scheduled to occur
             - "cancelled": The showing has been cancelled
@@ -50,6 +65,33 @@ class Showing(Base):
     """
 
     __tablename__ = "showings"
+    # Partial indexes over scheduled showings only: completed and cancelled
+    # showings drop out of them, so schedule lookups, conflict checks and the
+    # lifecycle sweep stay proportional to the live schedule
+    __table_args__ = (
+        Index(
+            "ix_showings_scheduled_start_time",
+            "start_time",
+            postgresql_where=text("status = 'scheduled'"),
+        ),
+        Index(
+            "ix_showings_scheduled_movie_start_time",
+            "movie_id",
+            "start_time",
+            postgresql_where=text("status = 'scheduled'"),
+        ),
+        Index(
+            "ix_showings_scheduled_room_start_time",
+            "room_id",
+            "start_time",
+            postgresql_where=text("status = 'scheduled'"),
+        ),
+        Index(
+            "ix_showings_scheduled_end_time",
+            "end_time",
+            postgresql_where=text("status = 'scheduled'"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     movie_id = Column(UUID(as_uuid=True), ForeignKey("movies.id"), nullable=False)
@@ -60,6 +102,7 @@ class Showing(Base):
     is_imax = Column(Boolean, default=False)
     is_dolby = Column(Boolean, default=False)
     price = Column(Float, nullable=False)
+    tickets_sold = Column(Integer, nullable=False, default=0, server_default="0")
     status: Column[Literal["scheduled", "cancelled", "completed"]] = Column(
         Enum("scheduled", "cancelled", "completed", name="showing_status"),
         default="scheduled",
@@ -0,0 +1,38 @@
+"""
+SyncState data model for the LynrieScoop cinema application.
+
+This module defines the ORM model for the progress of periodic
+synchronizations with external services, such as the TMDB metadata sync.
+"""
+
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.db.session import Base
+
+
+class SyncState(Base):
+    """
+    SQLAlchemy ORM model representing the progress of one synchronization.
+
+    A worker claims a synchronization by setting ``running_until`` before
+    it starts, so that only one worker runs it at a time.
+
+    Attributes:
+        name (str): Primary key, name of the synchronization
+        watermark (datetime): Time up to which changes have been synchronized
+        running_until (datetime): When the claim of the running synchronization lapses
+        retry_ids (List[int]): External IDs that failed and are retried by the next run
+        updated_at (datetime): When the synchronization last ran
+    """
+
+    __tablename__ = "sync_state"
+
+    name = Column(String, primary_key=True)
+    watermark = Column(DateTime, nullable=True)
+    running_until = Column(DateTime, nullable=True)
+    retry_ids: Column[Sequence[int]] = Column(ARRAY(Integer), nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
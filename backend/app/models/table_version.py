@@ -0,0 +1,29 @@
+"""
+TableVersion data model for the LynrieScoop cinema application.
+
+This module defines the ORM model for the version stamps of the tables
+behind the HTTP-cached read endpoints.
+"""
+
+from sqlalchemy import BigInteger, Column, String
+
+from app.db.session import Base
+
+
+class TableVersion(Base):
+    """
+    SQLAlchemy ORM model representing the version stamp of a table.
+
+    The version is bumped in the same transaction as every change to the
+    table and never decreases, so ETags derived from it stay valid across
+    restarts and deletes.
+
+    Attributes:
+        name (str): Primary key, name of the versioned table
+        version (int): Microseconds since the epoch of the table's last change
+    """
+
+    __tablename__ = "table_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False)
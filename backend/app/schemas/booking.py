@@ -0,0 +1,58 @@
+"""
+Booking schema definitions for the LynrieScoop cinema application.
+
+This module provides Pydantic models for booking data validation and
+documentation in the API, such as the request body for creating a booking.
+"""
+
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field, model_validator
+
+from app.core.config import settings
+
+
+class BookingCreate(BaseModel):
+    """
+    Schema for a booking request.
+
+    A booking covers one or more tickets for a single showing. When specific
+    seats are requested, the quantity is taken from the number of seats.
+
+    Attributes:
+        quantity (int): Number of tickets to book
+        seat_ids (List[UUID], optional): Specific seats to book for the showing
+    """
+
+    quantity: int = Field(default=1, ge=1, le=settings.MAX_TICKETS_PER_BOOKING)
+    seat_ids: Optional[List[UUID]] = Field(
+        default=None, max_length=settings.MAX_TICKETS_PER_BOOKING
+    )
+
+    @model_validator(mode="after")
+    def quantity_from_seats(self) -> "BookingCreate":
+        if self.seat_ids:
+            if len(set(self.seat_ids)) != len(self.seat_ids):
+                raise ValueError("Each seat can only be booked once")
+            self.quantity = len(self.seat_ids)
+        return self
+
+
+class SeatHoldRequest(BaseModel):
+    """
+    Schema for holding or releasing specific seats of a showing.
+
+    Attributes:
+        showing_id (UUID): The showing the seats belong to
+        seat_ids (List[UUID]): The seats to hold or release
+    """
+
+    showing_id: UUID
+    seat_ids: List[UUID] = Field(..., min_length=1, max_length=settings.MAX_TICKETS_PER_BOOKING)
+
+    @model_validator(mode="after")
+    def unique_seats(self) -> "SeatHoldRequest":
+        if len(set(self.seat_ids)) != len(self.seat_ids):
+            raise ValueError("Each seat can only be listed once")
+        return self
@@ -7,10 +7,13 @@ and response data for movie-related API endpoints.
 """
 
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
+
+# Upper bound for the number of movies imported from TMDB in one job
+MAX_IMPORT_MOVIES = 500
 
 
 class MovieBase(BaseModel):
@@ -102,6 +105,21 @@ class MovieDetail(Movie):
     pass
 
 
+class NowPlayingMovie(Movie):
+    """
+    Movie in the now-playing list.
+
+    Attributes:
+        next_showtime (datetime): Start time of the movie's next scheduled showing
+        lowest_price (float): Lowest ticket price of its upcoming showings
+        showing_count (int): Number of upcoming scheduled showings
+    """
+
+    next_showtime: datetime
+    lowest_price: float
+    showing_count: int
+
+
 class TMDBMovie(BaseModel):
     """Movie data from TMDB API"""
 
@@ -119,3 +137,24 @@ class TMDBMovie(BaseModel):
     cast: Optional[List[str]] = None
     trailer_url: Optional[str] = None
     status: Optional[str] = None
+
+
+class TMDBBulkImportRequest(BaseModel):
+    """
+    Schema for importing many movies from TMDB at once.
+
+    Attributes:
+        tmdb_ids (List[int]): TMDB IDs of the movies to import
+        tmdb_list (str, optional): TMDB movie list whose movies to import as well
+        pages (int): Number of pages of the list to import (20 movies each)
+    """
+
+    tmdb_ids: List[int] = Field(default_factory=list, max_length=MAX_IMPORT_MOVIES)
+    tmdb_list: Optional[Literal["now_playing", "upcoming", "popular", "top_rated"]] = None
+    pages: int = Field(1, ge=1, le=10)
+
+    @model_validator(mode="after")
+    def has_movies(self) -> "TMDBBulkImportRequest":
+        if not self.tmdb_ids and self.tmdb_list is None:
+            raise ValueError("Give tmdb_ids, tmdb_list or both")
+        return self
@@ -0,0 +1,135 @@
+"""
+Showing schema definitions for the LynrieScoop cinema application.
+
+This module provides Pydantic models for showing data validation and
+documentation in the API, such as the request bodies for batch availability
+and bulk schedule creation.
+"""
+
+from datetime import date, datetime, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field, model_validator
+
+# Upper bound for the number of showings requested or created in one batch
+MAX_BATCH_SHOWINGS = 1000
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert a timezone-aware datetime to naive UTC, as showing times are stored."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class ShowingAvailabilityRequest(BaseModel):
+    """
+    Schema for a batch availability request.
+
+    Showings are selected by ID, by start time window, or both (the window
+    then narrows down the listed showings).
+
+    Attributes:
+        showing_ids (List[UUID], optional): The showings to report on
+        start_time (datetime, optional): Only showings starting at or after this time
+        end_time (datetime, optional): Only showings starting before this time
+    """
+
+    showing_ids: Optional[List[UUID]] = Field(None, min_length=1, max_length=MAX_BATCH_SHOWINGS)
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def selection_given(self) -> "ShowingAvailabilityRequest":
+        self.start_time = naive_utc(self.start_time)
+        self.end_time = naive_utc(self.end_time)
+        if self.showing_ids is None and self.start_time is None:
+            raise ValueError("Either showing_ids or start_time is required")
+        if self.start_time and self.end_time and self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time")
+        return self
+
+
+class ShowingCreate(BaseModel):
+    """
+    Schema for a new showing in a bulk schedule request.
+
+    Attributes:
+        movie_id (UUID): The movie to show
+        room_id (UUID): The room to show it in
+        start_time (datetime): When the showing starts
+        end_time (datetime): When the showing ends
+        price (float): Base ticket price
+        is_3d (bool): Whether the showing is in 3D
+        is_imax (bool): Whether the showing is in IMAX
+        is_dolby (bool): Whether the showing is in Dolby
+    """
+
+    movie_id: UUID
+    room_id: UUID
+    start_time: datetime
+    end_time: datetime
+    price: float = Field(..., gt=0)
+    is_3d: bool = False
+    is_imax: bool = False
+    is_dolby: bool = False
+
+    @model_validator(mode="after")
+    def valid_times(self) -> "ShowingCreate":
+        self.start_time = naive_utc(self.start_time) or self.start_time
+        self.end_time = naive_utc(self.end_time) or self.end_time
+        if self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time")
+        return self
+
+
+class BulkShowingCreate(BaseModel):
+    """
+    Schema for creating many showings at once.
+
+    Attributes:
+        showings (List[ShowingCreate]): The showings to create
+    """
+
+    showings: List[ShowingCreate] = Field(..., min_length=1, max_length=MAX_BATCH_SHOWINGS)
+
+
+class ScheduleCopyRequest(BaseModel):
+    """
+    Schema for copying the showings of a period to another period.
+
+    Attributes:
+        source_start (date): First day of the period to copy
+        target_start (date): First day of the period to copy to
+        days (int): Length of the period in days (default: one week)
+    """
+
+    source_start: date
+    target_start: date
+    days: int = Field(7, ge=1, le=31)
+
+    @model_validator(mode="after")
+    def distinct_periods(self) -> "ScheduleCopyRequest":
+        if self.source_start == self.target_start:
+            raise ValueError("target_start must differ from source_start")
+        return self
+
+
+class ScheduleProposalRequest(BaseModel):
+    """
+    Schema for requesting a proposed schedule.
+
+    Attributes:
+        start_date (date): First day to plan
+        days (int): Number of days to plan (default: one week)
+        price (float): Base ticket price of the proposed showings
+        room_ids (List[UUID], optional): Rooms to plan (default: all rooms)
+        commit (bool): Create the proposed showings right away
+    """
+
+    start_date: date
+    days: int = Field(7, ge=1, le=14)
+    price: float = Field(12.50, gt=0)
+    room_ids: Optional[List[UUID]] = Field(None, min_length=1)
+    commit: bool = False
@@ -0,0 +1,10 @@
+"""
+Offline TMDB stand-in for the LynrieScoop cinema application.
+
+A small TMDB-compatible API that serves fixtures instead of calling The
+Movie Database, so that the movie routes and the TMDB import can be
+benchmarked without network access. Point the backend at it with
+``TMDB_API_BASE_URL=http://localhost:8001/3`` and start it with::
+
+    python -m app.tmdb_stub --port 8001 --latency-ms 80 --error-rate 0.01
+"""
@@ -0,0 +1,61 @@
+"""
+Command line of the offline TMDB stand-in.
+
+Serve fixtures::
+
+    python -m app.tmdb_stub --port 8001 --latency-ms 80 --jitter-ms 40 --error-rate 0.01
+
+Record fixtures from the real API (needs ``TMDB_API_KEY``)::
+
+    python -m app.tmdb_stub --record fixtures.json --record-lists 3 --record-id 550
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+
+import uvicorn
+
+from app.core.tmdb import tmdb_client
+from app.tmdb_stub.fixtures import load_fixtures, record_fixtures
+from app.tmdb_stub.server import StubConfig, create_app
+
+
+async def _record(path: Path, tmdb_ids: list, list_pages: int) -> int:
+    try:
+        return await record_fixtures(tmdb_client, path, tmdb_ids, list_pages)
+    finally:
+        await tmdb_client.aclose()
+
+
+def main() -> None:
+    """Serve or record fixtures, as asked on the command line."""
+    parser = argparse.ArgumentParser(prog="python -m app.tmdb_stub", description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--fixtures", type=Path, help="recorded fixtures (default: seed movies)")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per second")
+    parser.add_argument("--record", type=Path, help="record fixtures into this file and exit")
+    parser.add_argument("--record-id", type=int, action="append", default=[])
+    parser.add_argument("--record-lists", type=int, default=1, help="list pages to record")
+    args = parser.parse_args()
+
+    if args.record:
+        count = asyncio.run(_record(args.record, args.record_id, args.record_lists))
+        print(f"Recorded {count} movies into {args.record}")
+        return
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+    )
+    uvicorn.run(create_app(load_fixtures(args.fixtures), config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Fixtures of the offline TMDB stand-in.
+
+A fixture set maps TMDB IDs to movie details in TMDB's format, with their
+``credits`` and ``videos`` appended, like the response of
+``/movie/{id}?append_to_response=credits,videos``. Lists and search results
+are derived from it.
+
+Fixtures are recorded from the real API with :func:`record_fixtures`. When
+no recording is given, the movies of the seed data are used, with
+placeholder credits and trailers.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, cast
+
+from app.core.tmdb import TMDBClient
+
+# TMDB's movie genres
+GENRE_NAMES = {
+    28: "Action",
+    12: "Adventure",
+    16: "Animation",
+    35: "Comedy",
+    80: "Crime",
+    99: "Documentary",
+    18: "Drama",
+    10751: "Family",
+    14: "Fantasy",
+    36: "History",
+    27: "Horror",
+    10402: "Music",
+    9648: "Mystery",
+    10749: "Romance",
+    878: "Science Fiction",
+    10770: "TV Movie",
+    53: "Thriller",
+    10752: "War",
+    37: "Western",
+}
+
+# Fields of a movie that appear in list and search results
+LIST_FIELDS = (
+    "adult",
+    "backdrop_path",
+    "genre_ids",
+    "id",
+    "original_language",
+    "original_title",
+    "overview",
+    "popularity",
+    "poster_path",
+    "release_date",
+    "title",
+    "video",
+    "vote_average",
+    "vote_count",
+)
+
+Fixtures = Dict[int, Dict[str, Any]]
+
+
+def seed_fixtures() -> Fixtures:
+    """
+    Build fixtures from the movies of the seed data.
+
+    Returns:
+        Fixtures: One movie per seed movie, with placeholder credits and videos
+    """
+    from app.db.seed_data import tmdb_movies
+
+    fixtures: Fixtures = {}
+    for seed in tmdb_movies:
+        tmdb_id = cast(int, seed["tmdb_id"])
+        genre_ids = cast(List[int], seed.get("genre_ids", []))
+        movie = {key: value for key, value in seed.items() if key != "tmdb_id"}
+        movie.update(
+            id=tmdb_id,
+            genre_ids=genre_ids,
+            genres=[{"id": genre, "name": GENRE_NAMES.get(genre, "")} for genre in genre_ids],
+            runtime=seed.get("runtime", 110),
+            status="Released",
+            credits={
+                "id": tmdb_id,
+                "cast": [
+                    {"id": tmdb_id * 100 + i, "name": f"Cast Member {i}", "order": i}
+                    for i in range(1, 13)
+                ],
+                "crew": [{"id": tmdb_id * 100, "name": "Stand-in Director", "job": "Director"}],
+            },
+            videos={
+                "id": tmdb_id,
+                "results": [
+                    {
+                        "key": f"stub{tmdb_id}",
+                        "site": "YouTube",
+                        "type": "Trailer",
+                        "name": "Official Trailer",
+                    }
+                ],
+            },
+        )
+        fixtures[tmdb_id] = movie
+    return fixtures
+
+
+def load_fixtures(path: Optional[Path] = None) -> Fixtures:
+    """
+    Load recorded fixtures, or the seed fixtures when no path is given.
+
+    Args:
+        path: JSON file written by :func:`record_fixtures`
+
+    Returns:
+        Fixtures: The fixture set
+    """
+    if path is None:
+        return seed_fixtures()
+    movies: List[Dict[str, Any]] = json.loads(path.read_text())["movies"]
+    return {int(movie["id"]): movie for movie in movies}
+
+
+async def record_fixtures(
+    client: TMDBClient,
+    path: Path,
+    tmdb_ids: Iterable[int] = (),
+    list_pages: int = 0,
+) -> int:
+    """
+    Record movie details from the real TMDB API into a fixture file.
+
+    Args:
+        client: TMDB client configured with a real API key
+        path: File to write
+        tmdb_ids: Movies to record
+        list_pages: Also record the movies on this many pages of every movie list
+
+    Returns:
+        int: Number of movies recorded
+    """
+    ids = dict.fromkeys(tmdb_ids)
+    for name in ("now_playing", "upcoming", "popular", "top_rated"):
+        for page in range(1, list_pages + 1):
+            result = await client.movie_list(name, page=page)
+            ids.update(dict.fromkeys(movie["id"] for movie in result["results"]))
+    movies = [await client.movie(tmdb_id, append_to_response="credits,videos") for tmdb_id in ids]
+    for movie in movies:
+        movie["genre_ids"] = [genre["id"] for genre in movie.get("genres", [])]
+    path.write_text(json.dumps({"movies": movies}, indent=1))
+    return len(movies)
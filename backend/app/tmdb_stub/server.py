@@ -0,0 +1,260 @@
+"""
+TMDB-compatible API of the offline TMDB stand-in.
+
+Serves the ``/3`` endpoints the backend uses (movie lists, movie details
+with appended credits and videos, credits, videos and search) from a
+fixture set. Latency, server errors and rate limiting can be injected to
+see how the backend copes, and every request is counted so that benchmarks
+can tell how many requests the backend's cache absorbed:
+
+- ``GET/PUT /__stub/config`` reads or changes the injected behaviour;
+- ``GET /__stub/stats`` returns the request counts, ``DELETE`` resets them;
+- ``PATCH /__stub/movies/{id}`` changes a movie and lists it in the changes feed.
+"""
+
+import asyncio
+import random
+import time
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import APIRouter, FastAPI, Query, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+from app.tmdb_stub.fixtures import LIST_FIELDS, Fixtures
+
+PAGE_SIZE = 20
+CHANGES_PAGE_SIZE = 100
+
+
+class StubConfig(BaseModel):
+    """
+    Behaviour injected into the stand-in's TMDB endpoints.
+
+    Attributes:
+        latency_ms: Delay added to every response
+        jitter_ms: Random extra delay of up to this many milliseconds
+        error_rate: Share of requests answered with a 500 or 503
+        rate_limit: Requests per second served before answering 429, 0 for no limit
+    """
+
+    latency_ms: float = Field(default=0, ge=0)
+    jitter_ms: float = Field(default=0, ge=0)
+    error_rate: float = Field(default=0, ge=0, le=1)
+    rate_limit: int = Field(default=0, ge=0)
+
+
+def _not_found() -> JSONResponse:
+    return JSONResponse(
+        {
+            "success": False,
+            "status_code": 34,
+            "status_message": "The resource you requested could not be found.",
+        },
+        status_code=404,
+    )
+
+
+def _page(movies: List[Dict[str, Any]], page: int) -> Dict[str, Any]:
+    start = (page - 1) * PAGE_SIZE
+    return {
+        "page": page,
+        "results": [
+            {key: movie[key] for key in LIST_FIELDS if key in movie}
+            for movie in movies[start : start + PAGE_SIZE]
+        ],
+        "total_pages": max((len(movies) + PAGE_SIZE - 1) // PAGE_SIZE, 1),
+        "total_results": len(movies),
+    }
+
+
+def movie_lists(fixtures: Fixtures, today: date) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Derive TMDB's movie lists from a fixture set.
+
+    Args:
+        fixtures: The fixture set
+        today: Date separating released from upcoming movies
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: The movies of every list, in list order
+    """
+    movies = list(fixtures.values())
+    released = [movie for movie in movies if movie.get("release_date", "") <= today.isoformat()]
+    upcoming = [movie for movie in movies if movie.get("release_date", "") > today.isoformat()]
+    return {
+        "now_playing": sorted(released, key=lambda m: m.get("release_date", ""), reverse=True),
+        "upcoming": sorted(upcoming, key=lambda m: m.get("release_date", "")),
+        "popular": sorted(movies, key=lambda m: m.get("popularity", 0), reverse=True),
+        "top_rated": sorted(movies, key=lambda m: m.get("vote_average", 0), reverse=True),
+    }
+
+
+class RateLimiter:
+    """Fixed one-second window request limiter."""
+
+    def __init__(self) -> None:
+        self._window = 0
+        self._count = 0
+
+    def allow(self, limit: int) -> bool:
+        """Count a request and tell whether it fits in the current window."""
+        window = int(time.monotonic())
+        if window != self._window:
+            self._window, self._count = window, 0
+        self._count += 1
+        return limit == 0 or self._count <= limit
+
+
+def create_app(fixtures: Fixtures, config: Optional[StubConfig] = None) -> FastAPI:
+    """
+    Create the stand-in application.
+
+    Args:
+        fixtures: Movies to serve
+        config: Initially injected behaviour
+
+    Returns:
+        FastAPI: The application
+    """
+    app = FastAPI(title="TMDB stand-in", docs_url=None, redoc_url=None)
+    current = config or StubConfig()
+    stats: Counter = Counter()
+    limiter = RateLimiter()
+    lists = movie_lists(fixtures, date.today())
+    changed_on: Dict[int, date] = {}
+
+    @app.middleware("http")
+    async def inject_behaviour(request: Request, call_next: Callable) -> Response:
+        """Count TMDB requests and add the configured latency and failures."""
+        if not request.url.path.startswith("/3/"):
+            passed: Response = await call_next(request)
+            return passed
+        stats["requests"] += 1
+
+        delay = current.latency_ms + random.uniform(0, current.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if not limiter.allow(current.rate_limit):
+            stats["rate_limited"] += 1
+            return JSONResponse(
+                {"success": False, "status_code": 25, "status_message": "Too many requests."},
+                status_code=429,
+                headers={"Retry-After": "1"},
+            )
+        if random.random() < current.error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                {"success": False, "status_code": 11, "status_message": "Internal error."},
+                status_code=random.choice((500, 503)),
+            )
+
+        response: Response = await call_next(request)
+        route = request.scope.get("route")
+        stats[f"{request.method} {getattr(route, 'path', request.url.path)}"] += 1
+        return response
+
+    tmdb = APIRouter(prefix="/3")
+
+    @tmdb.get("/movie/changes")
+    async def movie_changes(
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        page: int = Query(1, ge=1),
+    ) -> Any:
+        """Serve the IDs of the movies changed through the stand-in in a period."""
+        end = end_date or date.today()
+        start = start_date or end - timedelta(days=1)
+        changed = [
+            {"id": tmdb_id, "adult": False}
+            for tmdb_id, day in changed_on.items()
+            if start <= day <= end
+        ]
+        first = (page - 1) * CHANGES_PAGE_SIZE
+        return {
+            "results": changed[first : first + CHANGES_PAGE_SIZE],
+            "page": page,
+            "total_pages": max((len(changed) + CHANGES_PAGE_SIZE - 1) // CHANGES_PAGE_SIZE, 1),
+            "total_results": len(changed),
+        }
+
+    @tmdb.get("/movie/{name}", include_in_schema=False)
+    async def movie_or_list(
+        name: str,
+        page: int = Query(1, ge=1),
+        append_to_response: Optional[str] = None,
+    ) -> Any:
+        """Serve a movie list page, or the details of a movie."""
+        if name in lists:
+            return _page(lists[name], page)
+        if not name.isdigit() or int(name) not in fixtures:
+            return _not_found()
+        movie = dict(fixtures[int(name)])
+        appended = set((append_to_response or "").split(","))
+        for extra in ("credits", "videos"):
+            if extra not in appended:
+                movie.pop(extra, None)
+        movie.pop("genre_ids", None)
+        return movie
+
+    @tmdb.get("/movie/{tmdb_id}/credits")
+    async def movie_credits(tmdb_id: int) -> Any:
+        """Serve the cast and crew of a movie."""
+        if tmdb_id not in fixtures:
+            return _not_found()
+        return fixtures[tmdb_id].get("credits", {"id": tmdb_id, "cast": [], "crew": []})
+
+    @tmdb.get("/movie/{tmdb_id}/videos")
+    async def movie_videos(tmdb_id: int) -> Any:
+        """Serve the trailers and clips of a movie."""
+        if tmdb_id not in fixtures:
+            return _not_found()
+        return fixtures[tmdb_id].get("videos", {"id": tmdb_id, "results": []})
+
+    @tmdb.get("/search/movie")
+    async def search_movie(query: str = "", page: int = Query(1, ge=1)) -> Any:
+        """Serve the movies whose title contains the query."""
+        needle = query.casefold()
+        matches = [
+            movie
+            for movie in lists["popular"]
+            if needle and needle in str(movie.get("title", "")).casefold()
+        ]
+        return _page(matches, page)
+
+    app.include_router(tmdb)
+
+    @app.get("/__stub/config")
+    async def get_config() -> StubConfig:
+        """Return the injected behaviour."""
+        return current
+
+    @app.put("/__stub/config")
+    async def put_config(new_config: StubConfig) -> StubConfig:
+        """Change the injected behaviour."""
+        nonlocal current
+        current = new_config
+        return current
+
+    @app.patch("/__stub/movies/{tmdb_id}")
+    async def change_movie(tmdb_id: int, changes: Dict[str, Any]) -> Any:
+        """Change fields of a movie and report it in the changes feed from today."""
+        if tmdb_id not in fixtures:
+            return _not_found()
+        fixtures[tmdb_id].update(changes)
+        changed_on[tmdb_id] = date.today()
+        return fixtures[tmdb_id]
+
+    @app.get("/__stub/stats")
+    async def get_stats() -> Dict[str, int]:
+        """Return the number of TMDB requests served, in total and per endpoint."""
+        return dict(stats)
+
+    @app.delete("/__stub/stats", status_code=204)
+    async def reset_stats() -> None:
+        """Reset the request counts."""
+        stats.clear()
+
+    return app
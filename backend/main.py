@@ -9,12 +9,18 @@ from app.api.routes import (
     admin_router,
     auth_router,
     bookings_router,
+    cinemas_router,
     movies_router,
     showings_router,
     users_router,
 )
+from app.core import showing_lifecycle  # noqa: F401 - registers the showing sweeper
+from app.core import tmdb_sync  # noqa: F401 - registers the TMDB metadata sync
+from app.core.background import setup_background_tasks_for_app
 from app.core.config import settings
+from app.core.http_cache import table_versions
 from app.core.mqtt_client import setup_mqtt_for_app
+from app.core.tmdb import setup_tmdb_for_app
 from app.db.init_db import init_db
 
 app = FastAPI(
@@ -30,6 +36,7 @@ app.add_middleware(
     allow_origins=["*"],  # Allow all origins
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed"],
 )
 
 if settings.ENVIRONMENT != "development":
@@ -46,6 +53,15 @@ setup_mqtt_for_app(app)
 @app.on_event("startup")
 async def startup_db_client() -> None:
     await init_db()
+    # Validators start from the persisted table versions
+    await table_versions.bootstrap()
+
+
+# Close pooled TMDB connections on shutdown
+setup_tmdb_for_app(app)
+
+# Start background tasks (email outbox, showing sweeper, ...) once the database is ready
+setup_background_tasks_for_app(app)
 
 
 # Include API routers
@@ -54,6 +70,7 @@ app.include_router(movies_router, prefix="/movies", tags=["movies"])
 app.include_router(showings_router, prefix="/showings", tags=["showings"])
 app.include_router(bookings_router, prefix="/bookings", tags=["bookings"])
 app.include_router(users_router, prefix="/users", tags=["users"])
+app.include_router(cinemas_router, prefix="/cinema", tags=["cinema"])
 app.include_router(admin_router, prefix="/admin", tags=["admin"])
 
 
@@ -23,6 +23,14 @@ interface Screening {
   price: number;
 }
 
+interface ScreeningAvailability {
+  showing_id: string;
+  status: string;
+  total_capacity: number;
+  available_tickets: number;
+  held_seats: number;
+}
+
 document.addEventListener('DOMContentLoaded', () => {
   const token = getCookie('token');
   if (!token) return redirectToLogin();
@@ -245,8 +253,9 @@ document.addEventListener('DOMContentLoaded', () => {
       }
 
       // Filter upcoming and sort
+      const now = new Date();
       const upcomingShowings = data
-        .filter((s: Screening) => new Date(s.start_time) >= new Date())
+        .filter((s: Screening) => new Date(s.start_time) >= now)
         .sort((a, b) => new Date(a.start_time).getTime() - new Date(b.start_time).getTime());
 
       // Group by date (ISO yyyy-mm-dd for sorting)
@@ -257,6 +266,27 @@ document.addEventListener('DOMContentLoaded', () => {
         grouped[data].push(s);
       });
 
+      // Ticket availability of all listed screenings in one request
+      const availability = new Map<string, ScreeningAvailability>();
+      if (upcomingShowings.length > 0) {
+        try {
+          const availabilityRes = await fetch(buildApiUrl('/showings/showings/availability'), {
+            method: 'POST',
+            headers: {
+              'Content-Type': 'application/json',
+              Authorization: `Bearer ${token}`,
+            },
+            body: JSON.stringify({ start_time: now.toISOString() }),
+          });
+          if (availabilityRes.ok) {
+            const rows: ScreeningAvailability[] = await availabilityRes.json();
+            rows.forEach((row) => availability.set(row.showing_id, row));
+          }
+        } catch {
+          console.error('Error loading ticket availability');
+        }
+      }
+
       const sortedDates = Object.keys(grouped).sort();
       for (const data of sortedDates) {
         const dayContainer = document.createElement('div');
@@ -310,22 +340,11 @@ document.addEventListener('DOMContentLoaded', () => {
           const ticketsInfo = document.createElement('p');
           ticketsInfo.textContent = 'Loading ticket info...';
 
-          try {
-            const ticketRes = await fetch(
-              buildApiUrl(`/showings/showings/${screening.id}/tickets`),
-              {
-                headers: { Authorization: `Bearer ${token}` },
-              }
-            );
-
-            if (ticketRes.ok) {
-              const ticketData = await ticketRes.json();
-              ticketsInfo.textContent = `Available Tickets: ${ticketData.available_tickets} / ${ticketData.total_capacity}`;
-            } else {
-              ticketsInfo.textContent = 'Tickets unavailable';
-            }
-          } catch {
-            ticketsInfo.textContent = 'Error loading tickets';
+          const ticketData = availability.get(screening.id);
+          if (ticketData) {
+            ticketsInfo.textContent = `Available Tickets: ${ticketData.available_tickets} / ${ticketData.total_capacity}`;
+          } else {
+            ticketsInfo.textContent = 'Tickets unavailable';
           }
 
           rightContainer.appendChild(movieTitle);
@@ -13,6 +13,25 @@ interface Booking {
   status: string;
 }
 
+// The API returns bookings a page at a time; follow X-Next-Cursor until the last page
+async function fetchAllBookings(token: string): Promise<Booking[]> {
+  const bookings: Booking[] = [];
+  let cursor: string | null = null;
+  do {
+    const params = new URLSearchParams({ limit: '100' });
+    if (cursor) params.set('cursor', cursor);
+    const res = await fetch(buildApiUrl(`/bookings/bookings/my-bookings?${params}`), {
+      headers: {
+        Authorization: `Bearer ${token}`,
+      },
+    });
+    if (!res.ok) throw new Error('Failed to fetch bookings');
+    bookings.push(...((await res.json()) as Booking[]));
+    cursor = res.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return bookings;
+}
+
 document.addEventListener('DOMContentLoaded', () => {
   const token = getCookie('token');
   if (!token) {
@@ -20,15 +39,7 @@ document.addEventListener('DOMContentLoaded', () => {
     return;
   }
 
-  fetch(buildApiUrl('/bookings/bookings/my-bookings'), {
-    headers: {
-      Authorization: `Bearer ${token}`,
-    },
-  })
-    .then((res) => {
-      if (!res.ok) throw new Error('Failed to fetch bookings');
-      return res.json();
-    })
+  fetchAllBookings(token)
     .then((bookings: Booking[]) => {
       const upcomingContainer = document.getElementById('upcoming-list')!;
       const watchedContainer = document.getElementById('watched-list')!;
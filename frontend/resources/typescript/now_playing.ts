@@ -76,16 +76,23 @@ function updateActiveButton(): void {
 async function renderMovies(): Promise<void> {
   moviesList.innerHTML = '';
   try {
-    const nowPlaying: MovieDetail[] = await fetchNowPlaying();
-
-    const moviesWithFirstScreening = await Promise.all(
-      nowPlaying.map(async (movie) => {
-        const screenings = await fetchScreenings(movie.tmdb_id);
-        const filtered = filterScreeningsBySelectedDay(screenings);
-        const firstScreening = filtered.length > 0 ? filtered[0].start_time : null;
-        return { movie, screenings, filtered, firstScreening };
-      })
-    );
+    const [nowPlaying, schedule] = await Promise.all([
+      fetchNowPlaying(),
+      fetchSchedule(selectedDate()),
+    ]);
+
+    const screeningsByMovie = new Map<number, Showing[]>();
+    for (const screening of schedule) {
+      const list = screeningsByMovie.get(screening.movie_id) ?? [];
+      list.push(screening);
+      screeningsByMovie.set(screening.movie_id, list);
+    }
+
+    const moviesWithFirstScreening = nowPlaying.map((movie) => {
+      const filtered = screeningsByMovie.get(movie.tmdb_id) ?? [];
+      const firstScreening = filtered.length > 0 ? filtered[0].start_time : null;
+      return { movie, filtered, firstScreening };
+    });
 
     moviesWithFirstScreening.sort((a, b) => {
       if (!a.firstScreening && !b.firstScreening) return 0;
@@ -194,18 +201,14 @@ async function renderMovies(): Promise<void> {
   }
 }
 
-function filterScreeningsBySelectedDay(screenings: Showing[]): Showing[] {
-  let targetDate: string | null = null;
-  if (selectedDay === 'today') targetDate = formatDate(today);
-  else if (selectedDay === 'tomorrow') {
+function selectedDate(): string {
+  if (selectedDay === 'today') return formatDate(today);
+  if (selectedDay === 'tomorrow') {
     const tmr = new Date(today);
     tmr.setDate(tmr.getDate() + 1);
-    targetDate = formatDate(tmr);
-  } else {
-    targetDate = selectedDay;
+    return formatDate(tmr);
   }
-
-  return screenings.filter((s) => s.start_time.split('T')[0] === targetDate);
+  return selectedDay;
 }
 
 function groupAndSortByDate(screenings: Showing[]): GroupedScreenings {
@@ -233,8 +236,8 @@ async function fetchNowPlaying(): Promise<MovieDetail[]> {
   return res.json();
 }
 
-async function fetchScreenings(movieId: number): Promise<Showing[]> {
-  const res = await fetch(buildApiUrl(`/showings/showings?movie_id=${movieId}`));
-  if (!res.ok) throw new Error(`Failed to fetch screenings for movie ${movieId}`);
+async function fetchSchedule(date: string): Promise<Showing[]> {
+  const res = await fetch(buildApiUrl(`/showings/showings/schedule?start_date=${date}&days=1`));
+  if (!res.ok) throw new Error(`Failed to fetch the schedule for ${date}`);
   return res.json();
 }
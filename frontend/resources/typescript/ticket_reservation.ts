@@ -25,6 +25,12 @@ interface ShowingTicketInfo {
   movie_overview: string | null;
 }
 
+interface QueueStatus {
+  queue_token: string;
+  position: number;
+  admitted: boolean;
+}
+
 // --- Main event: On DOMContentLoaded, fetch showing info and set up the reservation form ---
 document.addEventListener('DOMContentLoaded', async () => {
   const showingId = getShowingIdFromURL();
@@ -210,21 +216,32 @@ async function handleReservationSubmit(e: Event, showingId: string): Promise<voi
   if (messageEl) messageEl.textContent = 'Reserving...';
 
   try {
-    for (let i = 0; i < numTickets; i++) {
-      const res = await fetch(
-        `${API_BASE_URL}/bookings/bookings/create?screening_id=${showingId}`,
-        {
-          method: 'POST',
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        }
-      );
-
-      if (!res.ok) {
-        const err = await res.json();
-        throw new Error(err.detail || 'Reservation failed.');
-      }
+    // All tickets are booked in a single request and a single transaction. When the showing
+    // is busy, the server queues us (429) and we retry with our queue token once admitted.
+    let queueToken: string | null = null;
+    let res: Response;
+    for (;;) {
+      const headers: Record<string, string> = {
+        Authorization: `Bearer ${token}`,
+        'Content-Type': 'application/json',
+      };
+      if (queueToken) headers['X-Queue-Token'] = queueToken;
+      res = await fetch(`${API_BASE_URL}/bookings/bookings/create?screening_id=${showingId}`, {
+        method: 'POST',
+        headers,
+        body: JSON.stringify({ quantity: numTickets }),
+      });
+      if (res.status !== 429) break;
+
+      const queued: QueueStatus = (await res.json()).detail;
+      queueToken = queued.queue_token;
+      await waitForAdmission(showingId, queued, token, messageEl);
+      if (messageEl) messageEl.textContent = 'Reserving...';
+    }
+
+    if (!res.ok) {
+      const err = await res.json();
+      throw new Error(err.detail || 'Reservation failed.');
     }
 
     if (messageEl) {
@@ -243,6 +260,29 @@ async function handleReservationSubmit(e: Event, showingId: string): Promise<voi
   }
 }
 
+// --- Wait in the showing's queue until admitted, polling the queue status ---
+async function waitForAdmission(
+  showingId: string,
+  queued: QueueStatus,
+  token: string,
+  messageEl: HTMLElement | null
+): Promise<void> {
+  let status = queued;
+  while (!status.admitted) {
+    if (messageEl) {
+      messageEl.textContent = `This showing is busy. You are number ${status.position} in the queue...`;
+    }
+    await new Promise((resolve) => setTimeout(resolve, 5000));
+
+    const url = `${API_BASE_URL}/bookings/bookings/queue/${showingId}`;
+    const res = await fetch(`${url}?token=${encodeURIComponent(queued.queue_token)}`, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+    if (!res.ok) throw new Error('Your place in the queue has expired.');
+    status = await res.json();
+  }
+}
+
 // --- Show error messages in the reservation-message element ---
 function showError(message: string): void {
   const el = document.getElementById('reservation-message');